@@ -1,73 +1,185 @@
 # streamlit_participaciones.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import uuid
 from io import BytesIO
-import json
-import os
+
+from paneles import activar_perfilado, panel_perfilado, sliders_pesos
+from reparto.almacen import ESCENARIO_DEFECTO, almacen
+from reparto.bloques import cargar_bloques
+from reparto.cascada import Titular, evaluar, puntos_corte, rejilla
+from reparto.cache import cacheado
+from reparto.exportacion import Grafico, Hoja, escribir_libro, filas_dataframe
+from reparto.graficos import especificacion_tarta, tarta
+from reparto.importacion import ErrorImportacion, leer_inversores
+from reparto.partes import PartesHoras, categorias_por_defecto, puntuaciones_horas
+from reparto.rondas import Ronda, nombres_unicos, planes_desde_rondas, simular_rondas
+from reparto.socios import TablaSocios
+
+COLUMNAS_RONDAS = ["Plan", "Pre-money (€)", "Inversión (€)", "Pool objetivo (%)", "Pro-rata"]
+RONDAS_EJEMPLO = [
+    {"Plan": "A", "Pre-money (€)": 1_000_000.0, "Inversión (€)": 250_000.0, "Pool objetivo (%)": 10.0, "Pro-rata": False},
+    {"Plan": "A", "Pre-money (€)": 4_000_000.0, "Inversión (€)": 1_000_000.0, "Pool objetivo (%)": 10.0, "Pro-rata": True},
+    {"Plan": "B", "Pre-money (€)": 2_000_000.0, "Inversión (€)": 500_000.0, "Pool objetivo (%)": 0.0, "Pro-rata": False},
+]
+COLUMNAS_PREFERENCIAS = ["Inversor", "Múltiplo", "Participante", "Tope (x)", "Rango"]
+PREFERENCIA_DEFECTO = {"Múltiplo": 1.0, "Participante": False, "Tope (x)": 0.0, "Rango": 0}
+
+
+def fila_guardada(datos, lista, i):
+    """Fila ``i`` guardada de ``lista``, o vacía si el usuario ha añadido filas nuevas."""
+    filas = datos.get(lista, [])
+    return filas[i] if i < len(filas) else {}
+
+
+@cacheado("importaciones")
+def importar_inversores(contenido, nombre_fichero):
+    return leer_inversores(BytesIO(contenido), nombre_fichero.rsplit(".", 1)[-1])
+
+
+@cacheado("exportaciones")
+def exportar_excel(chart_df, socios_df, inversores, valoracion, detalles_rondas):
+    hojas = [
+        Hoja("Participaciones", list(chart_df.columns), filas_dataframe(chart_df), Grafico("pie", 0, [1], "Distribución de Participaciones")),
+        Hoja("Socios", list(socios_df.columns), filas_dataframe(socios_df)),
+        Hoja("Inversores", ["Nombre", "Aporte (€)", "Participación (%)"], [[i["nombre"], i["aporte"], i["participacion"]] for i in inversores]),
+        Hoja("Valoración", ["Concepto", "Valor"], list(valoracion.items())),
+    ]
+    for plan, detalle in detalles_rondas.items():
+        columnas = ["Etapa"] + list(detalle.columns)
+        filas = ([etapa, *fila] for etapa, fila in zip(detalle.index, detalle.to_numpy().tolist()))
+        hojas.append(Hoja(f"Rondas {plan}", columnas, filas, Grafico("line", 0, list(range(1, len(columnas))), f"Plan {plan}")))
+    return escribir_libro(hojas)
+
 
 st.title("Reparto de Participaciones y Valoración de Proyecto")
 
-STORAGE_FILE = "session_data.json"
+ALMACEN = almacen()
+perfil = activar_perfilado()
 
-if st.sidebar.button("🗑️ Release: Borrar todos los datos"):
-    if os.path.exists(STORAGE_FILE):
-        os.remove(STORAGE_FILE)
-    st.experimental_rerun()
+# El identificador de sesión viaja en la URL para sobrevivir a recargas de página
+if "sesion" not in st.query_params:
+    st.query_params["sesion"] = uuid.uuid4().hex
+sesion = st.query_params["sesion"]
+escenario = st.sidebar.text_input("Escenario", value=ESCENARIO_DEFECTO) or ESCENARIO_DEFECTO
 
-saved_session = {}
-if os.path.exists(STORAGE_FILE):
-    with open(STORAGE_FILE, "r", encoding="utf-8") as f:
-        saved_session = json.load(f)
+if st.sidebar.button("🗑️ Release: Borrar los datos de este escenario"):
+    ALMACEN.borrar(sesion, escenario)
+    st.rerun()
+
+with perfil.etapa("carga"):
+    saved_session = ALMACEN.cargar(sesion, escenario)
 
 st.markdown("Esta herramienta permite calcular participaciones con lógica por bloques, porcentajes blindados, inversores y estimación de valoración del negocio.")
 
-st.sidebar.header("Pesos por Bloque")
-pesos = {
-    "Concepto, Idea e IP Fundacional": st.sidebar.slider("Concepto (%)", 0, 100, saved_session.get("pesos", {}).get("Concepto, Idea e IP Fundacional", 30)),
-    "Inversión Económica Inicial": st.sidebar.slider("Inversión (%)", 0, 100, saved_session.get("pesos", {}).get("Inversión Económica Inicial", 30)),
-    "Operaciones y Gestión": st.sidebar.slider("Operaciones (%)", 0, 100, saved_session.get("pesos", {}).get("Operaciones y Gestión", 25)),
-    "Estrategia, Dirección, Marketing": st.sidebar.slider("Estrategia (%)", 0, 100, saved_session.get("pesos", {}).get("Estrategia, Dirección, Marketing", 15))
-}
+pesos = sliders_pesos(cargar_bloques(), saved_session.get("pesos"))
 
 umbral_disolucion = st.sidebar.slider("Umbral máximo de disolución (%)", 1, 100, value=saved_session.get("umbral_disolucion", 25))
 
+graficos_nativos = st.sidebar.checkbox("Gráficos nativos (más ligeros)")
+
+with st.expander("Partes de horas"):
+    partes = PartesHoras(saved_session.get("partes"))
+    fichero_partes = st.file_uploader("Exportación de partes (socio, fecha, horas, tarifa, categoría)", type=["csv", "txt", "jsonl", "xlsx"])
+    col_ingerir, col_vaciar = st.columns(2)
+    if fichero_partes is not None and col_ingerir.button("Ingerir filas nuevas"):
+        try:
+            with perfil.etapa("partes"):
+                nuevas = partes.ingerir(fichero_partes)
+        except ErrorImportacion as exc:
+            st.error("No se pudo ingerir el fichero:\n\n" + "\n".join(f"- {e}" for e in exc.errores))
+        else:
+            ALMACEN.guardar(sesion, escenario, {"partes": partes.estado()}, inmediato=True)
+            st.success(f"✔ {nuevas:,} filas nuevas.")
+    if partes.filas and col_vaciar.button("Vaciar partes"):
+        partes = PartesHoras()
+        ALMACEN.guardar(sesion, escenario, {"partes": None}, inmediato=True)
+
+    asignacion = {}
+    usar_bloques_partes = False
+    if partes.filas:
+        st.caption(f"{partes.filas:,} filas acumuladas; última ingerida: {partes.marca_legible()}. Al volver a subir la exportación solo se suman las filas posteriores.")
+        guardada = saved_session.get("partes_asignacion") or {}
+        por_defecto = categorias_por_defecto(partes.categorias, list(pesos))
+        asignacion_df = st.data_editor(
+            pd.DataFrame({
+                "Categoría": partes.categorias,
+                "Bloque": [guardada.get(c, por_defecto[c]) for c in partes.categorias],
+            }),
+            column_config={"Bloque": st.column_config.SelectboxColumn("Bloque", options=list(pesos))},
+            disabled=["Categoría"],
+            hide_index=True,
+            key="partes_asignacion",
+        )
+        asignacion = {c: b if isinstance(b, str) else None for c, b in zip(asignacion_df["Categoría"], asignacion_df["Bloque"])}
+        usar_bloques_partes = st.checkbox("Puntuar los bloques con el % de horas de cada socio", value=saved_session.get("partes_bloques", False))
+    resumen_partes = partes.resumen(asignacion, list(pesos))
+    indice_partes = {n: k for k, n in enumerate(resumen_partes.nombres)}
+    puntuaciones_partes = puntuaciones_horas(resumen_partes.horas_bloque)
+    if partes.filas:
+        st.dataframe(pd.DataFrame({
+            "Socio": resumen_partes.nombres,
+            "Horas": resumen_partes.horas,
+            "Coste total (€)": resumen_partes.coste,
+            "Precio medio por hora (€)": resumen_partes.coste_hora,
+            **{f"{b} (h)": resumen_partes.horas_bloque[:, j] for j, b in enumerate(pesos)},
+        }), hide_index=True)
+
 st.subheader("Datos de Socios")
 num_socios = st.number_input("Número de socios", min_value=1, max_value=10, value=saved_session.get("num_socios", 4))
-socios_data = []
+socios = TablaSocios.vacia(num_socios, len(pesos))
 session_state = {
     "pesos": pesos,
     "num_socios": num_socios,
     "socios": [],
     "inversores": saved_session.get("inversores", []),
-    "umbral_disolucion": umbral_disolucion
+    "umbral_disolucion": umbral_disolucion,
+    "partes_asignacion": asignacion,
+    "partes_bloques": usar_bloques_partes,
 }
 
-for i in range(num_socios):
-    nombre = st.text_input(f"Nombre del socio {i+1}", value=saved_session.get("socios", [{}]*num_socios)[i].get("nombre", ""), key=f"nombre_{i}")
-    bloque_vals = []
-    for bloque in pesos:
-        val = st.slider(f"{bloque} - {nombre or 'Socio '+str(i+1)}", 0, 100, saved_session.get("socios", [{}]*num_socios)[i].get(bloque, 0), key=f"bloque_{bloque}_{i}")
-        bloque_vals.append(val)
-    horas_socio = st.number_input(f"Total de horas de {nombre or 'Socio '+str(i+1)}", min_value=0, step=1, value=saved_session.get("socios", [{}]*num_socios)[i].get("horas", 0), key=f"horas_{i}")
-    coste_hora_socio = st.number_input(f"Precio por hora de {nombre or 'Socio '+str(i+1)} (€)", min_value=0.0, step=1.0, value=saved_session.get("socios", [{}]*num_socios)[i].get("coste", 0.0), key=f"coste_hora_{i}")
-    coste_total_socio = horas_socio * coste_hora_socio
-    blindado = st.number_input(f"% Blindado para {nombre or 'Socio '+str(i+1)}", min_value=0.0, max_value=100.0, value=saved_session.get("socios", [{}]*num_socios)[i].get("blindado", 0.0), key=f"blindado_{i}")
-    socios_data.append([nombre] + bloque_vals + [blindado, horas_socio, coste_hora_socio, coste_total_socio])
-    session_state["socios"].append({
-        "nombre": nombre,
-        "blindado": blindado,
-        "horas": horas_socio,
-        "coste": coste_hora_socio,
-        **{bloque: bloque_vals[j] for j, bloque in enumerate(pesos)}
-    })
+with perfil.etapa("widgets"):
+    for i in range(num_socios):
+        guardado = fila_guardada(saved_session, "socios", i)
+        nombre = st.text_input(f"Nombre del socio {i+1}", value=guardado.get("nombre", ""), key=f"nombre_{i}")
+        # Los socios que aparecen en los partes toman de ahí horas y precio.
+        k = indice_partes.get(nombre)
+        bloque_vals = []
+        for j, bloque in enumerate(pesos):
+            if k is not None and usar_bloques_partes:
+                val = round(float(puntuaciones_partes[k, j]), 2)
+            else:
+                val = st.slider(f"{bloque} - {nombre or 'Socio '+str(i+1)}", 0, 100, guardado.get(bloque, 0), key=f"bloque_{bloque}_{i}")
+            bloque_vals.append(val)
+        if k is not None:
+            horas_socio = float(resumen_partes.horas[k])
+            coste_hora_socio = float(resumen_partes.coste_hora[k])
+            st.caption(f"Desde los partes: {horas_socio:,.2f} h a {coste_hora_socio:,.2f} €/h de media" + (f"; bloques {', '.join(f'{v:g}' for v in bloque_vals)}" if usar_bloques_partes else ""))
+        else:
+            horas_socio = st.number_input(f"Total de horas de {nombre or 'Socio '+str(i+1)}", min_value=0, step=1, value=guardado.get("horas", 0), key=f"horas_{i}")
+            coste_hora_socio = st.number_input(f"Precio por hora de {nombre or 'Socio '+str(i+1)} (€)", min_value=0.0, step=1.0, value=guardado.get("coste", 0.0), key=f"coste_hora_{i}")
+        blindado = st.number_input(f"% Blindado para {nombre or 'Socio '+str(i+1)}", min_value=0.0, max_value=100.0, value=guardado.get("blindado", 0.0), key=f"blindado_{i}")
+        socios.nombres[i] = nombre
+        socios.puntuaciones[i] = bloque_vals
+        socios.blindado[i], socios.horas[i], socios.coste_hora[i] = blindado, horas_socio, coste_hora_socio
+        # Lo que viene de los partes no se guarda como dato manual del socio.
+        manual = {"horas": horas_socio, "coste": coste_hora_socio} if k is None else {"horas": guardado.get("horas", 0), "coste": guardado.get("coste", 0.0)}
+        if k is None or not usar_bloques_partes:
+            manual.update({bloque: bloque_vals[j] for j, bloque in enumerate(pesos)})
+        else:
+            manual.update({bloque: guardado.get(bloque, 0) for bloque in pesos})
+        session_state["socios"].append({
+            "nombre": nombre,
+            "blindado": blindado,
+            **manual,
+        })
 
 if st.button("Calcular Participaciones"):
-    if any(s[0] == "" for s in socios_data):
+    if "" in socios.nombres:
         st.error("⚠️ Todos los socios deben tener nombre.")
     else:
-        with open(STORAGE_FILE, "w", encoding="utf-8") as f:
-            json.dump(session_state, f, ensure_ascii=False, indent=2)
+        with perfil.etapa("guardado"):
+            ALMACEN.guardar(sesion, escenario, session_state, inmediato=True)
         st.session_state["mostrar_inversores"] = True
 
 if "mostrar_inversores" in st.session_state and st.session_state["mostrar_inversores"]:
@@ -75,25 +187,49 @@ if "mostrar_inversores" in st.session_state and st.session_state["mostrar_invers
 
     st.header("Valoración y Aportes del Inversor")
     valoracion = st.number_input("Valoración total del proyecto (€)", min_value=1.0, step=1000.0)
-    num_inversores = st.number_input("Número de inversores", min_value=0, max_value=10, value=len(saved_session.get("inversores", [])))
+    fichero_inversores = st.file_uploader("Importar inversores (Nombre y Aporte; CSV, XLSX o JSONL)", type=["csv", "xlsx", "jsonl"])
+    importados = None
+    if fichero_inversores is not None:
+        try:
+            importados = importar_inversores(fichero_inversores.getvalue(), fichero_inversores.name)
+        except ErrorImportacion as exc:
+            st.error("⚠️ Hay errores en los datos de inversores:\n\n" + "\n".join(f"- {e}" for e in exc.errores))
 
     inversores = []
+    if importados is not None:
+        for nombre_inv, aporte in zip(importados.nombres, importados.aportes.tolist()):
+            participacion = (aporte / valoracion * 100) if valoracion else 0.0
+            inversores.append({"nombre": nombre_inv, "aporte": aporte, "participacion": participacion})
+        st.write(f"Inversores cargados: **{len(inversores):,}**")
+    # Con un fichero cargado no se piden inversores a mano.
+    num_inversores = 0 if importados is not None else st.number_input(
+        "Número de inversores", min_value=0, max_value=10, value=len(saved_session.get("inversores", []))
+    )
     for i in range(num_inversores):
-        nombre_inv = st.text_input(f"Nombre del inversor {i+1}", value=saved_session.get("inversores", [{}]*num_inversores)[i].get("nombre", ""), key=f"inv_nombre_{i}")
-        aporte = st.number_input(f"Aporte de {nombre_inv or 'Inversor '+str(i+1)} (€)", min_value=0.0, step=100.0, value=saved_session.get("inversores", [{}]*num_inversores)[i].get("aporte", 0.0), key=f"inv_aporte_{i}")
+        guardado = fila_guardada(saved_session, "inversores", i)
+        nombre_inv = st.text_input(f"Nombre del inversor {i+1}", value=guardado.get("nombre", ""), key=f"inv_nombre_{i}")
+        aporte = st.number_input(f"Aporte de {nombre_inv or 'Inversor '+str(i+1)} (€)", min_value=0.0, step=100.0, value=guardado.get("aporte", 0.0), key=f"inv_aporte_{i}")
         if nombre_inv and aporte > 0:
             participacion = (aporte / valoracion * 100) if valoracion else 0.0
             inversores.append({"nombre": nombre_inv, "aporte": aporte, "participacion": participacion})
         elif nombre_inv or aporte > 0:
             st.warning(f"⚠️ Inversor {i+1} debe tener nombre y aporte mayor a 0")
 
-    total_socios = sum([s[-1] for s in socios_data])
+    total_socios = float(socios.trabajo.sum())
     total_aportes = sum(i["aporte"] for i in inversores)
     total_participacion_inversores = sum(i["participacion"] for i in inversores)
     total_valorado = total_socios + total_aportes
 
-    socios_df = pd.DataFrame(socios_data, columns=["Nombre"] + list(pesos.keys()) + ["Blindado", "Horas", "CosteHora", "CosteTotal"])
-    socios_df["Participacion"] = socios_df["CosteTotal"] / total_valorado * (100 - total_participacion_inversores) if total_valorado > 0 else 0.0
+    with perfil.etapa("tabla"):
+        socios_df = pd.DataFrame({
+            "Nombre": socios.nombres,
+            **{b: socios.puntuaciones[:, j] for j, b in enumerate(pesos)},
+            "Blindado": socios.blindado,
+            "Horas": socios.horas,
+            "CosteHora": socios.coste_hora,
+            "CosteTotal": socios.trabajo,
+        })
+        socios_df["Participacion"] = socios_df["CosteTotal"] / total_valorado * (100 - total_participacion_inversores) if total_valorado > 0 else 0.0
 
     inversores_df = pd.DataFrame(inversores)
     if not inversores_df.empty and all(col in inversores_df.columns for col in ["nombre", "participacion"]):
@@ -101,8 +237,10 @@ if "mostrar_inversores" in st.session_state and st.session_state["mostrar_invers
     else:
         inversores_chart = pd.DataFrame(columns=["Nombre", "Participacion"])
 
-    socios_chart = socios_df[["Nombre", "Participacion"]]
-    chart_df = pd.concat([socios_chart, inversores_chart], ignore_index=True)
+    chart_df = pd.concat([socios_df[["Nombre", "Participacion"]], inversores_chart], ignore_index=True)
+    # Los nombres hacen de columnas en rondas y cascada: sin vacíos ni repetidos.
+    chart_df["Nombre"] = nombres_unicos(list(chart_df["Nombre"]), "Socio")
+    socios_chart = chart_df.iloc[:len(socios_df)]
 
     st.subheader("Distribución de Participaciones")
     st.dataframe(chart_df)
@@ -112,11 +250,126 @@ if "mostrar_inversores" in st.session_state and st.session_state["mostrar_invers
     elif chart_df["Participacion"].sum() > 100:
         st.error("❌ La suma de participaciones excede el 100%. Revisa aportes o valoración.")
     else:
-        fig, ax = plt.subplots()
-        ax.pie(chart_df["Participacion"], labels=chart_df["Nombre"], autopct="%1.1f%%")
-        ax.axis("equal")
-        st.pyplot(fig)
+        if graficos_nativos:
+            st.vega_lite_chart(especificacion_tarta(chart_df["Nombre"], chart_df["Participacion"]))
+        else:
+            with perfil.etapa("grafico"):
+                st.image(tarta(chart_df["Nombre"], chart_df["Participacion"]))
+
+        # -------- BLOQUE RONDAS DE FINANCIACIÓN --------
+        st.header("Rondas de financiación")
+        st.markdown(f"Compara planes de rondas (una fila por ronda, en orden) y detecta qué socios superan el umbral de disolución del **{umbral_disolucion}%**.")
+        rondas_df = st.data_editor(
+            pd.DataFrame(saved_session.get("rondas", RONDAS_EJEMPLO), columns=COLUMNAS_RONDAS),
+            num_rows="dynamic",
+            key="rondas",
+        )
+        planes = {}
+        for fila in rondas_df.dropna(subset=["Plan", "Pre-money (€)", "Inversión (€)"]).to_dict("records"):
+            planes.setdefault(str(fila["Plan"]), []).append(Ronda(
+                str(fila["Plan"]),
+                float(fila["Pre-money (€)"]),
+                float(fila["Inversión (€)"]),
+                float(fila["Pool objetivo (%)"] or 0.0),
+                bool(fila["Pro-rata"]),
+            ))
+        session_state["rondas"] = rondas_df.dropna(subset=["Plan"]).to_dict("records")
+
+        detalles_rondas = {}
+        if planes:
+            es_socio = [True] * len(socios_chart) + [False] * len(inversores_chart)
+            with perfil.etapa("rondas"):
+                resultado = simular_rondas(
+                    list(chart_df["Nombre"]),
+                    list(chart_df["Participacion"]),
+                    planes_desde_rondas(list(planes.values())),
+                    fundadores=es_socio,
+                    con_prorrata=[not s for s in es_socio],
+                    pool_inicial=100 - chart_df["Participacion"].sum(),
+                    umbral=umbral_disolucion,
+                )
+            n_titulares = len(chart_df)
+            finales = [resultado.participacion[i, len(rondas)] for i, rondas in enumerate(planes.values())]
+            comparativa = pd.DataFrame(finales, index=list(planes), columns=resultado.titulares)
+            comparativa = comparativa.loc[:, (comparativa > 0).any()]
+            comparativa["Socios sobre el umbral"] = [
+                ", ".join(n for n, supera in zip(chart_df["Nombre"], resultado.supera_umbral[i]) if supera)
+                for i in range(len(planes))
+            ]
+            st.subheader("Tabla final por plan (%)")
+            st.dataframe(comparativa)
+
+            for i, (nombre_plan, rondas) in enumerate(planes.items()):
+                detalles_rondas[nombre_plan] = pd.DataFrame(
+                    resultado.participacion[i, :len(rondas) + 1, :n_titulares + 1 + len(rondas)],
+                    index=["Inicial"] + [f"Tras ronda {r + 1}" for r in range(len(rondas))],
+                    columns=resultado.titulares[:n_titulares + 1 + len(rondas)],
+                )
+            plan = st.selectbox("Detalle por ronda del plan", list(planes))
+            i = list(planes).index(plan)
+            rondas_plan = len(planes[plan])
+            st.dataframe(detalles_rondas[plan])
+            for j, nombre in enumerate(chart_df["Nombre"]):
+                if resultado.supera_umbral[i, j]:
+                    st.warning(f"⚠️ {nombre} supera el umbral de disolución en la ronda {resultado.primera_ronda[i, j]} (dilución acumulada final: {resultado.dilucion[i, rondas_plan, j]:.1f}%).")
+
+        # -------- BLOQUE CASCADA DE SALIDA --------
+        st.header("Cascada de salida")
+        st.markdown("Reparto de una venta de la empresa con preferencias de liquidación: los socios tienen acciones ordinarias y cada inversor, las condiciones de la tabla (un rango mayor cobra antes; tope 0 = sin tope).")
+        # Los inversores, con los mismos nombres únicos que los socios en ``chart_df``.
+        nombres_inversores = list(chart_df["Nombre"].iloc[len(socios_chart):])
+        guardadas = {p["Inversor"]: p for p in saved_session.get("preferencias", [])}
+        preferencias_df = st.data_editor(
+            pd.DataFrame(
+                [{**PREFERENCIA_DEFECTO, **guardadas.get(n, {}), "Inversor": n} for n in nombres_inversores],
+                columns=COLUMNAS_PREFERENCIAS,
+            ),
+            disabled=["Inversor"],
+            key="preferencias",
+        )
+        session_state["preferencias"] = preferencias_df.to_dict("records")
+
+        titulares_salida = [Titular(n, p) for n, p in zip(socios_chart["Nombre"], socios_chart["Participacion"])]
+        for nombre, inv, fila in zip(nombres_inversores, inversores, session_state["preferencias"]):
+            titulares_salida.append(Titular(
+                nombre,
+                inv["participacion"],
+                inv["aporte"],
+                float(fila["Múltiplo"] or 0.0),
+                bool(fila["Participante"]),
+                float(fila["Tope (x)"]) if fila["Tope (x)"] else None,
+                int(fila["Rango"] or 0),
+            ))
+        multiplo_maximo = st.slider("Valor de salida máximo (x valoración)", 1, 50, saved_session.get("multiplo_salida_maximo", 10))
+        session_state["multiplo_salida_maximo"] = multiplo_maximo
+        with perfil.etapa("cascada"):
+            cortes = puntos_corte(titulares_salida)
+            valores_salida = rejilla(valoracion * multiplo_maximo, cortes=cortes)
+            pagos_salida = evaluar(cortes, valores_salida)
+        st.line_chart(pd.DataFrame(pagos_salida, index=pd.Index(valores_salida, name="Valor de salida (€)"), columns=cortes.nombres))
+
+        multiplo_salida = st.slider("Valor de salida (x valoración)", 0.0, float(multiplo_maximo), min(2.0, float(multiplo_maximo)), step=0.1)
+        valor_salida = valoracion * multiplo_salida
+        st.write(f"Valor de salida: **{valor_salida:,.2f} €**")
+        pagos = evaluar(cortes, [valor_salida])[0]
+        inversiones = [t.inversion for t in titulares_salida]
+        st.dataframe(pd.DataFrame({
+            "Titular": cortes.nombres,
+            "Recibe (€)": pagos,
+            "% de la salida": pagos / valor_salida * 100 if valor_salida > 0 else 0.0,
+            "Múltiplo sobre la inversión": [p / x if x > 0 else None for p, x in zip(pagos, inversiones)],
+        }))
+
+        if st.checkbox("Preparar libro Excel"):
+            st.download_button(
+                "Descargar Excel",
+                data=exportar_excel(chart_df, socios_df, inversores, {"Valoración total del proyecto (€)": valoracion, "Umbral máximo de disolución (%)": umbral_disolucion}, detalles_rondas),
+                file_name="participaciones.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
 
     session_state["inversores"] = inversores
-    with open(STORAGE_FILE, "w", encoding="utf-8") as f:
-        json.dump(session_state, f, ensure_ascii=False, indent=2)
+    with perfil.etapa("guardado"):
+        ALMACEN.guardar(sesion, escenario, session_state)
+
+panel_perfilado(perfil, bytes_guardados=ALMACEN.bytes_escritos)
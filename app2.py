@@ -1,56 +1,45 @@
 
 import streamlit as st
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+
+from paneles import formulario_socios, seguir_trabajo, sliders_pesos
+from reparto.bloques import cargar_bloques
+from reparto.cache import cacheado
+from reparto.exportacion import COLUMNAS_SIMULACION, escribir_libro, hoja_simulacion
+from reparto.graficos import especificacion_tarta, tarta
+from reparto.negociacion import inversion_maxima, pre_money_minimo
+from reparto.trabajos import TERMINADO
+from reparto.valoracion import PERCENTILES, distribuciones_triangulares, simular_valoracion
+
+simular_valoracion_cacheada = cacheado("simulaciones")(simular_valoracion)
 
 st.title("Reparto de Participaciones y Valoración de Proyecto")
 
 st.markdown("Esta herramienta permite calcular participaciones con lógica por bloques, porcentajes blindados, inversores y estimación de valoración del negocio.")
 
 # Pesos configurables
-st.sidebar.header("Pesos por Bloque")
-pesos = {
-    "Concepto, Idea e IP Fundacional": st.sidebar.slider("Concepto (%)", 0, 100, 30),
-    "Inversión Económica Inicial": st.sidebar.slider("Inversión (%)", 0, 100, 30),
-    "Operaciones y Gestión": st.sidebar.slider("Operaciones (%)", 0, 100, 25),
-    "Estrategia, Dirección, Marketing": st.sidebar.slider("Estrategia (%)", 0, 100, 15)
-}
-
-total_peso = sum(pesos.values())
-if total_peso != 100:
-    st.sidebar.error(f"La suma de pesos debe ser 100%. Ahora suma: {total_peso}%")
+pesos = sliders_pesos(cargar_bloques())
+
+graficos_nativos = st.sidebar.checkbox("Gráficos nativos (más ligeros)")
 
 st.subheader("Datos de Socios")
-num_socios = st.number_input("Número de socios", min_value=1, max_value=10, value=4)
-socios_data = []
-
-for i in range(num_socios):
-    nombre = st.text_input(f"Nombre del socio {i+1}", key=f"nombre_{i}")
-    bloque_vals = []
-    for bloque in pesos:
-        val = st.slider(f"{bloque} - {nombre}", 0, 100, 0, key=f"bloque_{bloque}_{i}")
-        bloque_vals.append(val)
-    blindado = st.number_input(f"% Blindado para {nombre}", min_value=0.0, max_value=100.0, value=0.0, key=f"blindado_{i}")
-    socios_data.append([nombre] + bloque_vals + [blindado])
+# El reparto vive en la sesión y cada widget aplica solo la celda que cambia.
+socios, modelo = formulario_socios(pesos)
 
 if st.button("Calcular Participaciones"):
-    columnas = ["Socio"] + list(pesos.keys()) + ["% Blindado"]
-    df = pd.DataFrame(socios_data, columns=columnas)
+    st.session_state["mostrar_resultados"] = True
 
-    for b in pesos:
-        df[f"{b} (%)"] = (df[b] / 100) * pesos[b]
-    df["Participación Técnica"] = df[[f"{b} (%)" for b in pesos]].sum(axis=1)
-    df["% Final Bruto"] = df["Participación Técnica"] + df["% Blindado"]
-    total = df["% Final Bruto"].sum()
-    df["% Final Normalizado"] = df["% Final Bruto"] / total * 100
+if st.session_state.get("mostrar_resultados"):
+    df = modelo.tabla(socios.nombres, list(pesos))
 
     st.subheader("Resultados")
     st.dataframe(df[["Socio"] + [f"{b} (%)" for b in pesos] + ["Participación Técnica", "% Blindado", "% Final Bruto", "% Final Normalizado"]])
 
-    fig, ax = plt.subplots()
-    ax.pie(df["% Final Normalizado"], labels=df["Socio"], autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    st.pyplot(fig)
+    if graficos_nativos:
+        st.vega_lite_chart(especificacion_tarta(df["Socio"], df["% Final Normalizado"]))
+    else:
+        st.image(tarta(df["Socio"], df["% Final Normalizado"]))
 
     st.download_button("Descargar como CSV", data=df.to_csv(index=False), file_name="reparto_socios.csv", mime="text/csv")
 
@@ -106,3 +95,59 @@ if st.button("Calcular Participaciones"):
             st.warning("⚠️ La participación del inversor supera el % disponible. Revisa condiciones o renegocia participación de socios.")
         else:
             st.success("✅ Participación del inversor posible dentro del % disponible.")
+
+        # -------- BLOQUE CÁLCULO INVERSO --------
+        if st.checkbox("Condiciones límite (cálculo inverso)"):
+            dilucion_max = st.slider("Dilución máxima de los fundadores (%)", 1, 90, 25)
+            pool_objetivo = st.number_input("Pool de opciones tras la ronda (%)", min_value=0.0, max_value=50.0, value=0.0)
+            acciones_pre = st.number_input("Acciones totalmente diluidas antes de la ronda (opcional)", min_value=0, step=1000, value=0)
+            acciones = acciones_pre or None
+
+            maxima = inversion_maxima(valor_negocio, dilucion_max, pool_objetivo, acciones_pre=acciones)
+            minima = pre_money_minimo(aportacion, dilucion_max, pool_objetivo, acciones_pre=acciones)
+            st.write(f"Inversión máxima a {valor_negocio:,.2f} € pre-money: **{float(maxima.inversion):,.2f} €** ({float(maxima.fraccion):.2f}% post-money)")
+            st.write(f"Valoración pre-money mínima para aportar {aportacion:,.2f} €: **{float(minima.pre_money):,.2f} €**")
+            if acciones:
+                st.write(f"Precio por acción mínimo: **{float(minima.precio_accion):,.4f} €**")
+
+            # Inversión máxima para una rejilla de valoraciones y límites de dilución.
+            factores = np.array([0.5, 0.75, 1.0, 1.5, 2.0, 3.0])
+            limites = np.array([10, 15, 20, 25, 30, 40, 50])
+            rejilla = inversion_maxima(valor_negocio * factores[:, None], limites[None, :], pool_objetivo)
+            st.dataframe(pd.DataFrame(
+                rejilla.inversion,
+                index=[f"{valor_negocio * x:,.0f} €" for x in factores],
+                columns=[f"Dilución ≤ {d}%" for d in limites],
+            ).rename_axis("Pre-money").style.format("{:,.0f} €"))
+
+        # -------- BLOQUE SIMULACIÓN MONTE CARLO --------
+        if st.checkbox("Simulación Monte Carlo de la valoración"):
+            incertidumbre = st.slider("Incertidumbre de las entradas (± %)", 0, 100, 20)
+            simulaciones = st.select_slider("Número de simulaciones", options=[10_000, 100_000, 1_000_000, 5_000_000], value=1_000_000)
+            entradas = distribuciones_triangulares({
+                "horas": horas_trabajadas,
+                "coste_hora": coste_hora,
+                "gastos": inversion_gastos,
+                "usuarios": usuarios_pro,
+                "precio_mensual": precio_mensual,
+                "margen": margen_neto,
+                "multiplicador": 2,
+            }, incertidumbre)
+            trabajo = seguir_trabajo(
+                "monte_carlo", simular_valoracion_cacheada, entradas, aportacion, valor_negocio, simulaciones,
+                etiqueta="Simulando",
+                parcial=lambda medias: st.caption(f"ROI medio provisional: {medias['roi']:,.2f} €"),
+            )
+            if trabajo is not None and trabajo.estado == TERMINADO:
+                resultado = trabajo.resultado
+                st.dataframe(pd.DataFrame(
+                    {columna: resultado.cuantiles[m] for m, columna in COLUMNAS_SIMULACION.items()},
+                    index=[f"P{p}" for p in PERCENTILES],
+                ))
+                st.write(f"ROI medio con la participación pactada de {participacion_inversor:.2f}%: **{resultado.medias['roi']:,.2f} €**")
+                st.download_button(
+                    "Descargar simulación (Excel)",
+                    data=escribir_libro([hoja_simulacion(resultado)]),
+                    file_name="simulacion_valoracion.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                )
@@ -1,58 +1,306 @@
 
+from io import BytesIO
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+
+from paneles import activar_perfilado, panel_perfilado, seguir_trabajo, sliders_pesos
+from reparto import graficos
+from reparto.barrido import MAX_COMBINACIONES, bandas_barrido, barrido_socio, combinaciones_pesos, filas_barrido, mapa_calor, numero_combinaciones
+from reparto.bloques import cargar_bloques
+from reparto.cache import CACHE, cacheado
+from reparto.exportacion import Grafico, Hoja, escribir_libro, filas_array, filas_dataframe
+from reparto.importacion import ErrorImportacion, leer_socios, socios_desde_registros
+from reparto.motor import normalizar, tabla_reparto
+from reparto.shapley import funcion_valor, shapley
+from reparto.socios import TablaSocios
+from reparto.trabajos import TERMINADO
+from reparto.vesting import Concesion, calendario, foto
+
+
+@cacheado("tablas")
+def calcular_tabla(socios, pesos):
+    return tabla_reparto(socios.nombres, socios.puntuaciones, list(pesos.values()), socios.blindado, bloques=list(pesos))
+
+
+def socios_superiores(socios, pesos, modelo):
+    """Socios puntuados en los bloques de primer nivel, para barrer solo sus pesos."""
+    if not modelo.anidado:
+        return socios
+    return socios.con_puntuaciones(modelo.puntuaciones_superiores(socios.puntuaciones, list(pesos.values())))
+
+
+@cacheado("importaciones")
+def importar_socios(contenido, nombre_fichero, bloques):
+    return leer_socios(BytesIO(contenido), nombre_fichero.rsplit(".", 1)[-1], bloques)
+
+
+@cacheado("exportaciones")
+def exportar_csv(socios, pesos):
+    return calcular_tabla(socios, pesos).to_csv(index=False).encode("utf-8")
+
+
+@cacheado("graficos")
+def grafico_tarta(socios, pesos):
+    df = calcular_tabla(socios, pesos)
+    return graficos.tarta(*graficos.agrupar_resto(df["Socio"], df["% Final Normalizado"]))
+
+
+@cacheado("exportaciones")
+def exportar_excel(socios, pesos, modelo, valoracion, paso, incluir_barrido, avance=None):
+    df = calcular_tabla(socios, pesos)
+    hojas = [
+        Hoja("Socios", list(df.columns), filas_dataframe(df), Grafico("pie", 0, [len(df.columns) - 1], "% Final Normalizado")),
+        Hoja("Valoración", ["Concepto", "Valor"], list(valoracion.items())),
+    ]
+    if paso is not None:
+        superiores = socios_superiores(socios, pesos, modelo)
+        bandas = calcular_bandas(superiores, paso)
+        niveles = [f"P{n * 100:g}" for n in bandas.niveles]
+        valores = np.column_stack([bandas.minimo, bandas.cuantiles.T, bandas.maximo])
+        hojas.append(Hoja(
+            "Sensibilidad",
+            ["Socio", "Mínimo", *niveles, "Máximo"],
+            filas_array(valores, list(df["Socio"])),
+            Grafico("column", 0, [1, 2 + niveles.index("P50"), 2 + len(niveles)], "Bandas de % Final Normalizado"),
+        ))
+        if incluir_barrido:
+            combinaciones = combinaciones_pesos(superiores.bloques, 100, paso)
+
+            def filas():
+                hechas = 0
+                for tanda in filas_barrido(superiores.puntuaciones, superiores.blindado, combinaciones):
+                    yield from filas_array(tanda)
+                    hechas += len(tanda)
+                    if avance is not None:
+                        avance(hechas / len(combinaciones), f"{hechas:,} de {len(combinaciones):,} combinaciones")
+
+            hojas.append(Hoja("Barrido", [f"Peso {b}" for b in modelo.superiores] + list(df["Socio"]), filas()))
+    return escribir_libro(hojas)
+
+
+@cacheado("barridos")
+def calcular_bandas(socios, paso, avance=None):
+    combinaciones = combinaciones_pesos(socios.bloques, 100, paso)
+    return bandas_barrido(socios.puntuaciones, socios.blindado, combinaciones, avance=avance)
+
+
+@cacheado("shapley")
+def calcular_shapley(socios, pesos, agregados, peso_trabajo):
+    f = funcion_valor(socios.puntuaciones, list(pesos.values()), agregados, socios.horas, socios.coste_hora, peso_trabajo)
+    return shapley(f, semilla=0)
+
+
+@cacheado("vesting")
+def calcular_vesting(concesiones, venta):
+    return calendario([Concesion(*c) for c in concesiones], venta)
+
+
+@cacheado("graficos")
+def grafico_mapa_calor(socios, bloques, socio, eje_x, eje_y, paso):
+    combinaciones = combinaciones_pesos(len(bloques), 100, paso)
+    reparto_socio = barrido_socio(socios.puntuaciones, socios.blindado, combinaciones, socio)
+    mapa = mapa_calor(combinaciones, reparto_socio, eje_x, eje_y, 100, paso)
+    return graficos.mapa_calor(mapa, f"{bloques[eje_x]} (%)", f"{bloques[eje_y]} (%)", "% Final Normalizado medio")
+
+
+AGREGADOS_SHAPLEY = {"suma": "Suma", "maximo": "Máximo del equipo", "saturado": "Suma con tope 100"}
 
 st.title("Reparto de Participaciones y Valoración de Proyecto")
 
 st.markdown("Esta herramienta permite calcular participaciones con lógica por bloques, porcentajes blindados, inversores y estimación de valoración del negocio.")
 
 # Pesos configurables
-st.sidebar.header("Pesos por Bloque")
-pesos = {
-    "Concepto, Idea e IP Fundacional": st.sidebar.slider("Concepto (%)", 0, 100, 30),
-    "Inversión Económica Inicial": st.sidebar.slider("Inversión (%)", 0, 100, 30),
-    "Operaciones y Gestión": st.sidebar.slider("Operaciones (%)", 0, 100, 25),
-    "Estrategia, Dirección, Marketing": st.sidebar.slider("Estrategia (%)", 0, 100, 15)
-}
-
-total_peso = sum(pesos.values())
-if total_peso != 100:
-    st.sidebar.error(f"La suma de pesos debe ser 100%. Ahora suma: {total_peso}%")
-
-st.subheader("Datos de Socios")
-num_socios = st.number_input("Número de socios", min_value=1, max_value=10, value=4)
-socios_data = []
-
-for i in range(num_socios):
-    nombre = st.text_input(f"Nombre del socio {i+1}", key=f"nombre_{i}")
-    bloque_vals = []
-    for bloque in pesos:
-        val = st.slider(f"{bloque} - {nombre}", 0, 100, 0, key=f"bloque_{bloque}_{i}")
-        bloque_vals.append(val)
-    blindado = st.number_input(f"% Blindado para {nombre}", min_value=0.0, max_value=100.0, value=0.0, key=f"blindado_{i}")
-    socios_data.append([nombre] + bloque_vals + [blindado])
-
-if st.button("Calcular Participaciones"):
-    columnas = ["Socio"] + list(pesos.keys()) + ["% Blindado"]
-    df = pd.DataFrame(socios_data, columns=columnas)
-
-    for b in pesos:
-        df[f"{b} (%)"] = (df[b] / 100) * pesos[b]
-    df["Participación Técnica"] = df[[f"{b} (%)" for b in pesos]].sum(axis=1)
-    df["% Final Bruto"] = df["Participación Técnica"] + df["% Blindado"]
-    total = df["% Final Bruto"].sum()
-    df["% Final Normalizado"] = df["% Final Bruto"] / total * 100
+modelo = cargar_bloques()
+pesos = sliders_pesos(modelo)
+
+graficos_nativos = st.sidebar.checkbox("Gráficos nativos (más ligeros)")
+perfil = activar_perfilado()
+
+with perfil.etapa("widgets"):
+    st.subheader("Datos de Socios")
+    modo_entrada = st.radio("Entrada de socios", ["Formulario", "Importar fichero", "Editor en tabla"], horizontal=True)
+    socios = None
+
+    if modo_entrada == "Formulario":
+        num_socios = st.number_input("Número de socios", min_value=1, max_value=10, value=4)
+        socios = TablaSocios.vacia(num_socios, len(pesos))
+
+        for i in range(num_socios):
+            nombre = st.text_input(f"Nombre del socio {i+1}", key=f"nombre_{i}")
+            for j, bloque in enumerate(pesos):
+                socios.puntuaciones[i, j] = st.slider(f"{bloque} - {nombre}", 0, 100, 0, key=f"bloque_{bloque}_{i}")
+            socios.blindado[i] = st.number_input(f"% Blindado para {nombre}", min_value=0.0, max_value=100.0, value=0.0, key=f"blindado_{i}")
+            socios.nombres[i] = nombre
+    else:
+        try:
+            if modo_entrada == "Importar fichero":
+                st.caption("Columnas: Socio, una por bloque (0-100), % Blindado y, opcionalmente, Horas y Coste hora. Acepta CSV, XLSX o JSONL.")
+                fichero = st.file_uploader("Fichero de socios", type=["csv", "xlsx", "jsonl"])
+                tabla_socios = importar_socios(fichero.getvalue(), fichero.name, list(pesos)) if fichero else None
+            else:
+                import pandas as pd
+
+                editor = st.data_editor(
+                    pd.DataFrame([[f"Socio {i+1}", *[0] * len(pesos), 0.0, 0, 0.0] for i in range(4)], columns=["Socio", *pesos, "% Blindado", "Horas", "Coste hora"]),
+                    num_rows="dynamic",
+                    key="editor_socios",
+                )
+                tabla_socios = socios_desde_registros(editor.to_dict("records"), list(pesos))
+        except ErrorImportacion as exc:
+            st.error("⚠️ Hay errores en los datos de socios:\n\n" + "\n".join(f"- {e}" for e in exc.errores))
+            tabla_socios = None
+        if tabla_socios is not None:
+            socios = tabla_socios
+            st.write(f"Socios cargados: **{len(socios):,}**")
+
+hay_socios = socios is not None and len(socios) > 0
+if st.button("Calcular Participaciones", disabled=not hay_socios):
+    st.session_state["mostrar_resultados"] = True
+
+if hay_socios and st.session_state.get("mostrar_resultados"):
+    with perfil.etapa("tabla"):
+        df = calcular_tabla(socios, pesos)
 
     st.subheader("Resultados")
     st.dataframe(df[["Socio"] + [f"{b} (%)" for b in pesos] + ["Participación Técnica", "% Blindado", "% Final Bruto", "% Final Normalizado"]])
 
-    fig, ax = plt.subplots()
-    ax.pie(df["% Final Normalizado"], labels=df["Socio"], autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    st.pyplot(fig)
+    if df["% Final Normalizado"].sum() <= 0:
+        st.warning("⚠️ No hay datos válidos para graficar. Verifica las puntuaciones de los socios.")
+    elif graficos_nativos:
+        st.vega_lite_chart(graficos.especificacion_tarta(*graficos.agrupar_resto(df["Socio"], df["% Final Normalizado"])))
+    else:
+        with perfil.etapa("grafico"):
+            st.image(grafico_tarta(socios, pesos))
+
+    with perfil.etapa("exportacion_csv"):
+        st.download_button("Descargar como CSV", data=exportar_csv(socios, pesos), file_name="reparto_socios.csv", mime="text/csv")
+
+    # -------- BLOQUE SENSIBILIDAD DE PESOS --------
+    paso = None
+    if st.checkbox("Análisis de sensibilidad de pesos"):
+        bloques_superiores = modelo.superiores
+        paso = st.select_slider("Paso de la rejilla de pesos (%)", options=[1, 2, 5, 10], value=1 if len(bloques_superiores) <= 4 else 10)
+        n_combinaciones = numero_combinaciones(len(bloques_superiores), 100, paso)
+        st.write(f"Combinaciones de pesos evaluadas: **{n_combinaciones:,}**" + (" (sobre los bloques de primer nivel, con el reparto actual dentro de cada uno)" if modelo.anidado else ""))
+        if n_combinaciones > MAX_COMBINACIONES:
+            st.warning(f"⚠️ Con {len(bloques_superiores)} bloques hay demasiadas combinaciones; usa un paso mayor o agrupa los bloques en sub-bloques.")
+            paso = None
+    if paso is not None:
+        superiores = socios_superiores(socios, pesos, modelo)
+
+        def tabla_bandas(bandas):
+            bandas_df = df[["Socio"]].assign(Actual=df["% Final Normalizado"], Mínimo=bandas.minimo)
+            for nivel, valores in zip(bandas.niveles, bandas.cuantiles):
+                bandas_df[f"P{nivel * 100:g}"] = valores
+            bandas_df["Máximo"] = bandas.maximo
+            st.dataframe(bandas_df)
+
+        with perfil.etapa("barrido"):
+            trabajo = seguir_trabajo("barrido", calcular_bandas, superiores, paso, etiqueta="Barrido de pesos", parcial=tabla_bandas)
+        if trabajo is not None and trabajo.estado == TERMINADO:
+            tabla_bandas(trabajo.resultado)
 
-    st.download_button("Descargar como CSV", data=df.to_csv(index=False), file_name="reparto_socios.csv", mime="text/csv")
+        col_socio, col_x, col_y = st.columns(3)
+        socio = col_socio.selectbox("Socio", range(len(socios)), format_func=lambda i: df["Socio"][i] or f"Socio {i+1}")
+        eje_x = col_x.selectbox("Eje X", range(len(bloques_superiores)), format_func=lambda j: bloques_superiores[j])
+        eje_y = col_y.selectbox("Eje Y", range(len(bloques_superiores)), index=min(1, len(bloques_superiores) - 1), format_func=lambda j: bloques_superiores[j])
+        if eje_x == eje_y:
+            st.warning("⚠️ Elige dos bloques distintos para el mapa de calor.")
+        else:
+            with perfil.etapa("mapa_calor"):
+                st.image(grafico_mapa_calor(superiores, bloques_superiores, socio, eje_x, eje_y, paso))
+
+    # -------- BLOQUE CONTRIBUCIÓN MARGINAL --------
+    if st.checkbox("Contribución marginal (Shapley)"):
+        st.markdown("Reparte según lo que cada socio añade de media a cada posible equipo. Elige cómo se combinan las puntuaciones de un equipo en cada bloque.")
+        columnas = st.columns(min(len(pesos), 4))
+        agregados = [
+            columnas[j % len(columnas)].selectbox(b, list(AGREGADOS_SHAPLEY), format_func=AGREGADOS_SHAPLEY.get, key=f"agregado_{b}")
+            for j, b in enumerate(pesos)
+        ]
+        peso_trabajo = 0
+        if socios.trabajo.any():
+            peso_trabajo = st.slider("Peso del trabajo aportado (horas x coste)", 0, 100, 0)
+        with perfil.etapa("shapley"):
+            estimacion = calcular_shapley(socios, pesos, agregados, peso_trabajo)
+        shapley_df = df[["Socio"]].assign(**{
+            "Shapley": estimacion.valores,
+            "± IC 95%": estimacion.error,
+            "% Shapley": normalizar(estimacion.valores + df["% Blindado"].to_numpy()),
+            "% Final Normalizado": df["% Final Normalizado"],
+        })
+        st.dataframe(shapley_df)
+        if estimacion.exacto:
+            st.caption(f"Cálculo exacto sobre las {2 ** len(socios):,} coaliciones posibles.")
+        else:
+            st.caption(f"Estimación con {estimacion.permutaciones:,} permutaciones aleatorias (intervalo de confianza al 95%).")
+
+    # -------- BLOQUE VESTING --------
+    if st.checkbox("Calendario de vesting"):
+        import pandas as pd
+
+        st.markdown("Cada socio consolida su % final por meses desde su fecha de inicio. Al salir, lo no consolidado (y lo recomprado) vuelve al pool.")
+        hoy = pd.Timestamp.today().normalize()
+        defecto = {
+            "Inicio": hoy,
+            "Cliff (meses)": 12,
+            "Duración (meses)": 48,
+            "Aceleración (%)": 0.0,
+            "Disparo": "simple",
+            "Salida": pd.NaT,
+            "Recompra (%)": 0.0,
+        }
+        vesting_df = st.data_editor(
+            df[["Socio"]].assign(**defecto),
+            column_config={
+                "Inicio": st.column_config.DateColumn("Inicio", required=True),
+                "Salida": st.column_config.DateColumn("Salida"),
+                "Disparo": st.column_config.SelectboxColumn("Disparo", options=["simple", "doble"], required=True),
+                "Aceleración (%)": st.column_config.NumberColumn(min_value=0.0, max_value=100.0),
+                "Recompra (%)": st.column_config.NumberColumn(min_value=0.0, max_value=100.0),
+            },
+            disabled=["Socio"],
+            hide_index=True,
+            key="vesting",
+        )
+        # Una celda vaciada en el editor llega como NaN: se usa el valor por defecto.
+        obligatorias = [c for c in defecto if c != "Salida"]
+        incompletos = vesting_df[obligatorias].isna().any(axis=1)
+        if incompletos.any():
+            nombres = [s or f"Socio {i+1}" for i, s in enumerate(vesting_df["Socio"])]
+            st.warning("⚠️ Celdas vacías en " + ", ".join(n for n, falta in zip(nombres, incompletos) if falta) + ": se usan los valores por defecto.")
+            vesting_df = vesting_df.fillna({c: defecto[c] for c in obligatorias})
+        con_venta = st.checkbox("Venta de la empresa (dispara la aceleración)")
+        venta = str(st.date_input("Fecha de venta", value=hoy + pd.DateOffset(years=3))) if con_venta else None
+        concesiones = [
+            (
+                socio or f"Socio {i+1}", float(pct), str(pd.Timestamp(inicio).date()), int(cliff), int(duracion),
+                float(aceleracion) / 100, disparo, None if pd.isna(salida) else str(pd.Timestamp(salida).date()), float(recompra) / 100,
+            )
+            for i, (socio, pct, inicio, cliff, duracion, aceleracion, disparo, salida, recompra) in enumerate(zip(
+                vesting_df["Socio"], df["% Final Normalizado"], vesting_df["Inicio"], vesting_df["Cliff (meses)"],
+                vesting_df["Duración (meses)"], vesting_df["Aceleración (%)"], vesting_df["Disparo"], vesting_df["Salida"], vesting_df["Recompra (%)"],
+            ))
+        ]
+        with perfil.etapa("vesting"):
+            cal = calcular_vesting(concesiones, venta)
+
+        fecha = st.date_input("Tabla de capital a fecha", value=hoy)
+        estado = foto(cal, str(fecha))
+        st.dataframe(df[["Socio"]].assign(**{
+            "% Concedido": cal.cantidad,
+            "% Consolidado": estado.consolidado,
+            "% Pendiente": estado.pendiente,
+            "% Devuelto al pool": estado.devuelto,
+        }))
+        st.write(f"Pool recuperado a {fecha:%d/%m/%Y}: **{float(estado.pool):.2f}%**")
+        # Con muchos socios se dibuja solo el total consolidado.
+        if len(concesiones) <= 20:
+            evolucion = pd.DataFrame(cal.consolidado.T, index=cal.meses.astype("datetime64[ns]"), columns=[c[0] for c in concesiones])
+        else:
+            evolucion = pd.DataFrame({"Consolidado": cal.consolidado.sum(axis=0)}, index=cal.meses.astype("datetime64[ns]"))
+        st.line_chart(evolucion.assign(Pool=cal.devuelto.sum(axis=0)))
 
     # -------- BLOQUE VALORACIÓN PRE-MONEY --------
     st.header("Estimación de valoración pre-money")
@@ -106,3 +354,42 @@ if st.button("Calcular Participaciones"):
             st.warning("⚠️ La participación del inversor supera el % disponible. Revisa condiciones o renegocia participación de socios.")
         else:
             st.success("✅ Participación del inversor posible dentro del % disponible.")
+
+    # -------- BLOQUE EXPORTACIÓN EXCEL --------
+    st.header("Exportar a Excel")
+    valoracion = {
+        "Horas dedicadas por el equipo": horas_trabajadas,
+        "Valor estimado por hora (€)": coste_hora,
+        "Gastos directos (€)": inversion_gastos,
+        "Valor por coste (€)": valor_coste,
+        "Usuarios de pago estimados": usuarios_pro,
+        "Precio mensual por usuario (€)": precio_mensual,
+        "Margen estimado (%)": margen_neto,
+        "Valor por potencial (€)": valor_potencial,
+        "Valoración pre-money (€)": valor_final,
+        "Aportación del inversor (€)": aportacion,
+    }
+    if valor_negocio > 0 and aportacion > 0:
+        valoracion["Participación del inversor (%)"] = participacion_inversor
+    incluir_barrido = paso is not None and st.checkbox("Incluir el barrido completo (una fila por combinación de pesos)")
+    if st.checkbox("Preparar libro Excel"):
+        with perfil.etapa("exportacion_excel"):
+            trabajo = seguir_trabajo("excel", exportar_excel, socios, pesos, modelo, valoracion, paso, incluir_barrido, etiqueta="Preparando el libro")
+        if trabajo is not None and trabajo.estado == TERMINADO:
+            st.download_button(
+                "Descargar Excel",
+                data=trabajo.resultado,
+                file_name="reparto_socios.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
+with st.sidebar.expander("Estadísticas de caché"):
+    estadisticas = CACHE.estadisticas()
+    if estadisticas:
+        import pandas as pd
+
+        st.dataframe(pd.DataFrame(estadisticas).T)
+    else:
+        st.caption("Sin actividad todavía.")
+
+panel_perfilado(perfil)
@@ -0,0 +1,4 @@
+"""Benchmarks de los núcleos de cálculo y de la latencia de rerun de la app.
+
+Uso: ``python -m benchmarks [--solo micro|e2e] [--sin-historial]``.
+"""
@@ -0,0 +1,107 @@
+"""Ejecuta los benchmarks, guarda el historial y detecta regresiones.
+
+Cada ejecución añade una línea JSON por medida a ``historial.jsonl`` con la
+fecha, el commit y la máquina. Hay regresión si una medida supera su
+presupuesto absoluto en ``umbrales.json`` o si es más lenta que
+``--tolerancia`` veces la mediana de las últimas ejecuciones en la misma
+máquina. El código de salida es 1 si hay alguna regresión.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+DIRECTORIO = Path(__file__).resolve().parent
+HISTORIAL = DIRECTORIO / "historial.jsonl"
+UMBRALES = DIRECTORIO / "umbrales.json"
+VENTANA = 5
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=DIRECTORIO, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _maquina() -> str:
+    return f"{platform.node()}/{platform.machine()}/py{platform.python_version()}"
+
+
+def _historial(ruta: Path, maquina: str) -> dict:
+    previas = {}
+    if ruta.exists():
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                r = json.loads(linea)
+                if r.get("maquina") == maquina:
+                    previas.setdefault(r["nombre"], []).append(r["segundos"])
+    return previas
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--solo", choices=["micro", "e2e", "arranque"], help="ejecuta solo una de las partes")
+    parser.add_argument("--tolerancia", type=float, default=1.3, help="ratio máximo frente a la mediana histórica (por defecto 1.3)")
+    parser.add_argument("--historial", type=Path, default=HISTORIAL)
+    parser.add_argument("--sin-historial", action="store_true", help="no añade los resultados al historial")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(DIRECTORIO.parent))
+    medidas = []
+    if args.solo in (None, "micro"):
+        from benchmarks import micro
+
+        medidas += micro.ejecutar()
+    if args.solo in (None, "e2e"):
+        from benchmarks import e2e
+
+        medidas += e2e.ejecutar()
+    if args.solo in (None, "arranque"):
+        from benchmarks import arranque
+
+        medidas += arranque.ejecutar()
+
+    maquina = _maquina()
+    previas = _historial(args.historial, maquina)
+    umbrales = json.loads(UMBRALES.read_text(encoding="utf-8")) if UMBRALES.exists() else {}
+    fecha = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    commit = _commit()
+
+    regresiones = []
+    print(f"{'benchmark':<45} {'mediana':>12} {'mínimo':>12} {'pico MB':>9}  estado")
+    for m in medidas:
+        estado = "ok"
+        presupuesto = umbrales.get(m.nombre)
+        referencia = statistics.median(previas[m.nombre][-VENTANA:]) if m.nombre in previas else None
+        if presupuesto is not None and m.segundos > presupuesto:
+            estado = f"REGRESIÓN: supera el presupuesto de {presupuesto * 1e3:.3f} ms"
+        elif referencia is not None and m.segundos > args.tolerancia * referencia:
+            estado = f"REGRESIÓN: x{m.segundos / referencia:.2f} frente a la mediana histórica"
+        if estado != "ok":
+            regresiones.append(m.nombre)
+        pico = f"{m.pico_bytes / 1e6:.2f}" if m.pico_bytes else "-"
+        print(f"{m.nombre:<45} {m.segundos * 1e3:>9.3f} ms {m.minimo * 1e3:>9.3f} ms {pico:>9}  {estado}")
+
+    if not args.sin_historial:
+        with open(args.historial, "a", encoding="utf-8") as f:
+            for m in medidas:
+                f.write(json.dumps({
+                    "fecha": fecha, "commit": commit, "maquina": maquina, **m._asdict(),
+                }, ensure_ascii=False) + "\n")
+
+    if regresiones:
+        print(f"\n{len(regresiones)} regresiones detectadas.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Benchmark de arranque en frío del punto de entrada.
+
+Cada repetición lanza un intérprete nuevo, importa el arnés de Streamlit y
+mide el primer rerun de ``streamlit_app.py`` (importaciones de la página
+incluidas), que es lo que espera un usuario tras escalar desde cero. La
+precarga se desactiva para medir solo el camino crítico y se comprueba que el
+primer pintado no importa ningún módulo pesado.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+from benchmarks.medicion import Medida
+
+RAIZ = Path(__file__).resolve().parent.parent
+REPETICIONES = 5
+TIEMPO_MAXIMO = 120
+
+_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+t = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+segundos = time.perf_counter() - t
+pesados = [m for m in ("pandas", "matplotlib", "xlsxwriter") if m in sys.modules]
+print(json.dumps({"segundos": segundos, "pesados": pesados, "excepciones": [e.message for e in at.exception]}))
+"""
+
+
+def _primer_pintado(directorio: str) -> dict:
+    entorno = {**os.environ, "REPARTO_PRECARGA": "0", "PYTHONPATH": str(RAIZ)}
+    salida = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, str(RAIZ / "streamlit_app.py"), str(TIEMPO_MAXIMO)],
+        cwd=directorio, env=entorno, capture_output=True, text=True, check=True, timeout=TIEMPO_MAXIMO,
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def ejecutar(repeticiones: int = REPETICIONES) -> List[Medida]:
+    nombre = "arranque/primer_pintado"
+    tiempos = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeticiones):
+            r = _primer_pintado(tmp)
+            if r["excepciones"]:
+                raise RuntimeError(f"{nombre}: {r['excepciones'][0]}")
+            if r["pesados"]:
+                raise RuntimeError(f"{nombre}: el primer pintado importa {', '.join(r['pesados'])}")
+            tiempos.append(r["segundos"])
+    return [Medida(nombre, statistics.median(tiempos), min(tiempos), repeticiones, 0)]
@@ -0,0 +1,95 @@
+"""Benchmarks de extremo a extremo con el arnés ``AppTest`` de Streamlit.
+
+Cada escenario reproduce interacciones reales (nombres, sliders, calcular) y
+mide la latencia de los reruns posteriores y el pico de memoria de Python.
+Las páginas que persisten datos se ejecutan en un directorio temporal para
+no dejar ficheros en el repositorio.
+"""
+
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+from benchmarks.medicion import Medida
+
+RAIZ = Path(__file__).resolve().parent.parent
+RERUNS = 10
+TIEMPO_MAXIMO = 120
+
+
+def _rellenar_socios(at, socios=4):
+    for i in range(socios):
+        at.text_input(key=f"nombre_{i}").input(f"Socio {i + 1}")
+        at.slider(key=f"bloque_Concepto, Idea e IP Fundacional_{i}").set_value(10 * (i + 1))
+        at.slider(key=f"bloque_Operaciones y Gestión_{i}").set_value(90 - 10 * i)
+    return at.run()
+
+
+def _calcular(at):
+    next(b for b in at.button if b.label == "Calcular Participaciones").click()
+    return at.run()
+
+
+def _medir_reruns(nombre: str, at, interaccion) -> Medida:
+    tiempos = []
+    tracemalloc.start()
+    try:
+        for i in range(RERUNS):
+            interaccion(at, i)
+            t = time.perf_counter()
+            at.run()
+            tiempos.append(time.perf_counter() - t)
+            if at.exception:
+                raise RuntimeError(f"{nombre}: {at.exception[0].message}")
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Medida(nombre, statistics.median(tiempos), min(tiempos), RERUNS, pico)
+
+
+def _app_reparto_full() -> List[Medida]:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RAIZ / "app_reparto_full.py"), default_timeout=TIEMPO_MAXIMO).run()
+    _calcular(_rellenar_socios(at))
+
+    def mover_peso(at, i):
+        at.sidebar.slider[0].set_value(20 + i)
+
+    medidas = [_medir_reruns("e2e/app_reparto_full/mover_peso", at, mover_peso)]
+
+    def mover_socio(at, i):
+        at.slider(key="bloque_Estrategia, Dirección, Marketing_0").set_value(i * 5)
+
+    medidas.append(_medir_reruns("e2e/app_reparto_full/mover_socio", at, mover_socio))
+    return medidas
+
+
+def _calculadora() -> List[Medida]:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(RAIZ / "Calculadora socisV2.py"), default_timeout=TIEMPO_MAXIMO).run()
+    for i in range(4):
+        at.text_input(key=f"nombre_{i}").input(f"Socio {i + 1}")
+        at.number_input(key=f"horas_{i}").set_value(100 * (i + 1))
+        at.number_input(key=f"coste_hora_{i}").set_value(30.0)
+    _calcular(at.run())
+
+    def cambiar_horas(at, i):
+        at.number_input(key="horas_0").set_value(100 + i)
+
+    return [_medir_reruns("e2e/calculadora/cambiar_horas", at, cambiar_horas)]
+
+
+def ejecutar() -> List[Medida]:
+    anterior = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            return _app_reparto_full() + _calculadora()
+        finally:
+            os.chdir(anterior)
@@ -0,0 +1,49 @@
+"""Utilidades comunes de medición."""
+
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+
+class Medida(NamedTuple):
+    nombre: str
+    segundos: float  # mediana por ejecución
+    minimo: float
+    repeticiones: int
+    pico_bytes: int
+
+
+def medir(nombre: str, funcion: Callable[[], object], repeticiones: int = 5, presupuesto: float = 0.2, memoria: bool = False) -> Medida:
+    """Mediana y mínimo por llamada, agrupando llamadas hasta llenar ``presupuesto`` segundos.
+
+    Con ``memoria`` se repite una llamada bajo tracemalloc para obtener el
+    pico de memoria de Python; se hace aparte para no contaminar los tiempos.
+    """
+    funcion()  # calentamiento
+    t = time.perf_counter()
+    funcion()
+    una = max(time.perf_counter() - t, 1e-9)
+    numero = max(1, int(presupuesto / una))
+    tiempos = []
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeticiones):
+            t = time.perf_counter()
+            for _ in range(numero):
+                funcion()
+            tiempos.append((time.perf_counter() - t) / numero)
+    finally:
+        if gc_activo:
+            gc.enable()
+    pico = 0
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion()
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return Medida(nombre, statistics.median(tiempos), min(tiempos), repeticiones * numero, pico)
@@ -0,0 +1,117 @@
+"""Micro-benchmarks de los núcleos de cálculo de ``reparto``."""
+
+import io
+from typing import List
+
+import numpy as np
+
+from benchmarks.medicion import Medida, medir
+from reparto.bloques import modelo_desde_dict
+from reparto.cache import clave
+from reparto.cascada import Titular, cascada
+from reparto.incremental import RepartoIncremental
+from reparto.partes import PartesHoras
+from reparto.shapley import funcion_valor, shapley_exacto, shapley_muestreo
+from reparto.socios import TablaSocios
+from reparto.motor import PESOS_DEFECTO, normalizar, reparto_bloques, tabla_reparto
+from reparto.valoracion import participacion_inversor, valoracion_pre_money
+from reparto.vesting import Concesion, calendario, foto
+
+TAMANOS = (10, 1_000, 100_000)
+SOCIOS_POR_ESCENARIO = 10
+
+
+def ejecutar(tamanos=TAMANOS) -> List[Medida]:
+    rng = np.random.default_rng(0)
+    medidas = []
+    for n in tamanos:
+        # Un escenario con n socios
+        puntuaciones = rng.integers(0, 101, (n, len(PESOS_DEFECTO)))
+        blindado = rng.uniform(0, 5, n)
+        medidas.append(medir(f"reparto_bloques/socios={n}", lambda: reparto_bloques(puntuaciones, PESOS_DEFECTO, blindado)))
+
+        # n escenarios de 10 socios, cada uno con sus propios pesos
+        lote = rng.integers(0, 101, (n, SOCIOS_POR_ESCENARIO, len(PESOS_DEFECTO)))
+        pesos = rng.dirichlet(np.ones(len(PESOS_DEFECTO)), n) * 100
+        blindados = rng.uniform(0, 5, (n, SOCIOS_POR_ESCENARIO))
+        medidas.append(medir(f"reparto_bloques/escenarios={n}", lambda: reparto_bloques(lote, pesos, blindados), memoria=True))
+
+        bruto = rng.uniform(0, 100, (n, SOCIOS_POR_ESCENARIO))
+        medidas.append(medir(f"normalizar/escenarios={n}", lambda: normalizar(bruto)))
+
+        entradas = [
+            rng.integers(0, 1_000, n), rng.uniform(10, 100, n), rng.uniform(0, 10_000, n),
+            rng.integers(0, 5_000, n), rng.uniform(1, 50, n), rng.uniform(0, 100, n),
+        ]
+        medidas.append(medir(f"valoracion_pre_money/escenarios={n}", lambda: valoracion_pre_money(*entradas)))
+
+        pre_money = rng.uniform(1e4, 1e7, n)
+        aportacion = rng.uniform(1e3, 1e6, n)
+        medidas.append(medir(f"participacion_inversor/escenarios={n}", lambda: participacion_inversor(aportacion, pre_money)))
+
+    # Cascada de salida: 50 titulares con preferencias variadas sobre 10.000 valores
+    titulares = [
+        Titular(f"T{i}", 2.0, (i % 3) * 1e5, 1 + i % 2, i % 4 == 1, (None, 2.0, 3.0)[i % 3], i % 3)
+        for i in range(50)
+    ]
+    valores = np.linspace(0, 5e7, 10_000)
+    medidas.append(medir("cascada/valores=10000", lambda: cascada(titulares, valores)))
+
+    # Shapley: exacto en el límite de 20 socios y por muestreo con 1.000
+    agregados = ["suma", "maximo", "saturado", "maximo"]
+    exacto = funcion_valor(rng.integers(0, 101, (20, len(PESOS_DEFECTO))), PESOS_DEFECTO, agregados)
+    medidas.append(medir("shapley_exacto/socios=20", lambda: shapley_exacto(exacto), repeticiones=3))
+    muestreo = funcion_valor(rng.integers(0, 101, (1_000, len(PESOS_DEFECTO))), PESOS_DEFECTO, agregados)
+    medidas.append(medir("shapley_muestreo/socios=1000", lambda: shapley_muestreo(muestreo, semilla=0), repeticiones=3))
+
+    # Tabla de 1.000 socios x 50 bloques tras mover una puntuación: incremental frente a completa
+    puntuaciones = rng.integers(0, 101, (1_000, 50)).astype(float)
+    pesos, blindado = np.full(50, 2.0), np.zeros(1_000)
+    nombres, bloques = [f"S{i}" for i in range(1_000)], [f"B{j}" for j in range(50)]
+    modelo = RepartoIncremental(puntuaciones, pesos, blindado)
+    modelo.tabla(nombres, bloques)
+
+    def mover_puntuacion():
+        # Como el on_change de un slider: solo se aplica la celda movida.
+        puntuaciones[7, 3] = 100 - puntuaciones[7, 3]
+        modelo.fijar_puntuacion(7, 3, puntuaciones[7, 3])
+        return modelo.tabla(nombres, bloques)
+
+    medidas.append(medir("incremental/socios=1000,bloques=50", mover_puntuacion))
+    medidas.append(medir("tabla_reparto/socios=1000,bloques=50", lambda: tabla_reparto(nombres, puntuaciones, pesos, blindado, bloques)))
+
+    # 60 bloques anidados (6 x 10 sub-bloques) y 5.000 socios en columnas densas:
+    # pesos efectivos, reparto con la tabla completa y clave de caché
+    modelo = modelo_desde_dict({"bloques": [
+        {"nombre": f"B{i}", "peso": 100 / 6, "subbloques": [{"nombre": f"S{k}", "peso": k + 1} for k in range(10)]}
+        for i in range(6)
+    ]})
+    socios = TablaSocios([f"S{i}" for i in range(5_000)], rng.integers(0, 101, (5_000, len(modelo.hojas))), rng.uniform(0, 5, 5_000))
+    pesos_sub = {f"B{i} / S{k}": 10 - k for i in range(6) for k in range(10)}
+    medidas.append(medir("bloques/pesos_hojas,hojas=60", lambda: modelo.pesos_hojas(pesos_sub)))
+    medidas.append(medir(
+        "bloques/tabla,socios=5000,hojas=60",
+        lambda: tabla_reparto(socios.nombres, socios.puntuaciones, modelo.pesos_hojas(pesos_sub), socios.blindado, modelo.hojas),
+        memoria=True,
+    ))
+    medidas.append(medir("bloques/clave,socios=5000,hojas=60", lambda: clave(socios, dict(zip(modelo.hojas, modelo.pesos.tolist())))))
+
+    # Partes de horas: 200.000 filas de CSV en tandas de 50.000, memoria incluida
+    n = 200_000
+    fechas = np.datetime64("2024-01-01") + np.sort(rng.integers(0, 365, n))
+    csv = ("socio,fecha,horas,tarifa,categoria\n" + "".join(
+        f"S{s},{f},{h:.2f},{t:g},{c}\n"
+        for s, f, h, t, c in zip(rng.integers(0, 20, n), fechas.astype(str), rng.uniform(0.5, 8, n), rng.choice([30, 45, 60], n), rng.choice(["Concepto", "Operaciones", "Estrategia"], n))
+    )).encode()
+    medidas.append(medir(f"partes/filas={n}", lambda: PartesHoras().ingerir(io.BytesIO(csv), "csv", filas_por_tanda=50_000), repeticiones=3, memoria=True))
+
+    # Vesting: 5.000 concesiones a 10 años con salidas y aceleración; la foto a una fecha es un índice
+    inicios = np.datetime64("2020-01") + rng.integers(0, 60, 5_000).astype("timedelta64[M]")
+    concesiones = [
+        Concesion(f"S{i}", 1.0, inicios[i], 12, 120, 0.25, "simple", inicios[i] + 30 if i % 7 == 0 else None)
+        for i in range(5_000)
+    ]
+    medidas.append(medir("vesting/concesiones=5000", lambda: calendario(concesiones, venta="2027-03-01"), repeticiones=3))
+    cal = calendario(concesiones, venta="2027-03-01")
+    medidas.append(medir("vesting/foto", lambda: foto(cal, "2026-06-15")))
+    return medidas
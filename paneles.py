@@ -0,0 +1,174 @@
+"""Paneles compartidos por las páginas de Streamlit."""
+
+import uuid
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import streamlit as st
+
+from reparto.bloques import ModeloBloques
+from reparto.cache import CACHE, clave
+from reparto.incremental import RepartoIncremental
+from reparto.perfil import Perfilador
+from reparto.socios import TablaSocios
+from reparto.trabajos import ACTIVOS, FALLIDO, TRABAJOS, Trabajo
+
+INTERVALO_TRABAJOS = 0.5  # segundos entre refrescos del progreso
+
+
+def activar_perfilado() -> Perfilador:
+    """Perfilador de la sesión, activo solo si el usuario lo pide en la barra lateral."""
+    perfil = st.session_state.setdefault("perfilador", Perfilador())
+    perfil.activo = st.sidebar.checkbox("⏱️ Perfilado de etapas", key="perfilado")
+    perfil.contar("reruns")
+    return perfil
+
+
+def sliders_pesos(modelo: ModeloBloques, guardados: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+    """Sliders de pesos en la barra lateral y peso efectivo (%) de cada hoja.
+
+    Los bloques de primer nivel van en la barra y los sub-bloques en un
+    desplegable por bloque padre. ``guardados`` son los pesos efectivos de
+    las hojas de una sesión anterior.
+    """
+    st.sidebar.header("Pesos por Bloque")
+    defecto = modelo.pesos_nodos(guardados or {})
+    valores = {b.nombre: st.sidebar.slider(f"{b.etiqueta} (%)", 0, 100, int(round(defecto[b.nombre]))) for b in modelo.bloques}
+    for b, _ in modelo.nodos():
+        if b.subbloques:
+            with st.sidebar.expander(f"Reparto dentro de {b.etiqueta}"):
+                for s in b.subbloques:
+                    valores[s.nombre] = st.slider(f"{s.etiqueta} (%)", 0, 100, int(round(defecto[s.nombre])), key=f"peso_{s.nombre}")
+    total_peso = sum(valores[b.nombre] for b in modelo.bloques)
+    if total_peso != 100:
+        st.sidebar.error(f"La suma de pesos debe ser 100%. Ahora suma: {total_peso}%")
+    return dict(zip(modelo.hojas, modelo.pesos_hojas(valores).tolist()))
+
+
+def _aplicar_celda(metodo: str, clave_widget: str, *indices: int) -> None:
+    """``on_change`` de un widget de socio: aplica solo su celda al reparto de la sesión."""
+    guardado = st.session_state.get("reparto_incremental")
+    if guardado is None:
+        return
+    modelo = guardado[1]
+    if indices[0] < len(modelo.bruto) and indices[-1] < modelo.puntuaciones.shape[1]:
+        getattr(modelo, metodo)(*indices, float(st.session_state[clave_widget]))
+
+
+def formulario_socios(pesos: Mapping[str, float]) -> Tuple[TablaSocios, RepartoIncremental]:
+    """Formulario de socios y reparto incremental de la sesión.
+
+    Cada slider y cada blindado aplica su cambio al modelo en su
+    ``on_change``, antes del rerun, así que el script solo compara los pesos.
+    El modelo se rehace si cambian los socios o los bloques.
+    """
+    num_socios = st.number_input("Número de socios", min_value=1, max_value=10, value=4)
+    socios = TablaSocios.vacia(num_socios, len(pesos))
+
+    for i in range(num_socios):
+        nombre = st.text_input(f"Nombre del socio {i+1}", key=f"nombre_{i}")
+        for j, bloque in enumerate(pesos):
+            k = f"bloque_{bloque}_{i}"
+            socios.puntuaciones[i, j] = st.slider(
+                f"{bloque} - {nombre}", 0, 100, 0, key=k, on_change=_aplicar_celda, args=("fijar_puntuacion", k, i, j)
+            )
+        k = f"blindado_{i}"
+        socios.blindado[i] = st.number_input(
+            f"% Blindado para {nombre}", min_value=0.0, max_value=100.0, value=0.0, key=k, on_change=_aplicar_celda, args=("fijar_blindado", k, i)
+        )
+        socios.nombres[i] = nombre
+
+    bloques = tuple(pesos)
+    guardado = st.session_state.get("reparto_incremental")
+    if guardado is None or guardado[0] != bloques or len(guardado[1].bruto) != num_socios:
+        guardado = (bloques, RepartoIncremental(socios.puntuaciones, list(pesos.values()), socios.blindado))
+        st.session_state["reparto_incremental"] = guardado
+    modelo = guardado[1]
+    modelo.fijar_pesos(list(pesos.values()))
+    return socios, modelo
+
+
+def panel_perfilado(perfil: Perfilador, **servidor) -> None:
+    """Tiempos p50/p95 por etapa, contadores y exportación de las muestras.
+
+    Las etapas y contadores de ``perfil`` son de la sesión; ``servidor`` son
+    totales del proceso (como los aciertos de la caché, que comparten todas
+    las sesiones) y se muestran aparte.
+    """
+    if not perfil.activo:
+        return
+    import pandas as pd
+
+    totales = {
+        "aciertos de caché": sum(e["aciertos"] for e in CACHE.estadisticas().values()),
+        "trabajos activos": TRABAJOS.activos(),
+    }
+    totales.update((nombre.replace("_", " "), valor) for nombre, valor in servidor.items())
+    with st.sidebar.expander("Perfilado", expanded=True):
+        resumen = perfil.resumen()
+        if resumen:
+            st.dataframe(pd.DataFrame(resumen).T.sort_values("p95 ms", ascending=False))
+        st.dataframe(pd.Series(perfil.contadores(), name="sesión"))
+        st.caption("Totales del servidor (todas las sesiones)")
+        st.dataframe(pd.Series(totales, name="servidor"))
+        st.download_button("Exportar muestras (JSONL)", data=perfil.exportar_jsonl(), file_name="perfil.jsonl", mime="application/jsonl")
+        if st.button("Reiniciar perfilado"):
+            perfil.limpiar()
+
+
+def seguir_trabajo(
+    nombre: str,
+    funcion: Callable[..., Any],
+    *args,
+    etiqueta: str = "Calculando",
+    parcial: Optional[Callable[[Any], None]] = None,
+) -> Optional[Trabajo]:
+    """Lanza ``funcion(*args)`` en segundo plano, o se engancha al trabajo ya lanzado.
+
+    El identificador queda en ``st.session_state[f"trabajo_{nombre}"]``: un
+    rerun con las mismas entradas retoma el trabajo en marcha y, si cambian,
+    la sesión deja el anterior, que se cancela si ninguna otra lo sigue.
+    Mientras dura, un fragmento refresca el progreso (y ``parcial`` con el
+    último resultado parcial) sin rerun de la página, y la relanza al
+    terminar. Devuelve ``None`` si el usuario lo ha cancelado.
+    """
+    original = getattr(funcion, "__wrapped__", funcion)
+    clave_trabajo = clave(f"{original.__code__.co_filename}:{original.__qualname__}", *args)
+    cancelados = st.session_state.setdefault("trabajos_cancelados", set())
+    if clave_trabajo in cancelados:
+        st.info(f"{etiqueta}: cancelado.")
+        if st.button("Volver a lanzar", key=f"relanzar_{nombre}"):
+            cancelados.discard(clave_trabajo)
+            st.rerun()
+        return None
+
+    # Los trabajos son del proceso: la sesión se apunta para no cancelar los de otras.
+    suscriptor = st.session_state.setdefault("suscriptor_trabajos", uuid.uuid4().hex)
+    anterior = st.session_state.get(f"trabajo_{nombre}")
+    id_trabajo = TRABAJOS.enviar(clave_trabajo, funcion, *args, suscriptor=suscriptor)
+    if anterior is not None and anterior != id_trabajo:
+        TRABAJOS.cancelar(anterior, suscriptor)
+    st.session_state[f"trabajo_{nombre}"] = id_trabajo
+    trabajo = TRABAJOS.estado(id_trabajo)
+
+    if trabajo.estado == FALLIDO:
+        st.error(f"{etiqueta}: {trabajo.error}")
+        if st.button("Reintentar", key=f"reintentar_{nombre}"):
+            TRABAJOS.enviar(clave_trabajo, funcion, *args, reintentar=True, suscriptor=suscriptor)
+            st.rerun()
+    elif trabajo.estado in ACTIVOS:
+
+        @st.fragment(run_every=INTERVALO_TRABAJOS)
+        def progreso():
+            actual = TRABAJOS.estado(id_trabajo)
+            if actual is None or actual.estado not in ACTIVOS:
+                st.rerun()
+            st.progress(actual.progreso, text=f"{etiqueta}… {actual.mensaje}")
+            if parcial is not None and actual.parcial is not None:
+                parcial(actual.parcial)
+            if st.button("Cancelar", key=f"cancelar_{nombre}"):
+                TRABAJOS.cancelar(id_trabajo, suscriptor)
+                cancelados.add(clave_trabajo)
+                st.rerun()
+
+        progreso()
+    return trabajo
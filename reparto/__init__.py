@@ -0,0 +1,21 @@
+"""Lógica de reparto de participaciones sin dependencias de Streamlit."""
+
+from reparto.motor import (
+    BLOQUES,
+    PESOS_DEFECTO,
+    Reparto,
+    contribuciones,
+    normalizar,
+    reparto_bloques,
+    tabla_reparto,
+)
+
+__all__ = [
+    "BLOQUES",
+    "PESOS_DEFECTO",
+    "Reparto",
+    "contribuciones",
+    "normalizar",
+    "reparto_bloques",
+    "tabla_reparto",
+]
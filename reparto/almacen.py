@@ -0,0 +1,133 @@
+"""Persistencia por sesión y escenario sobre SQLite en modo WAL.
+
+Sustituye al ``session_data.json`` único que compartían todos los usuarios.
+Cada clave de primer nivel de los datos de una sesión (``pesos``, ``socios``,
+``inversores``...) se guarda como una fila propia, de modo que solo se
+escriben las claves que han cambiado. Las lecturas pasan por una caché LRU en
+memoria de como mucho ``max_cache`` escenarios y las escrituras se agrupan: se aplican como mucho una vez cada
+``intervalo`` segundos, en una única transacción.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+RUTA_DEFECTO = "session_data.db"
+ESCENARIO_DEFECTO = "principal"
+MAX_CACHE = 256  # escenarios (sesión, escenario) en memoria
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS datos (
+    sesion TEXT NOT NULL,
+    escenario TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    actualizado REAL NOT NULL,
+    PRIMARY KEY (sesion, escenario, clave)
+)
+"""
+
+
+class AlmacenSesiones:
+    def __init__(self, ruta: str = RUTA_DEFECTO, intervalo: float = 2.0, max_cache: int = MAX_CACHE):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.max_cache = max_cache
+        self.bytes_escritos = 0
+        self._lock = threading.RLock()
+        # (sesion, escenario) -> {clave: json}, del menos al más reciente
+        self._cache: "OrderedDict[Tuple[str, str], Dict[str, str]]" = OrderedDict()
+        self._pendientes: Dict[Tuple[str, str, str], str] = {}
+        self._ultimo_volcado = 0.0
+        self._temporizador: Optional[threading.Timer] = None
+        # Una sola conexión compartida; el lock serializa su uso entre hilos.
+        self._conn = sqlite3.connect(ruta, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(_ESQUEMA)
+        atexit.register(self.volcar)
+
+    def _filas(self, sesion: str, escenario: str) -> Dict[str, str]:
+        k = (sesion, escenario)
+        if k in self._cache:
+            self._cache.move_to_end(k)
+            return self._cache[k]
+        if len(self._cache) >= self.max_cache:
+            # Lo que se descarta se relee de SQLite, así que antes se vuelca lo pendiente.
+            self.volcar()
+            while self._cache and len(self._cache) >= self.max_cache:
+                self._cache.popitem(last=False)
+        filas = self._conn.execute(
+            "SELECT clave, valor FROM datos WHERE sesion = ? AND escenario = ?", k
+        ).fetchall()
+        self._cache[k] = dict(filas)
+        return self._cache[k]
+
+    def cargar(self, sesion: str, escenario: str = ESCENARIO_DEFECTO) -> dict:
+        with self._lock:
+            return {clave: json.loads(valor) for clave, valor in self._filas(sesion, escenario).items()}
+
+    def guardar(self, sesion: str, escenario: str, datos: dict, inmediato: bool = False) -> None:
+        """Registra las claves que han cambiado y las vuelca según el intervalo."""
+        with self._lock:
+            actuales = self._filas(sesion, escenario)
+            for clave, valor in datos.items():
+                texto = json.dumps(valor, ensure_ascii=False, sort_keys=True)
+                if actuales.get(clave) != texto:
+                    actuales[clave] = texto
+                    self._pendientes[(sesion, escenario, clave)] = texto
+            if not self._pendientes:
+                return
+            if inmediato or time.monotonic() - self._ultimo_volcado >= self.intervalo:
+                self.volcar()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self.intervalo, self.volcar)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def volcar(self) -> None:
+        """Escribe todos los cambios pendientes en una sola transacción."""
+        with self._lock:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+            if not self._pendientes:
+                return
+            ahora = time.time()
+            escribir = [(s, e, c, v, ahora) for (s, e, c), v in self._pendientes.items()]
+            with self._conn as conn:
+                conn.executemany(
+                    "INSERT INTO datos (sesion, escenario, clave, valor, actualizado) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (sesion, escenario, clave) DO UPDATE SET valor = excluded.valor, actualizado = excluded.actualizado",
+                    escribir,
+                )
+            self.bytes_escritos += sum(len(f[3].encode("utf-8")) for f in escribir)
+            self._pendientes.clear()
+            self._ultimo_volcado = time.monotonic()
+
+    def borrar(self, sesion: str, escenario: Optional[str] = None) -> None:
+        """Elimina un escenario de la sesión, o la sesión entera si no se indica."""
+        with self._lock:
+            for k in list(self._pendientes):
+                if k[0] == sesion and (escenario is None or k[1] == escenario):
+                    del self._pendientes[k]
+            for k in list(self._cache):
+                if k[0] == sesion and (escenario is None or k[1] == escenario):
+                    del self._cache[k]
+            with self._conn as conn:
+                if escenario is None:
+                    conn.execute("DELETE FROM datos WHERE sesion = ?", (sesion,))
+                else:
+                    conn.execute("DELETE FROM datos WHERE sesion = ? AND escenario = ?", (sesion, escenario))
+
+
+@lru_cache(maxsize=None)
+def almacen(ruta: str = RUTA_DEFECTO) -> AlmacenSesiones:
+    """Almacén compartido por todas las sesiones del proceso."""
+    return AlmacenSesiones(ruta)
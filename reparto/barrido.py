@@ -0,0 +1,128 @@
+"""Barrido de sensibilidad sobre el espacio de pesos por bloque.
+
+Para una tabla de socios fija, el reparto normalizado es lineal en los pesos
+salvo por la normalización final, así que basta con precalcular una sola vez
+la matriz de puntuaciones (bloques x socios) y resolver todas las
+combinaciones de pesos con un producto matricial.
+"""
+
+import math
+from itertools import combinations
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from reparto.motor import normalizar
+
+CUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+MAX_COMBINACIONES = 5_000_000  # con más bloques, solo con pasos gruesos
+
+
+def numero_combinaciones(n_bloques: int = 4, total: int = 100, paso: int = 1) -> int:
+    """Cuántas filas devolvería ``combinaciones_pesos``, sin generarlas."""
+    return math.comb(total // paso + n_bloques - 1, n_bloques - 1) if n_bloques > 0 else 0
+
+
+def combinaciones_pesos(n_bloques: int = 4, total: int = 100, paso: int = 1) -> np.ndarray:
+    """Todas las combinaciones de pesos múltiplos de ``paso`` que suman ``total``.
+
+    Con cuatro bloques y paso 1 son 176.851 combinaciones. Se generan por
+    "estrellas y barras": cada elección de posiciones de separadores es una
+    combinación y las diferencias entre separadores son los pesos.
+    """
+    if total % paso:
+        raise ValueError("El total debe ser múltiplo del paso")
+    unidades = total // paso
+    barras = np.fromiter(
+        (p for c in combinations(range(unidades + n_bloques - 1), n_bloques - 1) for p in c),
+        dtype=np.int64,
+    ).reshape(-1, n_bloques - 1)
+    bordes = np.hstack([
+        np.full((len(barras), 1), -1),
+        barras,
+        np.full((len(barras), 1), unidades + n_bloques - 1),
+    ])
+    return (np.diff(bordes, axis=1) - 1) * paso
+
+
+def _matriz(puntuaciones, blindado):
+    return np.asarray(puntuaciones, dtype=float).T / 100, np.asarray(blindado, dtype=float)
+
+
+def barrido_pesos(puntuaciones, blindado, pesos) -> np.ndarray:
+    """Reparto normalizado (combinaciones x socios) para cada fila de ``pesos``."""
+    m, blindado = _matriz(puntuaciones, blindado)
+    return normalizar(np.asarray(pesos, dtype=float) @ m + blindado)
+
+
+def barrido_socio(puntuaciones, blindado, pesos, socio: int) -> np.ndarray:
+    """Reparto normalizado de un solo socio (combinaciones,) para cada fila de ``pesos``.
+
+    Como en ``bandas_barrido``, el total de cada combinación se calcula con
+    la suma por bloque de las puntuaciones: la memoria es combinaciones x
+    bloques, no combinaciones x socios.
+    """
+    m, blindado = _matriz(puntuaciones, blindado)
+    pesos = np.asarray(pesos, dtype=float)
+    total = pesos @ m.sum(axis=1) + blindado.sum()
+    bruto = pesos @ m[:, socio] + blindado[socio]
+    return np.divide(bruto * 100, total, out=np.zeros_like(bruto), where=total != 0)
+
+
+def filas_barrido(puntuaciones, blindado, pesos, combinaciones_por_tanda: int = 10_000):
+    """Barrido completo por tandas (pesos | reparto de cada socio), sin materializarlo entero."""
+    pesos = np.asarray(pesos)
+    for i in range(0, len(pesos), combinaciones_por_tanda):
+        tanda = pesos[i:i + combinaciones_por_tanda]
+        yield np.hstack([tanda, barrido_pesos(puntuaciones, blindado, tanda)])
+
+
+class Bandas(NamedTuple):
+    minimo: np.ndarray  # (socios,)
+    maximo: np.ndarray  # (socios,)
+    niveles: Sequence[float]
+    cuantiles: np.ndarray  # (niveles, socios)
+
+
+def bandas_barrido(puntuaciones, blindado, pesos, cuantiles=CUANTILES, socios_por_tanda: int = 64, avance: Optional[Callable] = None) -> Bandas:
+    """Mínimo, máximo y cuantiles del reparto de cada socio sobre todo el barrido.
+
+    El total de cada combinación es lineal en los pesos, así que se calcula
+    aparte y los socios se resuelven por tandas: la memoria queda acotada por
+    combinaciones x ``socios_por_tanda`` aunque la tabla tenga miles de socios.
+    Si se da ``avance``, se llama tras cada tanda con la fracción de socios
+    resueltos y las bandas parciales (NaN en los socios pendientes).
+    """
+    m, blindado = _matriz(puntuaciones, blindado)
+    pesos = np.asarray(pesos, dtype=float)
+    total = (pesos @ m.sum(axis=1) + blindado.sum())[:, None]
+    n = m.shape[1]
+    minimo, maximo = np.full(n, np.nan), np.full(n, np.nan)
+    q = np.full((len(cuantiles), n), np.nan)
+    for i in range(0, n, socios_por_tanda):
+        tanda = slice(i, i + socios_por_tanda)
+        bruto = pesos @ m[:, tanda] + blindado[tanda]
+        reparto = np.divide(bruto * 100, total, out=np.zeros_like(bruto), where=total != 0)
+        minimo[tanda] = reparto.min(axis=0)
+        maximo[tanda] = reparto.max(axis=0)
+        q[:, tanda] = np.quantile(reparto, cuantiles, axis=0)
+        if avance is not None:
+            hechos = min(i + socios_por_tanda, n)
+            avance(hechos / n, f"{hechos:,} de {n:,} socios", Bandas(minimo.copy(), maximo.copy(), tuple(cuantiles), q.copy()))
+    return Bandas(minimo, maximo, tuple(cuantiles), q)
+
+
+def mapa_calor(pesos, valores, eje_x: int, eje_y: int, total: int = 100, paso: int = 1) -> np.ndarray:
+    """Media de ``valores`` agrupada por el peso de dos bloques (y x x).
+
+    Las casillas sin combinaciones válidas (pesos que suman más de ``total``)
+    quedan a NaN para que el gráfico las deje en blanco.
+    """
+    pesos = np.asarray(pesos)
+    lado = total // paso + 1
+    celda = (pesos[:, eje_y] // paso) * lado + pesos[:, eje_x] // paso
+    suma = np.bincount(celda, weights=valores, minlength=lado * lado)
+    cuenta = np.bincount(celda, minlength=lado * lado)
+    media = np.full(lado * lado, np.nan)
+    np.divide(suma, cuenta, out=media, where=cuenta > 0)
+    return media.reshape(lado, lado)
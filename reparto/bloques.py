@@ -0,0 +1,222 @@
+"""Bloques de contribución configurables, con sub-bloques anidados.
+
+Los bloques se leen de un JSON (``bloques.json`` en la raíz del proyecto, u
+otro fichero indicado en la variable de entorno ``REPARTO_BLOQUES``)::
+
+    {"bloques": [
+        {"nombre": "Operaciones y Gestión", "etiqueta": "Operaciones", "peso": 25,
+         "subbloques": [{"nombre": "Producto", "peso": 60}, {"nombre": "Ventas", "peso": 40}]},
+        ...
+    ]}
+
+El peso de un bloque de primer nivel es su % del total; el de un sub-bloque,
+su parte dentro del padre (se normaliza, así que 60/40 y 3/2 son lo mismo).
+Los socios se puntúan en las hojas del árbol, que se llaman con la ruta
+completa ("Operaciones y Gestión / Producto"), y el peso efectivo de una hoja
+es el producto de los pesos de su rama. El motor solo ve hojas con sus pesos
+efectivos, así que cualquier número de bloques cuesta un producto matricial.
+Sin fichero se usan los cuatro bloques de ``reparto.motor``.
+"""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from reparto.motor import BLOQUES, PESOS_DEFECTO
+
+FICHERO = Path(__file__).resolve().parent.parent / "bloques.json"
+VARIABLE = "REPARTO_BLOQUES"
+SEPARADOR = " / "
+
+
+class Bloque(NamedTuple):
+    nombre: str  # ruta completa desde el primer nivel
+    etiqueta: str  # texto corto para los sliders
+    peso: float  # % del total en el primer nivel; parte dentro del padre en los demás
+    subbloques: Tuple["Bloque", ...] = ()
+
+
+class ModeloBloques:
+    """Árbol de bloques aplanado en arrays por hoja."""
+
+    __slots__ = ("bloques", "hojas", "pesos", "_nodos", "_hijos", "_ramas", "_inicio_superior")
+
+    def __init__(self, bloques: Sequence[Bloque]):
+        self.bloques = tuple(bloques)
+        self._nodos = [b for b, _ in self.nodos()]
+        indice = {b.nombre: k for k, b in enumerate(self._nodos)}
+        self._hijos = [(k, np.array([indice[s.nombre] for s in b.subbloques])) for k, b in enumerate(self._nodos) if b.subbloques]
+        hojas: List[str] = []
+        ramas: List[List[int]] = []  # índices en ``_nodos`` de la rama de cada hoja
+        inicio = []
+        for b in self.bloques:
+            inicio.append(len(hojas))
+            pila = [(b, [indice[b.nombre]])]
+            while pila:
+                nodo, rama = pila.pop()
+                if not nodo.subbloques:
+                    hojas.append(nodo.nombre)
+                    ramas.append(rama)
+                pila.extend((s, rama + [indice[s.nombre]]) for s in reversed(nodo.subbloques))
+        self.hojas = tuple(hojas)
+        # Ramas rellenadas con un índice extra que vale 1 en ``_partes``.
+        profundidad = max((len(r) for r in ramas), default=0)
+        self._ramas = np.full((len(ramas), profundidad), len(self._nodos), dtype=np.intp)
+        for i, r in enumerate(ramas):
+            self._ramas[i, :len(r)] = r
+        self._inicio_superior = np.array(inicio, dtype=np.intp)
+        self.pesos = self._partes(np.array([b.peso for b in self._nodos], dtype=float))
+
+    def _partes(self, valor: np.ndarray) -> np.ndarray:
+        """Pesos efectivos de las hojas a partir del valor de cada nodo."""
+        parte = np.append(valor, 1.0)
+        # Las partes de los hermanos se normalizan dentro de su padre.
+        for _, hijos in self._hijos:
+            total = valor[hijos].sum()
+            parte[hijos] = valor[hijos] / total if total > 0 else 1 / len(hijos)
+        return parte[self._ramas].prod(axis=1)
+
+    def nodos(self):
+        """(bloque, profundidad) de todo el árbol en preorden."""
+        pila = [(b, 0) for b in reversed(self.bloques)]
+        while pila:
+            b, nivel = pila.pop()
+            yield b, nivel
+            pila.extend((s, nivel + 1) for s in reversed(b.subbloques))
+
+    @property
+    def superiores(self) -> List[str]:
+        return [b.nombre for b in self.bloques]
+
+    @property
+    def anidado(self) -> bool:
+        return any(b.subbloques for b in self.bloques)
+
+    def pesos_hojas(self, pesos: Optional[Mapping[str, float]] = None) -> np.ndarray:
+        """Peso efectivo (%) de cada hoja con los pesos de ``pesos`` (nombre -> peso) en vez de los del fichero."""
+        if not pesos:
+            return self.pesos.copy()
+        return self._partes(np.array([float(pesos.get(b.nombre, b.peso)) for b in self._nodos]))
+
+    def pesos_nodos(self, pesos_hojas: Mapping[str, float]) -> Dict[str, float]:
+        """Inverso de ``pesos_hojas``: peso de cada nodo a partir de los efectivos de las hojas.
+
+        Las hojas que faltan toman su peso del fichero; un padre sin peso deja
+        a sus hijos con el del fichero. Sin ``pesos_hojas`` devuelve los pesos
+        del fichero.
+        """
+        efectivo = dict(zip(self.hojas, self.pesos.tolist()))
+        efectivo.update({k: float(v) for k, v in pesos_hojas.items() if k in efectivo})
+        suma: Dict[str, float] = {}
+
+        def total(b: Bloque) -> float:
+            suma[b.nombre] = efectivo[b.nombre] if not b.subbloques else sum(total(s) for s in b.subbloques)
+            return suma[b.nombre]
+
+        resultado = {}
+        for b in self.bloques:
+            resultado[b.nombre] = total(b)
+        # Los sub-bloques, en la escala del fichero: sus partes suman lo mismo que allí.
+        for b in self._nodos:
+            escala = sum(s.peso for s in b.subbloques)
+            for s in b.subbloques:
+                resultado[s.nombre] = suma[s.nombre] * escala / suma[b.nombre] if suma[b.nombre] > 0 else s.peso
+        return resultado
+
+    def agrupar(self, valores) -> np.ndarray:
+        """Suma sobre la última dimensión las hojas de cada bloque de primer nivel."""
+        valores = np.asarray(valores, dtype=float)
+        if valores.shape[-1] == 0:
+            return valores
+        return np.add.reduceat(valores, self._inicio_superior, axis=-1)
+
+    def puntuaciones_superiores(self, puntuaciones, pesos_hojas) -> np.ndarray:
+        """Puntuación 0-100 en cada bloque de primer nivel: media de sus hojas ponderada por su peso.
+
+        Con los pesos de las hojas fijos dentro de cada bloque, el reparto con
+        estas puntuaciones y los pesos de primer nivel es el mismo que con las
+        hojas, así que el barrido de sensibilidad puede hacerse solo sobre el
+        primer nivel. Un bloque con peso nulo usa la media simple.
+        """
+        puntuaciones = np.asarray(puntuaciones, dtype=float)
+        pesos_hojas = np.asarray(pesos_hojas, dtype=float)
+        peso_superior = self.agrupar(pesos_hojas)
+        cuenta = np.diff(np.append(self._inicio_superior, len(self.hojas)))
+        ponderada = self.agrupar(puntuaciones * pesos_hojas)
+        simple = self.agrupar(puntuaciones) / cuenta
+        return np.divide(ponderada, peso_superior, out=simple, where=peso_superior > 0)
+
+    def to_dict(self) -> dict:
+        return {"bloques": [_a_dict(b) for b in self.bloques]}
+
+
+def _a_dict(b: Bloque) -> dict:
+    d = {"nombre": b.nombre.rsplit(SEPARADOR, 1)[-1], "etiqueta": b.etiqueta, "peso": b.peso}
+    if b.subbloques:
+        d["subbloques"] = [_a_dict(s) for s in b.subbloques]
+    return d
+
+
+def _leer_bloque(datos, padre: Optional[str], errores: List[str], vistos: set) -> Optional[Bloque]:
+    donde = f"en '{padre}'" if padre else "en el primer nivel"
+    if not isinstance(datos, dict) or not str(datos.get("nombre", "")).strip():
+        errores.append(f"Bloque sin nombre {donde}")
+        return None
+    nombre = str(datos["nombre"]).strip()
+    ruta = f"{padre}{SEPARADOR}{nombre}" if padre else nombre
+    if ruta in vistos:
+        errores.append(f"Bloque repetido: '{ruta}'")
+    vistos.add(ruta)
+    try:
+        peso = float(datos.get("peso", 0))
+    except (TypeError, ValueError):
+        peso = -1.0
+    if not peso >= 0:
+        errores.append(f"Peso no válido en '{ruta}': {datos.get('peso')!r}")
+    subbloques = tuple(
+        s for s in (_leer_bloque(d, ruta, errores, vistos) for d in datos.get("subbloques") or []) if s is not None
+    )
+    etiqueta = str(datos.get("etiqueta") or nombre.split(",")[0].split()[0])
+    return Bloque(ruta, etiqueta, peso, subbloques)
+
+
+def modelo_desde_dict(datos: Mapping) -> ModeloBloques:
+    errores: List[str] = []
+    vistos: set = set()
+    lista = datos.get("bloques") if isinstance(datos, Mapping) else None
+    if not lista:
+        raise ValueError("La configuración no tiene bloques")
+    bloques = [b for b in (_leer_bloque(d, None, errores, vistos) for d in lista) if b is not None]
+    if errores:
+        raise ValueError("; ".join(errores))
+    return ModeloBloques(bloques)
+
+
+def modelo_defecto() -> ModeloBloques:
+    """Los cuatro bloques planos de ``reparto.motor``."""
+    return ModeloBloques([Bloque(b, b.split(",")[0].split()[0], float(p)) for b, p in zip(BLOQUES, PESOS_DEFECTO)])
+
+
+@lru_cache(maxsize=8)
+def _cargar(ruta: str, modificado: float) -> ModeloBloques:
+    with open(ruta, encoding="utf-8") as f:
+        return modelo_desde_dict(json.load(f))
+
+
+def cargar_bloques(ruta: Optional[str] = None) -> ModeloBloques:
+    """Modelo de ``ruta``, de ``REPARTO_BLOQUES`` o de ``bloques.json``; sin fichero, el de ``reparto.motor``.
+
+    Se relee solo si el fichero cambia, así que puede llamarse en cada rerun.
+    """
+    ruta = ruta or os.environ.get(VARIABLE) or str(FICHERO)
+    try:
+        modificado = os.path.getmtime(ruta)
+    except OSError:
+        if ruta != str(FICHERO):
+            raise
+        return modelo_defecto()
+    return _cargar(ruta, modificado)
@@ -0,0 +1,168 @@
+"""Caché de resultados compartida entre sesiones y reruns.
+
+Streamlit vuelve a ejecutar el script entero con cada interacción. Esta caché
+guarda tablas, imágenes de gráficos y ficheros de exportación indexados por un
+hash canónico de sus entradas, de modo que las mismas entradas devuelven el
+mismo resultado sin recalcular, sea cual sea el usuario. El desalojo es LRU,
+con caducidad por tiempo y un límite de memoria total.
+
+Los valores se devuelven tal cual, sin copiar: quien los reciba no debe
+modificarlos.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+
+
+def _canonico(obj):
+    if isinstance(obj, dict):
+        return {"d": [[_canonico(k), _canonico(v)] for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))]}
+    if isinstance(obj, (list, tuple)):
+        return [_canonico(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return {"a": [obj.dtype.str, obj.shape, hashlib.blake2b(np.ascontiguousarray(obj).tobytes()).hexdigest()]}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float):
+        return repr(obj)
+    if isinstance(obj, bytes):
+        return {"b": hashlib.blake2b(obj).hexdigest()}
+    if obj is None or isinstance(obj, (str, int, bool)):
+        return obj
+    if hasattr(obj, "to_dict"):
+        return _canonico(obj.to_dict())
+    raise TypeError(f"No se puede generar una clave de caché para {type(obj).__name__}")
+
+
+def clave(*partes, **opciones) -> str:
+    """Hash estable de las entradas, independiente del orden de los dicts."""
+    texto = json.dumps(_canonico([partes, opciones]), separators=(",", ":"))
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def tamano(valor) -> int:
+    """Estimación en bytes de lo que ocupa un valor cacheado."""
+    if isinstance(valor, (bytes, bytearray)):
+        return len(valor)
+    if isinstance(valor, np.ndarray) or hasattr(valor, "nbytes"):
+        # Arrays y objetos en columnas densas como ``TablaSocios``.
+        return int(valor.nbytes)
+    if hasattr(valor, "memory_usage"):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class _Entrada(NamedTuple):
+    valor: Any
+    bytes: int
+    caduca: float
+
+
+class CacheResultados:
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl: Optional[float] = 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entradas: "OrderedDict[tuple, _Entrada]" = OrderedDict()
+        self._bytes = 0
+        self._aciertos: Dict[str, int] = {}
+        self._fallos: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _quitar(self, k):
+        self._bytes -= self._entradas.pop(k).bytes
+
+    def obtener(self, espacio: str, k: str, defecto=None):
+        with self._lock:
+            entrada = self._entradas.get((espacio, k))
+            if entrada is not None and entrada.caduca < time.monotonic():
+                self._quitar((espacio, k))
+                entrada = None
+            if entrada is None:
+                self._fallos[espacio] = self._fallos.get(espacio, 0) + 1
+                return defecto
+            self._entradas.move_to_end((espacio, k))
+            self._aciertos[espacio] = self._aciertos.get(espacio, 0) + 1
+            return entrada.valor
+
+    def guardar(self, espacio: str, k: str, valor) -> None:
+        n = tamano(valor)
+        if n > self.max_bytes:
+            return
+        caduca = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            if (espacio, k) in self._entradas:
+                self._quitar((espacio, k))
+            self._entradas[(espacio, k)] = _Entrada(valor, n, caduca)
+            self._bytes += n
+            while self._bytes > self.max_bytes:
+                self._quitar(next(iter(self._entradas)))
+
+    def obtener_o_calcular(self, espacio: str, k: str, calcular: Callable[[], Any]):
+        falta = object()
+        valor = self.obtener(espacio, k, falta)
+        if valor is falta:
+            valor = calcular()
+            self.guardar(espacio, k, valor)
+        return valor
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+            self._aciertos.clear()
+            self._fallos.clear()
+
+    def estadisticas(self) -> Dict[str, Dict[str, float]]:
+        """Aciertos, fallos, tasa de acierto, entradas y bytes por espacio."""
+        with self._lock:
+            espacios = sorted(set(self._aciertos) | set(self._fallos) | {e for e, _ in self._entradas})
+            resultado = {}
+            for e in espacios:
+                aciertos, fallos = self._aciertos.get(e, 0), self._fallos.get(e, 0)
+                entradas = [v for (ee, _), v in self._entradas.items() if ee == e]
+                resultado[e] = {
+                    "aciertos": aciertos,
+                    "fallos": fallos,
+                    "tasa": aciertos / (aciertos + fallos) if aciertos + fallos else 0.0,
+                    "entradas": len(entradas),
+                    "bytes": sum(v.bytes for v in entradas),
+                }
+            return resultado
+
+
+# Instancia del proceso: en Streamlit la comparten todas las sesiones.
+CACHE = CacheResultados()
+
+
+def cacheado(espacio: str, cache: Optional[CacheResultados] = None):
+    """Decorador que cachea una función pura por el hash de sus argumentos.
+
+    El argumento ``avance`` (el informe de progreso de ``reparto.trabajos``)
+    no cambia el resultado y no forma parte de la clave.
+    """
+
+    def decorador(func):
+        # Los scripts de Streamlit se ejecutan todos como __main__: el fichero desambigua.
+        nombre = f"{func.__code__.co_filename}:{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def envoltura(*args, **kwargs):
+            c = cache or CACHE
+            k = clave(nombre, *args, **{n: v for n, v in kwargs.items() if n != "avance"})
+            return c.obtener_o_calcular(espacio, k, lambda: func(*args, **kwargs))
+
+        return envoltura
+
+    return decorador
@@ -0,0 +1,137 @@
+"""Cascada de liquidación: cuánto recibe cada titular en una salida.
+
+Cada titular tiene una participación (% como si todo estuviera convertido)
+y, si es preferente, una preferencia de liquidación (importe invertido x
+múltiplo), si participa o no tras cobrarla, un tope opcional al total que
+recibe y un rango de antigüedad (cobra antes el rango mayor; dentro de un
+rango, a prorrata de la preferencia).
+
+Por encima de la suma de preferencias, todo depende de ``p``, lo que cobra
+cada unidad de participación ordinaria. Para un ``p`` dado cada titular
+recibe, en forma cerrada:
+
+- ordinario: ``s p``
+- preferente no participante: ``max(L, s p)`` (convierte si ``s p > L``)
+- preferente participante con tope ``C``: ``max(min(L + s p, C), s p)``
+
+El valor de salida es la suma de todo eso, continua y creciente en ``p``, y
+lineal entre los puntos de corte ``L / s``, ``(C - L) / s`` y ``C / s``. Así
+que basta con evaluar los cortes una vez e interpolar la rejilla de valores
+de salida entera de una vez, sin decidir conversiones punto a punto.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+PUNTOS = 10_000
+
+
+class Titular(NamedTuple):
+    nombre: str
+    participacion: float  # % como convertido
+    inversion: float = 0.0  # base de la preferencia (€); 0 para ordinarias
+    multiplo: float = 1.0
+    participante: bool = False
+    tope: Optional[float] = None  # múltiplo de la inversión que limita el total recibido
+    rango: int = 0
+
+
+class Cortes(NamedTuple):
+    nombres: List[str]
+    valores: np.ndarray  # (cortes,) valores de salida, crecientes
+    pagos: np.ndarray  # (cortes, titulares)
+    pendiente: np.ndarray  # (titulares,) reparto de cada € por encima del último corte
+
+
+def _columnas(titulares: Sequence[Titular]):
+    s = np.array([t.participacion for t in titulares], dtype=float) / 100
+    inversion = np.array([t.inversion for t in titulares], dtype=float)
+    preferencia = inversion * np.array([t.multiplo for t in titulares], dtype=float)
+    participante = np.array([t.participante for t in titulares], dtype=bool) & (preferencia > 0)
+    no_participante = (preferencia > 0) & ~participante
+    tope = np.array([np.inf if t.tope is None else t.tope * t.inversion for t in titulares], dtype=float)
+    tope = np.where(participante, np.maximum(tope, preferencia), np.inf)
+    rango = np.array([t.rango for t in titulares])
+    return s, preferencia, participante, no_participante, tope, rango
+
+
+def _pagos_precio(p, s, preferencia, participante, no_participante, tope):
+    """Pagos (..., titulares) cuando la unidad de participación ordinaria vale ``p``."""
+    p = np.asarray(p, dtype=float)[..., None]
+    comun = s * p
+    return np.where(
+        no_participante,
+        np.maximum(preferencia, comun),
+        np.where(participante, np.maximum(np.minimum(preferencia + comun, tope), comun), comun),
+    )
+
+
+def _rangos(preferencia, rango):
+    """Máscaras de cada rango con preferencia, del más antiguo (mayor) al más reciente."""
+    return [(rango == r) & (preferencia > 0) for r in sorted(set(rango[preferencia > 0].tolist()), reverse=True)]
+
+
+def _pagos_preferencias(valores, preferencia, rango):
+    """Pagos por antigüedad mientras ``valores`` no cubre todas las preferencias."""
+    valores = np.asarray(valores, dtype=float)[..., None]
+    pagos = np.zeros(valores.shape[:-1] + preferencia.shape)
+    cubierto = 0.0
+    for en_rango in _rangos(preferencia, rango):
+        total = preferencia[en_rango].sum()
+        cobrado = np.clip(valores - cubierto, 0, total)
+        pagos += np.where(en_rango, cobrado * preferencia / total, 0.0)
+        cubierto += total
+    return pagos
+
+
+def puntos_corte(titulares: Sequence[Titular]) -> Cortes:
+    """Valores de salida donde cambia el reparto, con el pago de cada titular en cada uno."""
+    s, preferencia, participante, no_participante, tope, rango = _columnas(titulares)
+    tramo_preferencias = np.concatenate([[0.0], np.cumsum([preferencia[m].sum() for m in _rangos(preferencia, rango)])])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precios = np.concatenate([
+            np.where(no_participante & (s > 0), preferencia / s, np.nan),
+            np.where(participante & (s > 0), (tope - preferencia) / s, np.nan),
+            np.where(participante & (s > 0), tope / s, np.nan),
+        ])
+    precios = np.unique(precios[np.isfinite(precios) & (precios > 0)])
+    pagos_precio = _pagos_precio(precios, s, preferencia, participante, no_participante, tope)
+
+    valores = np.concatenate([tramo_preferencias, pagos_precio.sum(axis=1)])
+    pagos = np.concatenate([_pagos_preferencias(tramo_preferencias, preferencia, rango), pagos_precio])
+    # Tramos planos (nadie cobra el € marginal) repiten valor con los mismos pagos.
+    valores, unicos = np.unique(valores, return_index=True)
+    pagos = pagos[unicos]
+
+    # Tras el último corte todos han convertido o participan sin tope: cada
+    # € adicional se reparte por participación.
+    pendiente = s / s.sum() if s.sum() > 0 else np.zeros_like(s)
+    return Cortes([t.nombre for t in titulares], valores, pagos, pendiente)
+
+
+def evaluar(cortes: Cortes, valores_salida) -> np.ndarray:
+    """Pagos (valores, titulares) interpolando entre los cortes en una sola pasada."""
+    x = np.asarray(valores_salida, dtype=float)
+    v, pagos = cortes.valores, cortes.pagos
+    i = np.clip(np.searchsorted(v, x, side="right"), 1, len(v)) - 1
+    siguiente = np.minimum(i + 1, len(v) - 1)
+    ancho = v[siguiente] - v[i]
+    peso = np.divide(x - v[i], ancho, out=np.zeros_like(x), where=ancho > 0)[..., None]
+    interior = pagos[i] + peso * (pagos[siguiente] - pagos[i])
+    exceso = np.maximum(x - v[-1], 0)[..., None]
+    return np.where(exceso > 0, pagos[-1] + exceso * cortes.pendiente, interior)
+
+
+def cascada(titulares: Sequence[Titular], valores_salida) -> np.ndarray:
+    """Pagos de cada titular (valores, titulares) para cada valor de salida."""
+    return evaluar(puntos_corte(titulares), valores_salida)
+
+
+def rejilla(maximo: float, puntos: int = PUNTOS, cortes: Optional[Cortes] = None) -> np.ndarray:
+    """Rejilla uniforme de valores de salida que incluye los cortes exactos (si se dan)."""
+    valores = np.linspace(0, maximo, puntos)
+    if cortes is not None:
+        valores = np.union1d(valores, cortes.valores[cortes.valores <= maximo])
+    return valores
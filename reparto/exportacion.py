@@ -0,0 +1,107 @@
+"""Exportación a Excel de varias hojas en modo de memoria constante.
+
+Cada hoja se describe con sus columnas y un iterable de filas, que se
+escriben una a una con el modo ``constant_memory`` de xlsxwriter: solo la
+fila en curso vive en memoria, así que exportar cientos de miles de filas de
+escenarios no hace crecer el proceso. Las hojas pueden llevar un gráfico
+nativo de Excel que referencia sus propias celdas.
+"""
+
+import re
+from io import BytesIO
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+FILAS_POR_TANDA = 10_000
+# Métrica de ``reparto.valoracion.simular_valoracion`` -> columna de la hoja
+COLUMNAS_SIMULACION = {
+    "pre_money": "Valoración pre-money (€)",
+    "participacion": "Participación inversor (%)",
+    "roi": "ROI inversor (€)",
+}
+
+
+class Grafico(NamedTuple):
+    tipo: str  # "pie", "column", "bar" o "line"
+    categorias: int  # índice de la columna con las etiquetas
+    valores: Sequence[int]  # índices de las columnas con las series
+    titulo: str = ""
+
+
+class Hoja(NamedTuple):
+    nombre: str
+    columnas: Sequence[str]
+    filas: Iterable[Sequence]
+    grafico: Optional[Grafico] = None
+
+
+def _python(valor):
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def filas_dataframe(df, filas_por_tanda: int = FILAS_POR_TANDA) -> Iterator[list]:
+    """Filas de un DataFrame convertidas a tipos de Python por tandas."""
+    for i in range(0, len(df), filas_por_tanda):
+        for fila in df.iloc[i:i + filas_por_tanda].to_numpy(dtype=object).tolist():
+            yield [_python(v) for v in fila]
+
+
+def filas_array(array, etiquetas: Optional[Sequence] = None, filas_por_tanda: int = FILAS_POR_TANDA) -> Iterator[list]:
+    """Filas de un array 2D, opcionalmente precedidas por una etiqueta."""
+    array = np.asarray(array)
+    for i in range(0, len(array), filas_por_tanda):
+        tanda = array[i:i + filas_por_tanda].tolist()
+        if etiquetas is None:
+            yield from tanda
+        else:
+            for etiqueta, fila in zip(etiquetas[i:i + filas_por_tanda], tanda):
+                yield [etiqueta, *fila]
+
+
+def hoja_simulacion(resultado, nombre: str = "Monte Carlo") -> Hoja:
+    """Percentiles y medias de una simulación Monte Carlo (``ResultadoSimulacion``)."""
+    metricas = list(COLUMNAS_SIMULACION)
+    filas = [
+        [f"P{p:g}", *(float(resultado.cuantiles[m][i]) for m in metricas)]
+        for i, p in enumerate(resultado.percentiles)
+    ]
+    filas.append(["Media", *(float(resultado.medias[m]) for m in metricas)])
+    filas.append(["Simulaciones", resultado.n])
+    return Hoja(nombre, ["Percentil", *COLUMNAS_SIMULACION.values()], filas)
+
+
+def _grafico(libro, hoja, nombre: str, columnas: Sequence[str], n_filas: int, grafico: Grafico):
+    if n_filas == 0:
+        return
+    chart = libro.add_chart({"type": grafico.tipo})
+    for c in grafico.valores:
+        chart.add_series({
+            "name": [nombre, 0, c],
+            "categories": [nombre, 1, grafico.categorias, n_filas, grafico.categorias],
+            "values": [nombre, 1, c, n_filas, c],
+        })
+    chart.set_title({"name": grafico.titulo or nombre})
+    hoja.insert_chart(1, len(columnas) + 1, chart)
+
+
+def escribir_libro(hojas: Iterable[Hoja], destino=None) -> Optional[bytes]:
+    """Escribe las hojas en ``destino`` (ruta o fichero) o devuelve los bytes del libro."""
+    import xlsxwriter
+
+    salida = BytesIO() if destino is None else destino
+    libro = xlsxwriter.Workbook(salida, {"constant_memory": True, "nan_inf_to_errors": True})
+    negrita = libro.add_format({"bold": True})
+    try:
+        for h in hojas:
+            nombre = re.sub(r"[\[\]:*?/\\]", "_", h.nombre)[:31]
+            hoja = libro.add_worksheet(nombre)
+            hoja.write_row(0, 0, list(h.columnas), negrita)
+            n = 0
+            for n, fila in enumerate(h.filas, start=1):
+                hoja.write_row(n, 0, fila)
+            if h.grafico is not None:
+                _grafico(libro, hoja, nombre, h.columnas, n, h.grafico)
+    finally:
+        libro.close()
+    return salida.getvalue() if destino is None else None
@@ -0,0 +1,92 @@
+"""Renderizado de gráficos sin estado global de pyplot.
+
+Cada gráfico se dibuja sobre un ``Figure`` propio con el lienzo Agg y se
+devuelve como bytes PNG o SVG. Al no pasar por pyplot, la figura no queda
+registrada en ningún gestor global y se libera en cuanto se sale de la
+función, así que la memoria no crece con los reruns. El dibujo se hace en el
+hilo de la sesión y un semáforo deja como mucho ``MAX_DIBUJOS`` a la vez para
+no disparar el uso de CPU con muchas sesiones.
+
+Para las tartas también hay un motor nativo: una especificación Vega-Lite que
+Streamlit dibuja en el navegador sin pasar por matplotlib.
+"""
+
+import threading
+from io import BytesIO
+from typing import Sequence
+
+MAX_DIBUJOS = 2
+
+_dibujando = threading.BoundedSemaphore(MAX_DIBUJOS)
+
+
+def _figura(**kwargs):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(**kwargs)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _exportar(fig, formato: str) -> bytes:
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format=formato, bbox_inches="tight")
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+def _dibujar_tarta(etiquetas, valores, formato):
+    fig = _figura()
+    ax = fig.subplots()
+    ax.pie(valores, labels=etiquetas, autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    return _exportar(fig, formato)
+
+
+def _dibujar_mapa_calor(mapa, etiqueta_x, etiqueta_y, etiqueta_color, extension, formato):
+    fig = _figura()
+    ax = fig.subplots()
+    im = ax.imshow(mapa, origin="lower", extent=extension, cmap="viridis")
+    ax.set_xlabel(etiqueta_x)
+    ax.set_ylabel(etiqueta_y)
+    fig.colorbar(im, ax=ax, label=etiqueta_color)
+    return _exportar(fig, formato)
+
+
+def tarta(etiquetas: Sequence[str], valores: Sequence[float], formato: str = "png") -> bytes:
+    with _dibujando:
+        return _dibujar_tarta(list(etiquetas), list(valores), formato)
+
+
+def mapa_calor(mapa, etiqueta_x: str, etiqueta_y: str, etiqueta_color: str = "", extension=(0, 100, 0, 100), formato: str = "png") -> bytes:
+    with _dibujando:
+        return _dibujar_mapa_calor(mapa, etiqueta_x, etiqueta_y, etiqueta_color, extension, formato)
+
+
+def agrupar_resto(etiquetas: Sequence[str], valores: Sequence[float], max_porciones: int = 15):
+    """Deja las ``max_porciones`` mayores y suma el resto en una porción "Otros"."""
+    etiquetas, valores = list(etiquetas), [float(v) for v in valores]
+    if len(valores) <= max_porciones:
+        return etiquetas, valores
+    orden = sorted(range(len(valores)), key=valores.__getitem__, reverse=True)
+    mayores = orden[:max_porciones - 1]
+    resto = sum(valores[i] for i in orden[max_porciones - 1:])
+    return [etiquetas[i] for i in mayores] + ["Otros"], [valores[i] for i in mayores] + [resto]
+
+
+def especificacion_tarta(etiquetas: Sequence[str], valores: Sequence[float]) -> dict:
+    """Especificación Vega-Lite de la tarta para ``st.vega_lite_chart``."""
+    datos = [{"Nombre": str(e), "Participacion": float(v)} for e, v in zip(etiquetas, valores)]
+    return {
+        "data": {"values": datos},
+        "mark": {"type": "arc", "tooltip": True},
+        "encoding": {
+            "theta": {"field": "Participacion", "type": "quantitative", "stack": "normalize"},
+            "color": {"field": "Nombre", "type": "nominal", "sort": None},
+        },
+        "view": {"stroke": None},
+    }
+
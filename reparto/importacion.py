@@ -0,0 +1,208 @@
+"""Importación masiva de socios e inversores desde CSV, XLSX o JSONL.
+
+Los ficheros se leen fila a fila (sin cargarlos enteros en memoria), cada
+fila se valida contra un esquema y el resultado se entrega en columnas
+(arrays de NumPy) listas para ``reparto.motor.reparto_bloques``. Las
+cabeceras se reconocen sin distinguir mayúsculas, acentos ni sufijos como
+"(%)" o "(€)".
+"""
+
+import csv
+import io
+import json
+import math
+import unicodedata
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from reparto.motor import BLOQUES
+from reparto.socios import TablaSocios
+
+MAX_ERRORES = 20
+
+Origen = Union[str, IO[bytes]]
+
+
+class ErrorImportacion(ValueError):
+    def __init__(self, errores: List[str]):
+        self.errores = errores
+        resumen = "; ".join(errores[:5])
+        if len(errores) > 5:
+            resumen += f" (y {len(errores) - 5} errores más)"
+        super().__init__(resumen)
+
+
+class Campo(NamedTuple):
+    nombre: str
+    alias: tuple
+    numerico: bool = True
+    obligatorio: bool = False
+    defecto: object = 0.0
+    minimo: Optional[float] = 0.0
+    maximo: Optional[float] = None
+
+
+class TablaInversores(NamedTuple):
+    nombres: List[str]
+    aportes: np.ndarray
+
+
+def _normalizar(texto) -> str:
+    texto = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    for sufijo in ("(%)", "(eur)", "%"):
+        texto = texto.replace(sufijo, "")
+    return " ".join(texto.replace("(", " ").replace(")", " ").lower().split())
+
+
+def esquema_socios(bloques: Sequence[str] = BLOQUES) -> List[Campo]:
+    campos = [Campo("nombre", ("nombre", "socio", "name"), numerico=False, obligatorio=True, defecto="")]
+    for b in bloques:
+        campos.append(Campo(b, (b, b.split(",")[0].split()[0]), maximo=100.0))
+    campos += [
+        Campo("blindado", ("blindado", "% blindado"), maximo=100.0),
+        Campo("horas", ("horas", "total horas")),
+        Campo("coste_hora", ("coste hora", "costehora", "precio hora", "coste")),
+    ]
+    return campos
+
+
+ESQUEMA_INVERSORES = [
+    Campo("nombre", ("nombre", "inversor", "name"), numerico=False, obligatorio=True, defecto=""),
+    Campo("aporte", ("aporte", "aportacion", "inversion", "importe"), obligatorio=True),
+]
+
+
+def _formato(origen: Origen, formato: Optional[str]) -> str:
+    if formato:
+        return formato.lower().lstrip(".")
+    nombre = origen if isinstance(origen, str) else getattr(origen, "name", "")
+    return nombre.rsplit(".", 1)[-1].lower() if "." in nombre else "csv"
+
+
+def _abrir(origen: Origen) -> IO[bytes]:
+    return open(origen, "rb") if isinstance(origen, str) else origen
+
+
+def _filas(origen: Origen, formato: str) -> Iterator[dict]:
+    binario = _abrir(origen)
+    try:
+        if formato in ("csv", "txt"):
+            texto = io.TextIOWrapper(binario, encoding="utf-8-sig", newline="")
+            muestra = texto.read(4096)
+            texto.seek(0)
+            try:
+                dialecto = csv.Sniffer().sniff(muestra, delimiters=",;\t")
+            except csv.Error:
+                dialecto = csv.excel
+            try:
+                yield from csv.DictReader(texto, dialect=dialecto)
+            finally:
+                # Si se abandona la lectura, el recolector puede haber cerrado ya el fichero.
+                if not binario.closed:
+                    texto.detach()
+        elif formato in ("jsonl", "ndjson", "json"):
+            for linea in binario:
+                if linea.strip():
+                    yield json.loads(linea)
+        elif formato in ("xlsx", "xlsm"):
+            try:
+                from openpyxl import load_workbook
+            except ImportError as exc:
+                raise ImportError("Para importar ficheros Excel hace falta instalar openpyxl") from exc
+            libro = load_workbook(binario, read_only=True, data_only=True)
+            try:
+                filas = libro.active.iter_rows(values_only=True)
+                cabecera = [str(c) if c is not None else "" for c in next(filas, ())]
+                for fila in filas:
+                    if any(v is not None for v in fila):
+                        yield dict(zip(cabecera, fila))
+            finally:
+                libro.close()
+        else:
+            raise ValueError(f"Formato no soportado: {formato!r}")
+    finally:
+        if isinstance(origen, str):
+            binario.close()
+
+
+def _vacio(valor) -> bool:
+    """``None``, texto en blanco o NaN (celdas vacías de pandas, XLSX o JSONL)."""
+    if valor is None:
+        return True
+    if isinstance(valor, str):
+        return not valor.strip()
+    try:
+        return bool(np.isnan(valor))
+    except (TypeError, ValueError):
+        return False
+
+
+def _numero(valor):
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if "," in valor and "." not in valor:
+            valor = valor.replace(",", ".")
+    return float(valor)
+
+
+def leer_registros(filas: Iterable[dict], esquema: Sequence[Campo], max_errores: int = MAX_ERRORES) -> dict:
+    """Valida filas (dicts) contra el esquema y las devuelve por columnas."""
+    columnas = {c.nombre: [] for c in esquema}
+    errores: List[str] = []
+    mapa = None
+    for n, fila in enumerate(filas, start=1):
+        if mapa is None:
+            # Ante cabeceras equivalentes manda la primera (en las exportaciones
+            # de la app, la puntuación del bloque va antes que su "(%)").
+            cabeceras = {}
+            for k in fila:
+                cabeceras.setdefault(_normalizar(k), k)
+            mapa = {}
+            for c in esquema:
+                origen = next((cabeceras[_normalizar(a)] for a in c.alias if _normalizar(a) in cabeceras), None)
+                if origen is None and c.obligatorio:
+                    raise ErrorImportacion([f"Falta la columna obligatoria '{c.alias[0]}'"])
+                mapa[c.nombre] = origen
+        for c in esquema:
+            bruto = fila.get(mapa[c.nombre]) if mapa[c.nombre] is not None else None
+            valor = c.defecto
+            vacio = _vacio(bruto)
+            if not vacio and c.numerico:
+                try:
+                    valor = _numero(bruto)
+                except (TypeError, ValueError):
+                    errores.append(f"Fila {n}: '{c.alias[0]}' no es numérico ({bruto!r})")
+                    valor = c.defecto
+                else:
+                    # "nan" escrito en el fichero cuenta como celda vacía.
+                    vacio = math.isnan(valor)
+                    if vacio:
+                        valor = c.defecto
+                    elif (c.minimo is not None and valor < c.minimo) or (c.maximo is not None and valor > c.maximo):
+                        errores.append(f"Fila {n}: '{c.alias[0]}' fuera de rango ({valor:g})")
+            elif not vacio:
+                valor = str(bruto).strip()
+            if vacio and c.obligatorio:
+                errores.append(f"Fila {n}: falta '{c.alias[0]}'")
+            columnas[c.nombre].append(valor)
+        if len(errores) >= max_errores:
+            break
+    if errores:
+        raise ErrorImportacion(errores)
+    return {c.nombre: np.asarray(columnas[c.nombre], dtype=float) if c.numerico else columnas[c.nombre] for c in esquema}
+
+
+def socios_desde_registros(filas: Iterable[dict], bloques: Sequence[str] = BLOQUES) -> TablaSocios:
+    col = leer_registros(filas, esquema_socios(bloques))
+    puntuaciones = np.column_stack([col[b] for b in bloques]) if col["nombre"] else np.zeros((0, len(bloques)))
+    return TablaSocios(col["nombre"], puntuaciones, col["blindado"], col["horas"], col["coste_hora"])
+
+
+def leer_socios(origen: Origen, formato: Optional[str] = None, bloques: Sequence[str] = BLOQUES) -> TablaSocios:
+    return socios_desde_registros(_filas(origen, _formato(origen, formato)), bloques)
+
+
+def leer_inversores(origen: Origen, formato: Optional[str] = None) -> TablaInversores:
+    col = leer_registros(_filas(origen, _formato(origen, formato)), ESQUEMA_INVERSORES)
+    return TablaInversores(col["nombre"], col["aporte"])
@@ -0,0 +1,140 @@
+"""Reparto incremental: solo se recalcula lo que cambia.
+
+Se guardan la contribución técnica y el bruto de cada socio y el total de
+todos los brutos. Cambiar una puntuación o el blindado de un socio mueve solo
+su fila y el total (O(1)); como el % normalizado de un socio es ``bruto * 100 /
+total``, renormalizar no obliga a tocar a los demás: se calcula al leerlo.
+Cambiar un peso sí mueve a todos los socios (O(socios)), pero el total se
+actualiza en O(1) con la suma por bloque de las puntuaciones.
+
+Las sumas acumuladas arrastran error de redondeo; cada ``RECALCULO`` cambios
+se recalcula todo desde cero, lo que deja el coste amortizado en O(1) por
+cambio. En la app, cada widget de socio aplica su celda desde su
+``on_change`` (ver ``paneles.formulario_socios``), así que un rerun no
+compara las entradas; la tabla se conserva entre reruns, solo se reescriben
+las filas que han cambiado y, si no ha cambiado nada, se devuelve la misma.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+from reparto.motor import BLOQUES
+
+RECALCULO = 4096
+MAX_CAMBIOS = 64  # con más celdas cambiadas a la vez sale más barato recalcular
+
+
+class RepartoIncremental:
+    def __init__(self, puntuaciones, pesos, blindado):
+        self._tabla = None
+        self._df = None
+        self._columnas_df = None
+        self._cargar(puntuaciones, pesos, blindado)
+
+    def _cargar(self, puntuaciones, pesos, blindado) -> None:
+        self.puntuaciones = np.array(puntuaciones, dtype=float).reshape(len(blindado), len(pesos))
+        self.pesos = np.array(pesos, dtype=float)
+        self.blindado = np.array(blindado, dtype=float)
+        self.recalcular()
+
+    def recalcular(self) -> None:
+        """Recalcula todo desde las entradas (O(socios x bloques))."""
+        self._columnas = self.puntuaciones.sum(axis=0)
+        self.tecnica = self.puntuaciones @ self.pesos / 100
+        self.bruto = self.tecnica + self.blindado
+        self.total = float(self.bruto.sum())
+        self.cambios = 0
+        self._sucias = set(range(len(self.bruto)))
+
+    def _contar(self) -> None:
+        self.cambios += 1
+        if self.cambios >= RECALCULO:
+            self.recalcular()
+
+    def fijar_puntuacion(self, i: int, j: int, valor: float) -> None:
+        delta = (valor - self.puntuaciones[i, j]) * self.pesos[j] / 100
+        self._columnas[j] += valor - self.puntuaciones[i, j]
+        self.puntuaciones[i, j] = valor
+        self.tecnica[i] += delta
+        self.bruto[i] += delta
+        self.total += delta
+        self._sucias.add(i)
+        self._contar()
+
+    def fijar_blindado(self, i: int, valor: float) -> None:
+        delta = valor - self.blindado[i]
+        self.blindado[i] = valor
+        self.bruto[i] += delta
+        self.total += delta
+        self._sucias.add(i)
+        self._contar()
+
+    def fijar_peso(self, j: int, valor: float) -> None:
+        delta = (valor - self.pesos[j]) / 100
+        self.pesos[j] = valor
+        self.tecnica += delta * self.puntuaciones[:, j]
+        self.bruto += delta * self.puntuaciones[:, j]
+        self.total += delta * self._columnas[j]
+        self._sucias = set(range(len(self.bruto)))
+        self._contar()
+
+    def fijar_pesos(self, pesos) -> int:
+        """Aplica los pesos que difieren de los guardados y devuelve cuántos eran.
+
+        Los pesos salen de los sliders de la barra lateral, que son pocos:
+        compararlos es O(bloques). Con más de ``MAX_CAMBIOS`` se recalcula
+        desde cero.
+        """
+        pesos = np.asarray(pesos, dtype=float)
+        bloques = np.flatnonzero(pesos != self.pesos)
+        if len(bloques) > MAX_CAMBIOS:
+            self.pesos = pesos.copy()
+            self.recalcular()
+        else:
+            for j in bloques:
+                self.fijar_peso(j, pesos[j])
+        return len(bloques)
+
+    def normalizado(self, i: Optional[int] = None):
+        """% normalizado de un socio (O(1)) o de todos; un total nulo da ceros."""
+        if i is not None:
+            return self.bruto[i] * 100 / self.total if self.total != 0 else 0.0
+        if self.total == 0:
+            return np.zeros_like(self.bruto)
+        return self.bruto * (100 / self.total)
+
+    def tabla(self, nombres: Sequence[str], bloques: Sequence[str] = BLOQUES):
+        """Tabla con las columnas de ``motor.tabla_reparto``.
+
+        Los valores numéricos viven en una sola matriz que se conserva entre
+        llamadas: solo se reescriben las filas cambiadas desde la anterior y la
+        columna normalizada, y el DataFrame se monta sobre ella sin copiarla:
+        la tabla devuelta solo es válida hasta el siguiente cambio. Sin cambios
+        ni nombres nuevos se devuelve la tabla anterior.
+        """
+        import pandas as pd
+
+        bloques = list(bloques)
+        columnas_df = (tuple(nombres), tuple(bloques))
+        if self._df is not None and not self._sucias and self._columnas_df == columnas_df:
+            return self._df
+        b = len(bloques)
+        if self._tabla is None or self._tabla.shape != (len(self.bruto), 2 * b + 4):
+            self._tabla = np.empty((len(self.bruto), 2 * b + 4))
+            self._sucias = set(range(len(self.bruto)))
+        filas = sorted(self._sucias)
+        if filas:
+            t = self._tabla
+            t[filas, :b] = self.puntuaciones[filas]
+            t[filas, b] = self.blindado[filas]
+            t[filas, b + 1:2 * b + 1] = self.puntuaciones[filas] * (self.pesos / 100)
+            t[filas, 2 * b + 1] = self.tecnica[filas]
+            t[filas, 2 * b + 2] = self.bruto[filas]
+        self._tabla[:, -1] = self.normalizado()
+        self._sucias = set()
+        columnas = bloques + ["% Blindado"] + [f"{x} (%)" for x in bloques] + ["Participación Técnica", "% Final Bruto", "% Final Normalizado"]
+        df = pd.DataFrame(self._tabla, columns=columnas, copy=False)
+        df.insert(0, "Socio", list(nombres))
+        self._df, self._columnas_df = df, columnas_df
+        return df
@@ -0,0 +1,329 @@
+"""Ejecución por lotes de escenarios sin interfaz.
+
+Uso::
+
+    python -m reparto.lotes escenarios.jsonl -o resultados.jsonl
+    python -m reparto.lotes escenarios.csv -o resultados.parquet --procesos 8
+
+Cada escenario de JSONL es un objeto con ``id`` (por defecto, su posición
+en la entrada), ``pesos`` (lista o dict por bloque), ``socios`` (``nombre``,
+una puntuación por bloque o una lista ``bloques`` y ``blindado``),
+``valoracion`` (``horas``, ``coste_hora``, ``gastos``, ``usuarios``,
+``precio_mensual``, ``margen``, ``multiplicador``) e ``inversores``
+(``nombre``, ``aporte``). En CSV hay una fila por socio con una columna
+``escenario``; los pesos (``peso <bloque>``), la valoración y la
+``aportacion`` total se leen de la primera fila de cada escenario, y las filas
+de un mismo escenario deben ser consecutivas. Los bloques son las hojas de
+``bloques.json`` (ver ``reparto.bloques``).
+
+Los escenarios se reparten en tandas entre un ``ProcessPoolExecutor`` con un
+número acotado de tandas en vuelo, y los resultados se escriben en el mismo
+orden de entrada a medida que llegan. Un escenario mal formado no detiene el
+lote: su resultado es ``{"id": ..., "error": ...}`` y se sigue con los demás.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from reparto.importacion import ErrorImportacion, _normalizar, _numero, socios_desde_registros
+from reparto.bloques import ModeloBloques, cargar_bloques
+from reparto.motor import reparto_bloques
+from reparto.valoracion import ENTRADAS, participacion_inversor, valoracion_pre_money
+
+TANDA = 256
+ERROR_LECTURA = "_error"
+VALORACION_DEFECTO = {"horas": 0, "coste_hora": 0.0, "gastos": 0.0, "usuarios": 0, "precio_mensual": 0.0, "margen": 0, "multiplicador": 2}
+
+
+# -------- LECTURA --------
+
+def _leer_jsonl(f) -> Iterator[dict]:
+    for linea in f:
+        if linea.strip():
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError as exc:
+                # Se informa en su posición, como el resto de escenarios erróneos.
+                yield {ERROR_LECTURA: f"JSON no válido ({exc.msg})"}
+
+
+def _escalar(fila: dict, columna: Optional[str], defecto: float = 0.0) -> float:
+    valor = fila.get(columna) if columna else None
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return defecto
+    return _numero(valor)
+
+
+def _leer_csv(f) -> Iterator[dict]:
+    """Agrupa las filas consecutivas de cada escenario; los socios se validan como en la importación.
+
+    Un escenario con errores se entrega marcado para que ``procesar_tanda`` lo
+    informe en su posición.
+    """
+    lector = csv.DictReader(f)
+    modelo = cargar_bloques()
+    cabeceras = {_normalizar(c): c for c in lector.fieldnames or []}
+    if "escenario" not in cabeceras:
+        raise ErrorImportacion(["Falta la columna obligatoria 'escenario'"])
+    for id_escenario, filas in itertools.groupby(lector, key=lambda fila: fila[cabeceras["escenario"]]):
+        filas = list(filas)
+        primera = filas[0]
+        try:
+            tabla = socios_desde_registros(filas, modelo.hojas)
+            columnas_peso = [cabeceras.get(_normalizar(f"peso {b}")) for b in modelo.hojas]
+            pesos = [_escalar(primera, c, p) for c, p in zip(columnas_peso, modelo.pesos.tolist())]
+            valoracion = {k: _escalar(primera, cabeceras.get(_normalizar(k.replace("_", " "))), v) for k, v in VALORACION_DEFECTO.items()}
+            aportacion = _escalar(primera, cabeceras.get("aportacion"))
+        except ErrorImportacion as exc:
+            yield {"id": id_escenario, ERROR_LECTURA: "; ".join(exc.errores)}
+            continue
+        except ValueError as exc:
+            yield {"id": id_escenario, ERROR_LECTURA: f"valor no numérico ({exc})"}
+            continue
+        yield {
+            "id": id_escenario,
+            "pesos": pesos,
+            "valoracion": valoracion,
+            "socios": [
+                {"nombre": n, "bloques": p, "blindado": b}
+                for n, p, b in zip(tabla.nombres, tabla.puntuaciones.tolist(), tabla.blindado.tolist())
+            ],
+            "inversores": [{"nombre": "Inversor", "aporte": aportacion}] if aportacion > 0 else [],
+        }
+
+
+def leer_escenarios(ruta: str) -> Iterator[dict]:
+    entrada = sys.stdin if ruta == "-" else open(ruta, encoding="utf-8-sig", newline="")
+    try:
+        if ruta.lower().endswith(".csv"):
+            yield from _leer_csv(entrada)
+        else:
+            yield from _leer_jsonl(entrada)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+
+
+# -------- CÁLCULO --------
+
+def _pesos(escenario: dict, modelo: ModeloBloques) -> List[float]:
+    pesos = escenario.get("pesos", modelo.pesos.tolist())
+    if isinstance(pesos, dict):
+        return [float(pesos.get(b, 0)) for b in modelo.hojas]
+    if len(pesos) != len(modelo.hojas):
+        raise ValueError(f"{len(pesos)} pesos para {len(modelo.hojas)} bloques")
+    return [float(p) for p in pesos]
+
+
+def _puntuaciones(socio: dict, modelo: ModeloBloques) -> List[float]:
+    if "bloques" in socio:
+        if len(socio["bloques"]) != len(modelo.hojas):
+            raise ValueError(f"socio {socio.get('nombre', '')!r}: {len(socio['bloques'])} puntuaciones para {len(modelo.hojas)} bloques")
+        return [float(v) for v in socio["bloques"]]
+    return [float(socio.get(b, 0)) for b in modelo.hojas]
+
+
+class _Entrada(NamedTuple):
+    valoracion: List[float]  # en el orden de ``ENTRADAS``
+    aportes: List[float]
+    puntuaciones: List[List[float]]
+    pesos: List[float]
+    blindado: List[float]
+
+
+def _preparar(escenario: dict, modelo: ModeloBloques) -> _Entrada:
+    """Entradas numéricas de un escenario; lanza ``ValueError`` si está mal formado."""
+    if ERROR_LECTURA in escenario:
+        raise ValueError(escenario[ERROR_LECTURA])
+    valoracion = {**VALORACION_DEFECTO, **escenario.get("valoracion", {})}
+    socios = escenario.get("socios", [])
+    return _Entrada(
+        [float(valoracion[k]) for k in ENTRADAS],
+        [float(i.get("aporte", 0)) for i in escenario.get("inversores", [])],
+        [_puntuaciones(s, modelo) for s in socios],
+        _pesos(escenario, modelo),
+        [float(s.get("blindado", 0)) for s in socios],
+    )
+
+
+def procesar_tanda(escenarios: List[dict]) -> List[dict]:
+    """Resuelve una tanda agrupando los escenarios con el mismo número de socios.
+
+    Los escenarios que no se pueden leer dan ``{"id": ..., "error": ...}``
+    sin afectar al resto de la tanda.
+    """
+    resultados: List[Optional[dict]] = [None] * len(escenarios)
+    modelo = cargar_bloques()
+
+    entradas: Dict[int, _Entrada] = {}
+    for i, e in enumerate(escenarios):
+        try:
+            entradas[i] = _preparar(e, modelo)
+        except (AttributeError, KeyError, TypeError, ValueError) as exc:
+            resultados[i] = {"id": e.get("id"), "error": e.get(ERROR_LECTURA) or f"{type(exc).__name__}: {exc}"}
+    if not entradas:
+        return resultados
+
+    validos = list(entradas)
+    pre_money = dict(zip(validos, valoracion_pre_money(*np.array([entradas[i].valoracion for i in validos]).T).tolist()))
+    total_aportes = {i: sum(entradas[i].aportes) for i in validos}
+    participacion_total = dict(zip(validos, participacion_inversor(
+        np.array([total_aportes[i] for i in validos]), np.array([pre_money[i] for i in validos])
+    ).tolist()))
+
+    grupos: Dict[int, List[int]] = {}
+    for i in validos:
+        grupos.setdefault(len(entradas[i].puntuaciones), []).append(i)
+    for n_socios, indices in grupos.items():
+        if n_socios == 0:
+            normalizados = np.zeros((len(indices), 0))
+        else:
+            puntuaciones = np.array([entradas[i].puntuaciones for i in indices])
+            pesos = np.array([entradas[i].pesos for i in indices])
+            blindado = np.array([entradas[i].blindado for i in indices])
+            normalizados = reparto_bloques(puntuaciones, pesos, blindado).normalizado
+        for fila, i in enumerate(indices):
+            e = escenarios[i]
+            dilucion = 1 - participacion_total[i] / 100
+            post = pre_money[i] + total_aportes[i]
+            resultados[i] = {
+                "id": e.get("id"),
+                "pre_money": pre_money[i],
+                "socios": [
+                    {"nombre": s.get("nombre", ""), "participacion": float(p), "participacion_post": float(p * dilucion)}
+                    for s, p in zip(e.get("socios", []), normalizados[fila])
+                ],
+                "inversores": [
+                    {"nombre": inv.get("nombre", ""), "aporte": a, "participacion_post": a / post * 100 if post > 0 else 0.0}
+                    for inv, a in zip(e.get("inversores", []), entradas[i].aportes)
+                ],
+            }
+    return resultados
+
+
+def _con_id(escenarios: Iterable[dict]) -> Iterator[dict]:
+    """Los escenarios sin ``id`` toman su posición en la entrada (desde 0), no la de su tanda."""
+    for posicion, e in enumerate(escenarios):
+        if not isinstance(e, dict):
+            yield {"id": posicion, ERROR_LECTURA: "el escenario no es un objeto"}
+        else:
+            yield e if "id" in e else {**e, "id": posicion}
+
+
+def _tandas(escenarios: Iterable[dict], tamano: int) -> Iterator[List[dict]]:
+    iterador = iter(escenarios)
+    while True:
+        tanda = list(itertools.islice(iterador, tamano))
+        if not tanda:
+            return
+        yield tanda
+
+
+def ejecutar(escenarios: Iterable[dict], procesos: Optional[int] = None, tanda: int = TANDA) -> Iterator[dict]:
+    """Resultados en el orden de entrada, con como mucho 2 x procesos tandas en vuelo."""
+    procesos = procesos or os.cpu_count() or 1
+    escenarios = _con_id(escenarios)
+    if procesos == 1:
+        for t in _tandas(escenarios, tanda):
+            yield from procesar_tanda(t)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        en_vuelo = deque()
+        for t in _tandas(escenarios, tanda):
+            en_vuelo.append(pool.submit(procesar_tanda, t))
+            if len(en_vuelo) >= 2 * procesos:
+                yield from en_vuelo.popleft().result()
+        while en_vuelo:
+            yield from en_vuelo.popleft().result()
+
+
+# -------- ESCRITURA --------
+
+def _filas_planas(resultado: dict) -> Iterator[dict]:
+    if "error" in resultado:
+        yield {"escenario": str(resultado["id"]), "tipo": "error", "error": resultado["error"]}
+        return
+    for tipo in ("socios", "inversores"):
+        for titular in resultado[tipo]:
+            yield {
+                "escenario": str(resultado["id"]),
+                "tipo": "socio" if tipo == "socios" else "inversor",
+                "titular": titular["nombre"],
+                "participacion": titular.get("participacion"),
+                "participacion_post": titular["participacion_post"],
+                "aporte": titular.get("aporte"),
+                "pre_money": resultado["pre_money"],
+            }
+
+
+def escribir_jsonl(resultados: Iterable[dict], salida) -> int:
+    n = 0
+    for n, r in enumerate(resultados, start=1):
+        salida.write(json.dumps(r, ensure_ascii=False) + "\n")
+    return n
+
+
+def escribir_parquet(resultados: Iterable[dict], ruta: str, filas_por_grupo: int = 50_000) -> int:
+    """Una fila por titular y escenario, escrita por grupos de filas."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError("Para escribir Parquet hace falta instalar pyarrow") from exc
+    esquema = pa.schema([
+        ("escenario", pa.string()), ("tipo", pa.string()), ("titular", pa.string()),
+        ("participacion", pa.float64()), ("participacion_post", pa.float64()),
+        ("aporte", pa.float64()), ("pre_money", pa.float64()), ("error", pa.string()),
+    ])
+    n = 0
+    with pq.ParquetWriter(ruta, esquema) as escritor:
+        buffer = []
+        for n, r in enumerate(resultados, start=1):
+            buffer.extend(_filas_planas(r))
+            if len(buffer) >= filas_por_grupo:
+                escritor.write_table(pa.Table.from_pylist(buffer, schema=esquema))
+                buffer = []
+        if buffer:
+            escritor.write_table(pa.Table.from_pylist(buffer, schema=esquema))
+    return n
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m reparto.lotes", description="Calcula escenarios de reparto y valoración por lotes.")
+    parser.add_argument("entrada", help="fichero JSONL o CSV de escenarios ('-' para stdin, JSONL)")
+    parser.add_argument("-o", "--salida", default="-", help="fichero .jsonl o .parquet ('-' para stdout, JSONL)")
+    parser.add_argument("-p", "--procesos", type=int, default=None, help="procesos de cálculo (por defecto, uno por núcleo)")
+    parser.add_argument("--tanda", type=int, default=TANDA, help=f"escenarios por tarea (por defecto {TANDA})")
+    args = parser.parse_args(argv)
+
+    errores = 0
+
+    def contar_errores(resultados):
+        nonlocal errores
+        for r in resultados:
+            errores += "error" in r
+            yield r
+
+    resultados = contar_errores(ejecutar(leer_escenarios(args.entrada), args.procesos, args.tanda))
+    if args.salida.endswith(".parquet"):
+        n = escribir_parquet(resultados, args.salida)
+    elif args.salida == "-":
+        n = escribir_jsonl(resultados, sys.stdout)
+    else:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            n = escribir_jsonl(resultados, f)
+    print(f"{n} escenarios procesados" + (f", {errores} con errores" if errores else ""), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Motor de reparto por bloques ponderados.
+
+Todas las funciones trabajan por lotes: la última dimensión de las
+puntuaciones son los bloques, la penúltima los socios y cualquier dimensión
+anterior se trata como escenarios independientes. Así una sola llamada
+resuelve tanto la tabla de la app como decenas de miles de escenarios.
+"""
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+BLOQUES = (
+    "Concepto, Idea e IP Fundacional",
+    "Inversión Económica Inicial",
+    "Operaciones y Gestión",
+    "Estrategia, Dirección, Marketing",
+)
+PESOS_DEFECTO = (30, 30, 25, 15)
+
+
+class Reparto(NamedTuple):
+    contribuciones: np.ndarray  # (..., socios, bloques)
+    tecnica: np.ndarray  # (..., socios)
+    bruto: np.ndarray  # (..., socios)
+    normalizado: np.ndarray  # (..., socios), suma 100 por escenario
+
+
+def contribuciones(puntuaciones, pesos):
+    """Puntuación 0-100 de cada socio en cada bloque escalada por el peso del bloque."""
+    puntuaciones = np.asarray(puntuaciones, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    return puntuaciones * (pesos[..., None, :] / 100)
+
+
+def normalizar(bruto):
+    """Reescala cada escenario para que sume 100; un total nulo devuelve ceros."""
+    bruto = np.asarray(bruto, dtype=float)
+    total = bruto.sum(axis=-1, keepdims=True)
+    return np.divide(bruto * 100, total, out=np.zeros_like(bruto), where=total != 0)
+
+
+def reparto_bloques(puntuaciones, pesos, blindado):
+    contrib = contribuciones(puntuaciones, pesos)
+    tecnica = contrib.sum(axis=-1)
+    bruto = tecnica + np.asarray(blindado, dtype=float)
+    return Reparto(contrib, tecnica, bruto, normalizar(bruto))
+
+
+def tabla_reparto(nombres, puntuaciones, pesos, blindado, bloques: Sequence[str] = BLOQUES):
+    """Tabla de resultados de un único escenario con las columnas de la app."""
+    import pandas as pd
+
+    bloques = list(bloques)
+    r = reparto_bloques(puntuaciones, pesos, blindado)
+    # Una sola matriz en vez de una columna cada vez: con decenas de bloques
+    # insertar columnas una a una fragmenta el DataFrame.
+    valores = np.column_stack([
+        np.asarray(puntuaciones, dtype=float).reshape(r.contribuciones.shape),
+        np.broadcast_to(np.asarray(blindado, dtype=float), r.bruto.shape),
+        r.contribuciones,
+        r.tecnica,
+        r.bruto,
+        r.normalizado,
+    ])
+    columnas = bloques + ["% Blindado"] + [f"{b} (%)" for b in bloques] + ["Participación Técnica", "% Final Bruto", "% Final Normalizado"]
+    df = pd.DataFrame(valores, columns=columnas, copy=False)
+    df.insert(0, "Socio", list(nombres))
+    return df
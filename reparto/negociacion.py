@@ -0,0 +1,212 @@
+"""Cálculo inverso de condiciones de inversión.
+
+En lugar de comprobar si una aportación cabe, se despeja la condición límite:
+la inversión máxima, la valoración pre-money mínima o el precio por acción
+mínimo con los que ningún fundador pierde más de ``dilucion_max`` % de su
+participación y cada inversor recibe al menos su participación mínima sin
+superar su ticket máximo.
+
+En una sola ronda todo tiene forma cerrada y las funciones admiten arrays,
+así que una rejilla entera de objetivos se resuelve de una vez. Para planes
+de varias rondas (con pool y pro-rata) se usa bisección vectorizada sobre
+``simular_rondas``: todos los planes avanzan juntos en cada iteración.
+"""
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from reparto.rondas import PlanesRondas, simular_rondas
+
+ITERACIONES = 60
+
+
+class Condiciones(NamedTuple):
+    inversion: np.ndarray  # total de la ronda (€)
+    pre_money: np.ndarray
+    fraccion: np.ndarray  # % post-money de los inversores nuevos
+    precio_accion: np.ndarray  # € por acción (NaN si no se indican acciones)
+    factible: np.ndarray  # bool: existe alguna condición que cumple todo
+
+
+def fraccion_maxima(dilucion_max, pool_objetivo=0.0, pool_inicial=0.0):
+    """% post-money máximo que se puede vender sin superar ``dilucion_max``.
+
+    Como en ``simular_rondas``, el pool se amplía antes de la ronda hasta
+    ``pool_objetivo`` (% post-money) a cargo de los titulares existentes, que
+    conservan la fracción ``(1 - f - pool) / (1 - pool_inicial)`` con
+    ``pool = max(pool_inicial (1 - f), pool_objetivo)``. Ambas ramas son
+    lineales en ``f``, así que el límite es el mínimo de las dos.
+    """
+    d, t, p0 = (np.divide(x, 100) for x in (dilucion_max, pool_objetivo, pool_inicial))
+    f = np.minimum(d, 1 - t - (1 - d) * (1 - p0))
+    return np.clip(f, 0, 1) * 100
+
+
+def _acciones_post(fraccion, pool_objetivo, pool_inicial, acciones_pre):
+    f, t, p0 = (np.divide(x, 100) for x in (fraccion, pool_objetivo, pool_inicial))
+    pool = np.maximum(p0 * (1 - f), t)
+    resto = 1 - f - pool
+    return np.divide(np.multiply(acciones_pre, 1 - p0), resto, out=np.full(np.shape(resto), np.nan), where=resto > 0)
+
+
+def _precio(inversion, fraccion, pool_objetivo, pool_inicial, acciones_pre):
+    if acciones_pre is None:
+        return np.full(np.shape(inversion), np.nan)
+    nuevas = np.divide(fraccion, 100) * _acciones_post(fraccion, pool_objetivo, pool_inicial, acciones_pre)
+    return np.divide(inversion, nuevas, out=np.full(np.shape(nuevas), np.nan), where=nuevas > 0)
+
+
+def _inversores(reparto, participacion_minima, ticket_maximo):
+    """Pesos de cada inversor en la ronda y sus límites, con el inversor en el último eje."""
+    reparto = np.atleast_1d(np.asarray(reparto, dtype=float))
+    pesos = reparto / reparto.sum(axis=-1, keepdims=True)
+    minimo = np.zeros_like(pesos) if participacion_minima is None else np.broadcast_to(np.asarray(participacion_minima, float), pesos.shape)
+    ticket = np.full_like(pesos, np.inf) if ticket_maximo is None else np.broadcast_to(np.asarray(ticket_maximo, float), pesos.shape)
+    # Fracción total mínima para que cada inversor llegue a su mínimo y
+    # ratio inversión total / ticket del inversor más limitante.
+    fraccion_minima = np.max(np.divide(minimo, pesos, out=np.where(minimo > 0, np.inf, 0.0), where=pesos > 0), axis=-1)
+    total_maximo = np.min(np.divide(ticket, pesos, out=np.full_like(pesos, np.inf), where=pesos > 0), axis=-1)
+    return fraccion_minima, total_maximo
+
+
+def inversion_maxima(
+    pre_money,
+    dilucion_max,
+    pool_objetivo=0.0,
+    pool_inicial=0.0,
+    reparto: Sequence[float] = (1.0,),
+    participacion_minima=None,
+    ticket_maximo=None,
+    acciones_pre=None,
+) -> Condiciones:
+    """Mayor inversión total de una ronda a ``pre_money`` dado.
+
+    ``reparto`` son las proporciones en que los inversores se reparten la
+    ronda, ``participacion_minima`` (% post-money) y ``ticket_maximo`` (€) sus
+    límites, todos con el inversor en el último eje. El resto de argumentos
+    se difunden entre sí como arrays.
+    """
+    pre_money = np.asarray(pre_money, dtype=float)
+    fraccion_minima, total_maximo = _inversores(reparto, participacion_minima, ticket_maximo)
+    f = fraccion_maxima(dilucion_max, pool_objetivo, pool_inicial) / 100
+    inversion = np.divide(pre_money * f, 1 - f, out=np.full(np.broadcast(pre_money, f).shape, np.inf), where=f < 1)
+    inversion = np.minimum(inversion, total_maximo)
+    post = pre_money + inversion
+    f = np.divide(inversion, post, out=np.zeros_like(post), where=post > 0) * 100
+    factible = (f >= fraccion_minima - 1e-9) & (inversion > 0)
+    precio = _precio(inversion, f, pool_objetivo, pool_inicial, acciones_pre)
+    return Condiciones(inversion, np.broadcast_to(pre_money, inversion.shape), f, precio, factible)
+
+
+def pre_money_minimo(
+    inversion,
+    dilucion_max,
+    pool_objetivo=0.0,
+    pool_inicial=0.0,
+    reparto: Sequence[float] = (1.0,),
+    participacion_minima=None,
+    ticket_maximo=None,
+    acciones_pre=None,
+) -> Condiciones:
+    """Menor valoración pre-money (y precio por acción) que admite ``inversion``.
+
+    Vender menos fracción exige más valoración, así que la dilución fija un
+    mínimo ``inversion (1 - f) / f``; la participación mínima de los
+    inversores fija a su vez un máximo, y la ronda es factible si el mínimo
+    no lo supera y ningún ticket queda excedido.
+    """
+    inversion = np.asarray(inversion, dtype=float)
+    fraccion_minima, total_maximo = _inversores(reparto, participacion_minima, ticket_maximo)
+    f = fraccion_maxima(dilucion_max, pool_objetivo, pool_inicial) / 100
+    pre_money = np.divide(inversion * (1 - f), f, out=np.full(np.broadcast(inversion, f).shape, np.inf), where=f > 0)
+    post = pre_money + inversion
+    fraccion = np.divide(inversion, post, out=np.zeros_like(post), where=np.isfinite(post) & (post > 0)) * 100
+    factible = np.isfinite(pre_money) & (fraccion >= fraccion_minima - 1e-9) & (inversion <= total_maximo) & (inversion > 0)
+    precio = _precio(inversion, fraccion, pool_objetivo, pool_inicial, acciones_pre)
+    return Condiciones(np.broadcast_to(inversion, pre_money.shape), pre_money, fraccion, precio, factible)
+
+
+def biseccion(factible, bajo, alto, iteraciones: int = ITERACIONES, creciente: bool = False) -> np.ndarray:
+    """Límite de ``factible(x)`` (bool por elemento) en ``[bajo, alto]``.
+
+    Con ``creciente=False`` la condición se cumple por debajo del límite y se
+    devuelve el mayor ``x`` factible; con ``creciente=True``, el menor. Cada
+    iteración evalúa ``factible`` una sola vez sobre todos los elementos.
+    Donde ningún valor del intervalo es factible se devuelve NaN.
+    """
+    bajo, alto = np.broadcast_arrays(np.asarray(bajo, dtype=float), np.asarray(alto, dtype=float))
+    bajo, alto = bajo.copy(), alto.copy()
+    extremo = factible(bajo if not creciente else alto)
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        ok = factible(medio)
+        if creciente:
+            alto = np.where(ok, medio, alto)
+            bajo = np.where(ok, bajo, medio)
+        else:
+            bajo = np.where(ok, medio, bajo)
+            alto = np.where(ok, alto, medio)
+    return np.where(extremo, bajo if not creciente else alto, np.nan)
+
+
+def _dilucion_fundadores(titulares, participaciones, planes, fundadores, con_prorrata, pool_inicial):
+    r = simular_rondas(titulares, participaciones, planes, fundadores, con_prorrata, pool_inicial)
+    mascara = np.ones(len(titulares), bool) if fundadores is None else np.asarray(fundadores, bool)
+    return r.dilucion[:, :, mascara].max(axis=(1, 2), initial=0.0)
+
+
+def _con_ronda(planes: PlanesRondas, campo: str, ronda: int, valores) -> PlanesRondas:
+    columna = getattr(planes, campo).copy()
+    columna[:, ronda] = valores
+    return planes._replace(**{campo: columna})
+
+
+def inversion_maxima_plan(
+    titulares: Sequence[str],
+    participaciones: Sequence[float],
+    planes: PlanesRondas,
+    ronda: int,
+    dilucion_max,
+    fundadores=None,
+    con_prorrata=None,
+    pool_inicial: float = 0.0,
+    iteraciones: int = ITERACIONES,
+) -> np.ndarray:
+    """Inversión máxima en ``ronda`` de cada plan sin que ningún fundador supere ``dilucion_max`` en todo el plan.
+
+    ``dilucion_max`` puede ser un array por plan; para explorar una rejilla
+    de objetivos se repiten las filas de ``planes``. El resto de rondas se
+    mantiene tal cual, de modo que las posteriores también cuentan.
+    """
+    dilucion_max = np.broadcast_to(np.asarray(dilucion_max, dtype=float), (len(planes.pre_money),))
+
+    def factible(inversion):
+        p = _con_ronda(planes, "inversion", ronda, inversion)
+        return _dilucion_fundadores(titulares, participaciones, p, fundadores, con_prorrata, pool_inicial) <= dilucion_max
+
+    # Con una inversión de 1e6 veces la pre-money se vende el 99,9999 %.
+    return biseccion(factible, 0.0, planes.pre_money[:, ronda] * 1e6, iteraciones)
+
+
+def pre_money_minimo_plan(
+    titulares: Sequence[str],
+    participaciones: Sequence[float],
+    planes: PlanesRondas,
+    ronda: int,
+    dilucion_max,
+    fundadores=None,
+    con_prorrata=None,
+    pool_inicial: float = 0.0,
+    iteraciones: int = ITERACIONES,
+    pre_money_maximo: Optional[float] = None,
+) -> np.ndarray:
+    """Valoración pre-money mínima de ``ronda`` en cada plan que respeta ``dilucion_max`` en todo el plan."""
+    dilucion_max = np.broadcast_to(np.asarray(dilucion_max, dtype=float), (len(planes.pre_money),))
+    alto = planes.inversion[:, ronda] * 1e6 if pre_money_maximo is None else pre_money_maximo
+
+    def factible(pre_money):
+        p = _con_ronda(planes, "pre_money", ronda, pre_money)
+        return _dilucion_fundadores(titulares, participaciones, p, fundadores, con_prorrata, pool_inicial) <= dilucion_max
+
+    return biseccion(factible, 0.0, alto, iteraciones, creciente=True)
@@ -0,0 +1,259 @@
+"""Ingesta por tandas de partes de horas (socio, fecha, horas, tarifa, categoría).
+
+Las exportaciones reales tienen millones de filas, así que se leen en tandas
+de ``FILAS_POR_TANDA`` y de cada una solo se conserva el acumulado de horas y
+coste (horas x tarifa) por socio y categoría: la memoria depende de cuántos
+socios y categorías hay, no del tamaño del fichero.
+
+La fecha, o un identificador creciente si la exportación lo trae, hace de
+marca de agua: al volver a ingerir la exportación completa solo se suman las
+filas posteriores a la marca de la ingesta anterior. Con marca por fecha, un
+día ya ingerido se considera cerrado; si se exporta a mitad de jornada hace
+falta la columna ``id``. Las categorías se asignan a los bloques de
+contribución al consultar, así que cambiar la asignación no obliga a releer
+nada.
+"""
+
+import csv
+import io
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from reparto.importacion import MAX_ERRORES, ErrorImportacion, Origen, _abrir, _filas, _formato, _normalizar
+from reparto.motor import BLOQUES
+
+FILAS_POR_TANDA = 250_000
+
+COLUMNAS = {
+    "socio": ("socio", "nombre", "partner", "empleado"),
+    "fecha": ("fecha", "date", "dia"),
+    "horas": ("horas", "hours"),
+    "tarifa": ("tarifa", "coste hora", "precio hora", "rate"),
+    "categoria": ("categoria", "category", "bloque", "tipo"),
+    "id": ("id", "registro"),
+}
+OBLIGATORIAS = ("socio", "fecha", "horas")
+
+
+class ResumenPartes(NamedTuple):
+    nombres: List[str]
+    horas: np.ndarray  # (socios,)
+    coste: np.ndarray  # (socios,) total en €
+    coste_hora: np.ndarray  # (socios,) tarifa media ponderada por horas
+    horas_bloque: np.ndarray  # (socios, bloques); las categorías sin bloque no cuentan
+
+
+def categorias_por_defecto(categorias: Sequence[str], bloques: Sequence[str] = BLOQUES) -> Dict[str, Optional[str]]:
+    """Asigna cada categoría al bloque cuyo nombre o primera palabra coincide."""
+    claves = {}
+    for b in bloques:
+        claves.setdefault(_normalizar(b), b)
+        claves.setdefault(_normalizar(b.split(",")[0].split()[0]), b)
+    return {c: claves.get(_normalizar(c)) for c in categorias}
+
+
+def puntuaciones_horas(horas_bloque) -> np.ndarray:
+    """Puntuación 0-100 de cada socio en cada bloque: su % de las horas del equipo en el bloque."""
+    horas_bloque = np.asarray(horas_bloque, dtype=float)
+    total = horas_bloque.sum(axis=0, keepdims=True)
+    return np.divide(horas_bloque * 100, total, out=np.zeros_like(horas_bloque), where=total > 0)
+
+
+def _mapa_columnas(cabecera: Sequence[str]) -> Dict[str, str]:
+    cabeceras = {}
+    for k in cabecera:
+        cabeceras.setdefault(_normalizar(k), k)
+    mapa = {}
+    for nombre, alias in COLUMNAS.items():
+        origen = next((cabeceras[_normalizar(a)] for a in alias if _normalizar(a) in cabeceras), None)
+        if origen is None and nombre in OBLIGATORIAS:
+            raise ErrorImportacion([f"Falta la columna obligatoria '{alias[0]}'"])
+        if origen is not None:
+            mapa[nombre] = origen
+    return mapa
+
+
+def _tandas_csv(origen: Origen, filas_por_tanda: int):
+    import pandas as pd
+
+    binario = _abrir(origen)
+    try:
+        muestra = binario.read(4096).decode("utf-8-sig", errors="ignore")
+        binario.seek(0)
+        try:
+            separador = csv.Sniffer().sniff(muestra, delimiters=",;\t").delimiter
+        except csv.Error:
+            separador = ","
+        cabecera = next(csv.reader(io.StringIO(muestra), delimiter=separador), [])
+        mapa = _mapa_columnas(cabecera)
+        # Todo como texto salvo lo que pandas reconozca: los números con coma
+        # decimal se convierten después, en ``_columnas_tanda``.
+        lector = pd.read_csv(
+            binario, sep=separador, usecols=list(mapa.values()), chunksize=filas_por_tanda,
+            encoding="utf-8-sig", dtype={mapa["socio"]: str, **({mapa["categoria"]: str} if "categoria" in mapa else {})},
+        )
+        with lector:
+            for tanda in lector:
+                yield tanda.rename(columns={v: k for k, v in mapa.items()})
+    finally:
+        if isinstance(origen, str):
+            binario.close()
+
+
+def _tandas_filas(filas: Iterator[dict], filas_por_tanda: int):
+    import pandas as pd
+
+    mapa = None
+    bloque: List[dict] = []
+    for fila in filas:
+        if mapa is None:
+            mapa = _mapa_columnas(list(fila))
+        bloque.append({k: fila.get(v) for k, v in mapa.items()})
+        if len(bloque) >= filas_por_tanda:
+            yield pd.DataFrame(bloque)
+            bloque = []
+    if bloque:
+        yield pd.DataFrame(bloque)
+
+
+def leer_tandas(origen: Origen, formato: Optional[str] = None, filas_por_tanda: int = FILAS_POR_TANDA):
+    """DataFrames de como mucho ``filas_por_tanda`` filas con las columnas de ``COLUMNAS`` presentes."""
+    formato = _formato(origen, formato)
+    if formato in ("csv", "txt"):
+        return _tandas_csv(origen, filas_por_tanda)
+    return _tandas_filas(_filas(origen, formato), filas_por_tanda)
+
+
+def _numeros(columna):
+    import pandas as pd
+
+    if columna.dtype == object or pd.api.types.is_string_dtype(columna):
+        columna = columna.astype(str).str.strip().str.replace(",", ".", regex=False)
+    return pd.to_numeric(columna, errors="coerce").to_numpy(dtype=float)
+
+
+def _claves(tanda, usar_id: bool) -> np.ndarray:
+    """Clave de la marca de agua como float: el ``id`` o los nanosegundos de la fecha."""
+    import pandas as pd
+
+    if usar_id:
+        return _numeros(tanda["id"])
+    fechas = pd.to_datetime(tanda["fecha"], errors="coerce", format="ISO8601")
+    # Lo que no es ISO (01/02/2024) se lee con el día primero, como en España.
+    resto = fechas.isna() & tanda["fecha"].notna()
+    if resto.any():
+        fechas[resto] = pd.to_datetime(tanda["fecha"][resto].astype(str), errors="coerce", dayfirst=True)
+    return np.where(fechas.isna(), np.nan, fechas.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float))
+
+
+class PartesHoras:
+    """Acumulado de partes por (socio, categoría) con marca de agua para reingestas."""
+
+    def __init__(self, estado: Optional[dict] = None):
+        estado = estado or {}
+        self.marca: Optional[float] = estado.get("marca")
+        self.por_id: Optional[bool] = estado.get("por_id")
+        self.filas: int = estado.get("filas", 0)
+        # (socio, categoría) -> [horas, coste]
+        self._acumulado: Dict[Tuple[str, str], List[float]] = {
+            (s, c): [h, x] for s, c, h, x in estado.get("acumulado", [])
+        }
+
+    def estado(self) -> dict:
+        """Estado serializable a JSON para guardarlo con la sesión."""
+        return {
+            "marca": self.marca,
+            "por_id": self.por_id,
+            "filas": self.filas,
+            "acumulado": [[s, c, h, x] for (s, c), (h, x) in sorted(self._acumulado.items())],
+        }
+
+    @property
+    def categorias(self) -> List[str]:
+        return sorted({c for _, c in self._acumulado})
+
+    def ingerir(self, origen: Origen, formato: Optional[str] = None, filas_por_tanda: int = FILAS_POR_TANDA) -> int:
+        """Suma las filas posteriores a la marca de agua y devuelve cuántas eran nuevas.
+
+        Las filas se validan todas antes de tocar el acumulado: si alguna es
+        incorrecta se lanza ``ErrorImportacion`` y el estado queda como estaba.
+        """
+        import pandas as pd
+
+        nuevo: Dict[Tuple[str, str], List[float]] = {}
+        errores: List[str] = []
+        marca = self.marca
+        por_id = self.por_id
+        nuevas = 0
+        inicio = 0
+        for tanda in leer_tandas(origen, formato, filas_por_tanda):
+            if por_id is None:
+                por_id = "id" in tanda.columns
+            elif por_id != ("id" in tanda.columns):
+                raise ErrorImportacion(["La marca de agua se tomó por 'id' y este fichero no lo trae (o al revés)"])
+            socio = tanda["socio"].fillna("").astype(str).str.strip()
+            horas = _numeros(tanda["horas"])
+            tarifa = _numeros(tanda["tarifa"]) if "tarifa" in tanda.columns else np.zeros(len(tanda))
+            tarifa = np.where(np.isnan(tarifa), 0.0, tarifa)
+            clave = _claves(tanda, por_id)
+
+            malas = (socio == "").to_numpy() | np.isnan(horas) | (horas < 0) | (tarifa < 0) | np.isnan(clave)
+            for n in np.flatnonzero(malas)[:MAX_ERRORES - len(errores)]:
+                errores.append(f"Fila {inicio + n + 1}: socio, fecha u horas ausentes o no válidos")
+            inicio += len(tanda)
+            if len(errores) >= MAX_ERRORES:
+                break
+
+            nueva = ~malas if self.marca is None else ~malas & (clave > self.marca)
+            if not nueva.any():
+                continue
+            maximo = float(clave[nueva].max())
+            marca = maximo if marca is None else max(marca, maximo)
+            nuevas += int(nueva.sum())
+            categoria = tanda["categoria"].fillna("").astype(str).str.strip() if "categoria" in tanda.columns else pd.Series("", index=tanda.index)
+            sumas = pd.DataFrame({
+                "socio": socio[nueva],
+                "categoria": categoria[nueva],
+                "horas": horas[nueva],
+                "coste": horas[nueva] * tarifa[nueva],
+            }).groupby(["socio", "categoria"], sort=False).sum()
+            for (s, c), h, x in zip(sumas.index, sumas["horas"].to_numpy(), sumas["coste"].to_numpy()):
+                acumulado = nuevo.setdefault((s, c), [0.0, 0.0])
+                acumulado[0] += h
+                acumulado[1] += x
+        if errores:
+            raise ErrorImportacion(errores)
+
+        for k, (h, x) in nuevo.items():
+            acumulado = self._acumulado.setdefault(k, [0.0, 0.0])
+            acumulado[0] += h
+            acumulado[1] += x
+        self.marca, self.por_id = marca, por_id
+        self.filas += nuevas
+        return nuevas
+
+    def resumen(self, asignacion: Optional[Mapping[str, Optional[str]]] = None, bloques: Sequence[str] = BLOQUES) -> ResumenPartes:
+        """Totales por socio y horas por bloque según ``asignacion`` (categoría -> bloque)."""
+        if asignacion is None:
+            asignacion = categorias_por_defecto(self.categorias, bloques)
+        nombres = sorted({s for s, _ in self._acumulado})
+        fila = {s: i for i, s in enumerate(nombres)}
+        columna = {b: j for j, b in enumerate(bloques)}
+        horas, coste = np.zeros(len(nombres)), np.zeros(len(nombres))
+        horas_bloque = np.zeros((len(nombres), len(bloques)))
+        for (s, c), (h, x) in self._acumulado.items():
+            horas[fila[s]] += h
+            coste[fila[s]] += x
+            j = columna.get(asignacion.get(c))
+            if j is not None:
+                horas_bloque[fila[s], j] += h
+        coste_hora = np.divide(coste, horas, out=np.zeros_like(coste), where=horas > 0)
+        return ResumenPartes(nombres, horas, coste, coste_hora, horas_bloque)
+
+    def marca_legible(self) -> Optional[str]:
+        if self.marca is None:
+            return None
+        if self.por_id:
+            return f"id {self.marca:g}"
+        return str(np.datetime64(int(self.marca), "ns").astype("datetime64[s]"))
@@ -0,0 +1,108 @@
+"""Instrumentación opcional de las etapas de un rerun.
+
+Cada sesión tiene su ``Perfilador`` (ver ``paneles.activar_perfilado``):
+``perfil.etapa("nombre")`` cronometra un bloque y ``perfil.contar`` acumula
+contadores. Mientras el perfilado está desactivado ambas devuelven al
+instante (un único ``if``), así que pueden quedarse en el código de la app.
+Las muestras se guardan en ventanas circulares por etapa para calcular
+p50/p95 recientes y exportarlas como JSON lines.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple
+
+VENTANA = 500
+
+
+class Muestra(NamedTuple):
+    etapa: str
+    segundos: float
+    instante: float
+
+
+class _Nulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULO = _Nulo()
+
+
+class _Cronometro:
+    __slots__ = ("perfil", "nombre", "inicio")
+
+    def __init__(self, perfil: "Perfilador", nombre: str):
+        self.perfil = perfil
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.perfil.registrar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+def _percentil(ordenados, q):
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+class Perfilador:
+    def __init__(self, ventana: int = VENTANA):
+        self.activo = False
+        self.ventana = ventana
+        self._muestras: Dict[str, Deque[Muestra]] = {}
+        self._contadores: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def etapa(self, nombre: str):
+        if not self.activo:
+            return _NULO
+        return _Cronometro(self, nombre)
+
+    def registrar(self, nombre: str, segundos: float) -> None:
+        with self._lock:
+            if nombre not in self._muestras:
+                self._muestras[nombre] = deque(maxlen=self.ventana)
+            self._muestras[nombre].append(Muestra(nombre, segundos, time.time()))
+
+    def contar(self, nombre: str, n: float = 1) -> None:
+        if self.activo:
+            with self._lock:
+                self._contadores[nombre] = self._contadores.get(nombre, 0) + n
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        """Muestras, p50, p95 y última duración (en ms) de cada etapa."""
+        with self._lock:
+            copia = {k: [m.segundos for m in v] for k, v in self._muestras.items()}
+        resultado = {}
+        for nombre, tiempos in copia.items():
+            ordenados = sorted(tiempos)
+            resultado[nombre] = {
+                "muestras": len(tiempos),
+                "p50 ms": _percentil(ordenados, 0.5) * 1e3,
+                "p95 ms": _percentil(ordenados, 0.95) * 1e3,
+                "última ms": tiempos[-1] * 1e3,
+            }
+        return resultado
+
+    def contadores(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._contadores)
+
+    def exportar_jsonl(self) -> bytes:
+        with self._lock:
+            muestras = sorted((m for v in self._muestras.values() for m in v), key=lambda m: m.instante)
+        return "".join(json.dumps(m._asdict(), ensure_ascii=False) + "\n" for m in muestras).encode("utf-8")
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._muestras.clear()
+            self._contadores.clear()
@@ -0,0 +1,38 @@
+"""Precarga en segundo plano de los módulos pesados.
+
+pandas, matplotlib y xlsxwriter solo se importan cuando hacen falta (una
+tabla, un gráfico, un libro Excel), así que el primer pintado no paga su
+coste. Para que tampoco lo pague la primera interacción, ``precargar`` los
+importa en un hilo demonio una sola vez por proceso. Se desactiva con la
+variable de entorno ``REPARTO_PRECARGA=0``.
+"""
+
+import importlib
+import os
+import threading
+from typing import Optional, Sequence
+
+MODULOS_PESADOS = ("pandas", "matplotlib.figure", "matplotlib.backends.backend_agg", "xlsxwriter")
+
+_hilo: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def _importar(modulos: Sequence[str]) -> None:
+    for nombre in modulos:
+        try:
+            importlib.import_module(nombre)
+        except ImportError:
+            pass
+
+
+def precargar(modulos: Sequence[str] = MODULOS_PESADOS) -> Optional[threading.Thread]:
+    """Lanza (una vez) el hilo de precarga y lo devuelve, o ``None`` si está desactivada."""
+    global _hilo
+    if os.environ.get("REPARTO_PRECARGA", "1") == "0":
+        return None
+    with _lock:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_importar, args=(tuple(modulos),), name="precarga", daemon=True)
+            _hilo.start()
+    return _hilo
@@ -0,0 +1,131 @@
+"""Motor de rondas de financiación y dilución acumulada.
+
+Un plan es una lista ordenada de rondas; cada ronda tiene valoración
+pre-money, inversión, un objetivo de pool de opciones (% post-money, emitido
+antes de la ronda, es decir, a cargo de los titulares existentes) y si los
+inversores existentes ejercen su derecho de pro-rata. La tabla de
+capitalización se lleva en fracciones totalmente diluidas y se evalúan muchos
+planes a la vez: el bucle es solo sobre rondas, los planes y los titulares
+van vectorizados.
+
+Columnas de la tabla: los titulares iniciales, el pool de opciones y un
+inversor nuevo por ronda.
+"""
+
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+POOL = "Pool de opciones"
+
+
+class Ronda(NamedTuple):
+    nombre: str
+    pre_money: float
+    inversion: float
+    pool_objetivo: float = 0.0  # % post-money
+    prorrata: bool = False
+
+
+class PlanesRondas(NamedTuple):
+    pre_money: np.ndarray  # (planes, rondas)
+    inversion: np.ndarray  # (planes, rondas)
+    pool_objetivo: np.ndarray  # (planes, rondas), en %
+    prorrata: np.ndarray  # (planes, rondas), bool
+
+
+class ResultadoRondas(NamedTuple):
+    titulares: List[str]
+    participacion: np.ndarray  # (planes, rondas + 1, columnas) en %, la 0 es la inicial
+    dilucion: np.ndarray  # (planes, rondas + 1, titulares iniciales), % de la participación inicial perdida
+    supera_umbral: np.ndarray  # (planes, titulares iniciales), solo fundadores
+    primera_ronda: np.ndarray  # (planes, titulares iniciales), 1..rondas o -1 si nunca lo supera
+
+
+def nombres_unicos(nombres: Sequence[str], vacio: str = "Titular") -> List[str]:
+    """Nombres sin repetir para usarlos como columnas.
+
+    Un nombre vacío pasa a ``f"{vacio} N"`` (N es su posición desde 1) y los
+    repetidos llevan un sufijo " (2)", " (3)"... en orden de aparición.
+    """
+    resultado: List[str] = []
+    usados = set()
+    for i, nombre in enumerate(nombres):
+        base = str(nombre).strip() if nombre is not None else ""
+        base = base or f"{vacio} {i + 1}"
+        candidato, k = base, 1
+        while candidato in usados:
+            k += 1
+            candidato = f"{base} ({k})"
+        usados.add(candidato)
+        resultado.append(candidato)
+    return resultado
+
+
+def planes_desde_rondas(planes: Sequence[Sequence[Ronda]]) -> PlanesRondas:
+    """Apila planes de rondas; los más cortos se rellenan con rondas vacías."""
+    n = max((len(p) for p in planes), default=0)
+    arrays = np.zeros((4, len(planes), n))
+    for i, plan in enumerate(planes):
+        for j, r in enumerate(plan):
+            arrays[:, i, j] = (r.pre_money, r.inversion, r.pool_objetivo, r.prorrata)
+    return PlanesRondas(arrays[0], arrays[1], arrays[2], arrays[3].astype(bool))
+
+
+def simular_rondas(
+    titulares: Sequence[str],
+    participaciones: Sequence[float],
+    planes: PlanesRondas,
+    fundadores=None,
+    con_prorrata=None,
+    pool_inicial: float = 0.0,
+    umbral: float = 25.0,
+) -> ResultadoRondas:
+    """Tabla totalmente diluida tras cada ronda de cada plan.
+
+    ``participaciones`` y ``pool_inicial`` están en % y, juntos, deben sumar
+    100. ``fundadores`` marca qué titulares se comparan con ``umbral``
+    (dilución acumulada en % de su participación inicial); ``con_prorrata``,
+    qué titulares iniciales tienen derecho de pro-rata. Los inversores de
+    cada ronda lo tienen siempre en las rondas siguientes.
+    """
+    h = len(titulares)
+    n_planes, n_rondas = planes.inversion.shape
+    fundadores = np.ones(h, bool) if fundadores is None else np.asarray(fundadores, bool)
+    con_prorrata = np.zeros(h, bool) if con_prorrata is None else np.asarray(con_prorrata, bool)
+    p = h  # índice de la columna del pool
+    c = h + 1 + n_rondas
+
+    o = np.zeros((n_planes, c))
+    o[:, :h] = np.asarray(participaciones, float) / 100
+    o[:, p] = pool_inicial / 100
+    tabla = np.empty((n_planes, n_rondas + 1, c))
+    tabla[:, 0] = o
+
+    derechos = np.zeros(c, bool)
+    derechos[:h] = con_prorrata
+    no_pool = np.ones(c, bool)
+    no_pool[p] = False
+
+    post = planes.pre_money + planes.inversion
+    nuevo = np.divide(planes.inversion, post, out=np.zeros_like(post), where=post > 0)
+    for r in range(n_rondas):
+        f = nuevo[:, r][:, None]
+        pool = np.minimum(np.maximum(o[:, p:p + 1] * (1 - f), planes.pool_objetivo[:, r][:, None] / 100), 1 - f)
+        resto = 1 - o[:, p:p + 1]
+        escala = np.divide(1 - f - pool, resto, out=np.zeros_like(resto), where=resto > 0)
+        # Los titulares con pro-rata compran su % actual de la ronda nueva.
+        toma = np.where(derechos & planes.prorrata[:, r][:, None], o * f, 0.0)
+        o = np.where(no_pool, o * escala, 0.0) + toma
+        o[:, p] = pool[:, 0]
+        o[:, h + 1 + r] = f[:, 0] - toma.sum(axis=1)
+        derechos[h + 1 + r] = True
+        tabla[:, r + 1] = o
+
+    inicial = tabla[:, :1, :h]
+    dilucion = np.divide((inicial - tabla[:, :, :h]) * 100, inicial, out=np.zeros_like(tabla[:, :, :h]), where=inicial > 0)
+    cruza = (dilucion > umbral) & fundadores
+    supera = cruza.any(axis=1)
+    primera = np.where(supera, cruza.argmax(axis=1), -1)
+    nombres = nombres_unicos(list(titulares) + [POOL] + [f"Ronda {r + 1}" for r in range(n_rondas)])
+    return ResultadoRondas(nombres, tabla * 100, dilucion, supera, primera)
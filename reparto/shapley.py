@@ -0,0 +1,171 @@
+"""Reparto por contribución marginal (valor de Shapley).
+
+El valor de una coalición de socios es la suma ponderada por bloque de cómo
+se agregan sus puntuaciones en ese bloque:
+
+- ``suma``: cada socio aporta lo suyo (el Shapley coincide con el reparto
+  lineal de ``reparto.motor``).
+- ``maximo``: el bloque vale lo que el mejor socio de la coalición; dos
+  socios que cubren lo mismo se reparten el mérito.
+- ``saturado``: suma con tope en 100; por encima, más puntuación no añade.
+
+Opcionalmente se añade un bloque de trabajo con las horas x coste de cada
+socio (escalado para que el equipo completo puntúe 100).
+
+Hasta ``MAX_EXACTO`` socios el cálculo es exacto: los valores de las 2^n
+coaliciones se construyen duplicando la tabla por cada socio (programación
+dinámica sobre máscaras de bits) y la contribución marginal de cada socio es
+una resta entre las dos mitades de esa tabla. Por encima se estiman con
+permutaciones aleatorias (y sus inversas, para reducir la varianza) hasta
+alcanzar la tolerancia o el tiempo máximo, con intervalos de confianza.
+"""
+
+import math
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+AGREGADOS = ("suma", "maximo", "saturado")
+MAX_EXACTO = 20
+TIEMPO_MAXIMO = 1.0
+ELEMENTOS_POR_TANDA = 1 << 21  # permutaciones x socios x bloques por tanda
+Z_95 = 1.96
+
+
+class FuncionValor(NamedTuple):
+    puntuaciones: np.ndarray  # (socios, bloques), 0-100
+    pesos: np.ndarray  # (bloques,), en %
+    agregados: Sequence[str]  # uno por bloque
+
+
+class Estimacion(NamedTuple):
+    valores: np.ndarray  # (socios,) en las unidades de la función de valor
+    error: np.ndarray  # (socios,) semiancho del intervalo al 95 % (0 si es exacto)
+    permutaciones: int  # 0 si es exacto
+    exacto: bool
+
+
+def funcion_valor(puntuaciones, pesos, agregados: Optional[Sequence[str]] = None, horas=None, coste_hora=None, peso_trabajo: float = 0.0) -> FuncionValor:
+    """Función de valor por bloques, con el trabajo valorado como bloque aditivo opcional."""
+    puntuaciones = np.asarray(puntuaciones, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    agregados = list(agregados) if agregados is not None else ["suma"] * len(pesos)
+    desconocidos = set(agregados) - set(AGREGADOS)
+    if desconocidos:
+        raise ValueError(f"Agregados no soportados: {sorted(desconocidos)}")
+    if peso_trabajo and horas is not None and coste_hora is not None:
+        trabajo = np.multiply(horas, coste_hora).astype(float)
+        total = trabajo.sum()
+        trabajo = trabajo * 100 / total if total > 0 else np.zeros_like(trabajo)
+        puntuaciones = np.column_stack([puntuaciones, trabajo])
+        pesos = np.append(pesos, peso_trabajo)
+        agregados.append("suma")
+    return FuncionValor(puntuaciones, pesos, agregados)
+
+
+def _agregar(bloque, agregado: str, eje: int = -1, acumulado: bool = False):
+    if agregado == "maximo":
+        return np.maximum.accumulate(bloque, axis=eje) if acumulado else bloque.max(axis=eje)
+    suma = np.cumsum(bloque, axis=eje) if acumulado else bloque.sum(axis=eje)
+    return np.minimum(suma, 100.0) if agregado == "saturado" else suma
+
+
+def valor_coalicion(f: FuncionValor, miembros) -> float:
+    """Valor de la coalición formada por los índices ``miembros``."""
+    sub = f.puntuaciones[list(miembros)]
+    if len(sub) == 0:
+        return 0.0
+    return float(sum(p / 100 * _agregar(sub[:, j], a) for j, (p, a) in enumerate(zip(f.pesos, f.agregados))))
+
+
+def valores_coaliciones(f: FuncionValor) -> np.ndarray:
+    """Valor de las 2^n coaliciones; el bit i de la máscara es el socio i."""
+    n = len(f.puntuaciones)
+    total = np.zeros(1 << n)
+    for j, (peso, agregado) in enumerate(zip(f.pesos, f.agregados)):
+        x = f.puntuaciones[:, j]
+        tabla = np.zeros(1 << n)
+        for i in range(n):
+            mitad = 1 << i
+            if agregado == "maximo":
+                np.maximum(tabla[:mitad], x[i], out=tabla[mitad:2 * mitad])
+            else:
+                np.add(tabla[:mitad], x[i], out=tabla[mitad:2 * mitad])
+        if agregado == "saturado":
+            np.minimum(tabla, 100.0, out=tabla)
+        total += tabla * (peso / 100)
+    return total
+
+
+def shapley_exacto(f: FuncionValor) -> Estimacion:
+    n = len(f.puntuaciones)
+    if n == 0:
+        return Estimacion(np.zeros(0), np.zeros(0), 0, True)
+    v = valores_coaliciones(f)
+    tamano = np.zeros(1 << n, dtype=np.int64)
+    for i in range(n):
+        tamano[1 << i:2 << i] = tamano[:1 << i] + 1
+    # Peso de Shapley de una coalición de tamaño s que no contiene al socio.
+    peso = np.array([1 / (n * math.comb(n - 1, s)) for s in range(n)])
+    valores = np.empty(n)
+    for i in range(n):
+        v3 = v.reshape(-1, 2, 1 << i)
+        sin = tamano.reshape(-1, 2, 1 << i)[:, 0, :]
+        valores[i] = (peso[sin] * (v3[:, 1, :] - v3[:, 0, :])).sum()
+    return Estimacion(valores, np.zeros(n), 0, True)
+
+
+def _marginales(f: FuncionValor, permutaciones: np.ndarray) -> np.ndarray:
+    """Contribución marginal (permutaciones, socios) de cada socio en cada orden."""
+    m, n = permutaciones.shape
+    ordenadas = f.puntuaciones[permutaciones]  # (m, n, bloques)
+    prefijos = np.zeros((m, n))
+    for j, (peso, agregado) in enumerate(zip(f.pesos, f.agregados)):
+        prefijos += peso / 100 * _agregar(ordenadas[:, :, j], agregado, eje=1, acumulado=True)
+    delta = np.diff(prefijos, axis=1, prepend=0.0)
+    marginales = np.empty_like(delta)
+    np.put_along_axis(marginales, permutaciones, delta, axis=1)
+    return marginales
+
+
+def shapley_muestreo(
+    f: FuncionValor,
+    semilla: Optional[int] = None,
+    tiempo_maximo: float = TIEMPO_MAXIMO,
+    tolerancia: float = 0.01,
+    tanda: Optional[int] = None,
+    max_permutaciones: int = 1_000_000,
+) -> Estimacion:
+    """Estimación por permutaciones antitéticas con intervalos de confianza al 95 %.
+
+    Se muestrea por tandas hasta que el semiancho de todos los intervalos
+    baja de ``tolerancia`` por el valor medio por socio, se agota
+    ``tiempo_maximo`` o se llega a ``max_permutaciones``. Por defecto, el
+    tamaño de tanda se ajusta para no pasar de ``ELEMENTOS_POR_TANDA``.
+    """
+    n = len(f.puntuaciones)
+    tanda = tanda or int(np.clip(ELEMENTOS_POR_TANDA // max(f.puntuaciones.size, 1), 2, 256))
+    rng = np.random.default_rng(semilla)
+    objetivo = tolerancia * abs(valor_coalicion(f, range(n))) / max(n, 1)
+    suma, suma2, muestras = np.zeros(n), np.zeros(n), 0
+    inicio = time.perf_counter()
+    while True:
+        permutaciones = rng.permuted(np.tile(np.arange(n), (tanda, 1)), axis=1)
+        # Cada permutación y su inversa forman una sola muestra (su media).
+        muestra = (_marginales(f, permutaciones) + _marginales(f, permutaciones[:, ::-1])) / 2
+        suma += muestra.sum(axis=0)
+        suma2 += (muestra ** 2).sum(axis=0)
+        muestras += tanda
+        media = suma / muestras
+        varianza = np.maximum(suma2 / muestras - media ** 2, 0) * muestras / max(muestras - 1, 1)
+        error = Z_95 * np.sqrt(varianza / muestras)
+        if error.max() <= objetivo or time.perf_counter() - inicio >= tiempo_maximo or 2 * muestras >= max_permutaciones:
+            return Estimacion(media, error, 2 * muestras, False)
+
+
+def shapley(f: FuncionValor, max_exacto: int = MAX_EXACTO, **opciones) -> Estimacion:
+    """Exacto hasta ``max_exacto`` socios y por muestreo a partir de ahí."""
+    if len(f.puntuaciones) <= max_exacto:
+        return shapley_exacto(f)
+    return shapley_muestreo(f, **opciones)
@@ -0,0 +1,73 @@
+"""Tabla de socios en columnas densas.
+
+Las puntuaciones de todos los socios son una sola matriz ``float64``
+(socios, bloques) y el resto de campos un array por columna, en lugar de una
+lista de filas con tipos mezclados: con miles de socios y decenas de bloques
+ocupa 8 bytes por celda, el motor la usa sin convertir nada y la clave de
+caché es un hash de los buffers.
+"""
+
+from typing import List, Sequence
+
+import numpy as np
+
+
+def _columna(valores, n: int) -> np.ndarray:
+    if valores is None:
+        return np.zeros(n)
+    return np.ascontiguousarray(valores, dtype=float).reshape(n)
+
+
+class TablaSocios:
+    __slots__ = ("nombres", "puntuaciones", "blindado", "horas", "coste_hora")
+
+    def __init__(self, nombres: Sequence[str], puntuaciones, blindado=None, horas=None, coste_hora=None):
+        self.nombres: List[str] = list(nombres)
+        n = len(self.nombres)
+        puntuaciones = np.ascontiguousarray(puntuaciones, dtype=float)
+        if puntuaciones.ndim != 2:
+            puntuaciones = puntuaciones.reshape(n, -1) if n else np.zeros((0, 0))
+        if len(puntuaciones) != n:
+            raise ValueError(f"{len(puntuaciones)} filas de puntuaciones para {n} socios")
+        self.puntuaciones = puntuaciones
+        self.blindado = _columna(blindado, n)
+        self.horas = _columna(horas, n)
+        self.coste_hora = _columna(coste_hora, n)
+
+    @classmethod
+    def vacia(cls, n: int, bloques: int) -> "TablaSocios":
+        """Tabla de ``n`` socios sin nombre ni puntuaciones, para rellenarla fila a fila."""
+        return cls([""] * n, np.zeros((n, bloques)))
+
+    def __len__(self) -> int:
+        return len(self.nombres)
+
+    @property
+    def bloques(self) -> int:
+        return self.puntuaciones.shape[1]
+
+    @property
+    def trabajo(self) -> np.ndarray:
+        """Horas x coste por hora de cada socio."""
+        return self.horas * self.coste_hora
+
+    @property
+    def nbytes(self) -> int:
+        return self.puntuaciones.nbytes + self.blindado.nbytes + self.horas.nbytes + self.coste_hora.nbytes
+
+    def con_puntuaciones(self, puntuaciones) -> "TablaSocios":
+        """Los mismos socios con otras puntuaciones (p. ej. agrupadas por bloque de primer nivel)."""
+        return TablaSocios(self.nombres, puntuaciones, self.blindado, self.horas, self.coste_hora)
+
+    def to_dict(self) -> dict:
+        # Para la clave de caché: los arrays se resumen con un hash de su buffer.
+        return {
+            "nombres": self.nombres,
+            "puntuaciones": self.puntuaciones,
+            "blindado": self.blindado,
+            "horas": self.horas,
+            "coste_hora": self.coste_hora,
+        }
+
+    def __repr__(self) -> str:
+        return f"TablaSocios({len(self)} socios x {self.bloques} bloques)"
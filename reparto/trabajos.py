@@ -0,0 +1,192 @@
+"""Trabajos en segundo plano con progreso, resultados parciales y cancelación.
+
+Los cálculos largos (barridos finos, libros Excel con el barrido completo,
+simulaciones de millones de tiradas) se envían a un pool de hilos acotado en
+lugar de ejecutarse en el hilo del script. Cada trabajo recibe el argumento
+``avance``, con el que publica su progreso y resultados parciales; la
+cancelación es cooperativa: la siguiente llamada a ``avance`` tras pedirla
+lanza ``Cancelado``.
+
+El gestor es del proceso, como la caché, y los trabajos se identifican por la
+clave de sus entradas: enviar otra vez el mismo cálculo devuelve el trabajo
+que ya está en marcha o terminado en lugar de empezar otro, así que un rerun
+se vuelve a enganchar a él. Como varias sesiones pueden compartir un trabajo,
+cada una se apunta como suscriptora al enviarlo y ``cancelar`` con un
+suscriptor solo lo da de baja: el trabajo se cancela cuando se va el último.
+Las funciones que se lanzan suelen ser
+``cacheado`` (que no incluye ``avance`` en la clave), así que un resultado
+sigue disponible en la caché después de purgarse del registro.
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set
+
+MAX_HILOS = 2
+MAX_TERMINADOS = 64
+TTL = 3600.0
+
+EN_COLA, EN_MARCHA, TERMINADO, FALLIDO, CANCELADO = "en_cola", "en_marcha", "terminado", "fallido", "cancelado"
+ACTIVOS = (EN_COLA, EN_MARCHA)
+
+
+class Cancelado(Exception):
+    pass
+
+
+class Trabajo(NamedTuple):
+    id: str
+    clave: str
+    estado: str
+    progreso: float  # 0-1
+    mensaje: str
+    parcial: Any  # último resultado parcial publicado
+    resultado: Any
+    error: Optional[str]
+    segundos: float
+
+
+class _Registro:
+    def __init__(self, id_trabajo: str, clave: str):
+        self.id = id_trabajo
+        self.clave = clave
+        self.estado = EN_COLA
+        self.progreso = 0.0
+        self.mensaje = ""
+        self.parcial = None
+        self.resultado = None
+        self.error: Optional[str] = None
+        self.inicio = time.monotonic()
+        self.fin: Optional[float] = None
+        self.cancelar = threading.Event()
+        self.futuro: Optional[Future] = None
+        self.suscriptores: Set[str] = set()
+
+    def foto(self) -> Trabajo:
+        segundos = (self.fin or time.monotonic()) - self.inicio
+        return Trabajo(self.id, self.clave, self.estado, self.progreso, self.mensaje, self.parcial, self.resultado, self.error, segundos)
+
+
+class Avance:
+    """Lo que recibe cada trabajo para informar de su progreso."""
+
+    def __init__(self, registro: _Registro):
+        self._registro = registro
+
+    @property
+    def cancelado(self) -> bool:
+        return self._registro.cancelar.is_set()
+
+    def __call__(self, progreso: float, mensaje: str = "", parcial=None) -> None:
+        if self.cancelado:
+            raise Cancelado()
+        r = self._registro
+        r.progreso = min(max(float(progreso), 0.0), 1.0)
+        r.mensaje = mensaje
+        if parcial is not None:
+            r.parcial = parcial
+
+
+class GestorTrabajos:
+    def __init__(self, max_hilos: int = MAX_HILOS, max_terminados: int = MAX_TERMINADOS, ttl: float = TTL):
+        self.max_hilos = max_hilos
+        self.max_terminados = max_terminados
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._trabajos: Dict[str, _Registro] = {}
+        self._por_clave: Dict[str, str] = {}
+        self._contador = itertools.count(1)
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="trabajos")
+        return self._pool
+
+    def _purgar(self) -> None:
+        ahora = time.monotonic()
+        terminados = sorted((r for r in self._trabajos.values() if r.fin is not None), key=lambda r: r.fin)
+        sobran = len(terminados) - self.max_terminados
+        for i, r in enumerate(terminados):
+            if i < sobran or ahora - r.fin > self.ttl:
+                del self._trabajos[r.id]
+                if self._por_clave.get(r.clave) == r.id:
+                    del self._por_clave[r.clave]
+
+    def enviar(
+        self, clave: str, funcion: Callable[..., Any], *args, reintentar: bool = False, suscriptor: Optional[str] = None
+    ) -> str:
+        """Lanza ``funcion(*args, avance=...)`` y devuelve su identificador.
+
+        Si ya hay un trabajo con la misma clave en cola, en marcha o terminado
+        se devuelve ese. Uno fallido también, salvo con ``reintentar``; uno
+        cancelado se vuelve a lanzar. ``suscriptor`` (p. ej. la sesión) queda
+        apuntado al trabajo devuelto.
+        """
+        with self._lock:
+            self._purgar()
+            existente = self._trabajos.get(self._por_clave.get(clave, ""))
+            if existente is not None and (existente.estado in ACTIVOS + (TERMINADO,) or (existente.estado == FALLIDO and not reintentar)):
+                if suscriptor is not None:
+                    existente.suscriptores.add(suscriptor)
+                return existente.id
+            registro = _Registro(f"t{next(self._contador)}", clave)
+            if suscriptor is not None:
+                registro.suscriptores.add(suscriptor)
+            self._trabajos[registro.id] = registro
+            self._por_clave[clave] = registro.id
+            registro.futuro = self._executor().submit(self._ejecutar, registro, funcion, args)
+            return registro.id
+
+    def _ejecutar(self, registro: _Registro, funcion, args) -> None:
+        if registro.cancelar.is_set():
+            registro.estado, registro.fin = CANCELADO, time.monotonic()
+            return
+        registro.estado = EN_MARCHA
+        registro.inicio = time.monotonic()
+        try:
+            resultado = funcion(*args, avance=Avance(registro))
+        except Cancelado:
+            registro.estado = CANCELADO
+        except Exception as exc:  # el error se muestra en la página que lanzó el trabajo
+            registro.error = f"{type(exc).__name__}: {exc}"
+            registro.estado = FALLIDO
+        else:
+            registro.resultado, registro.progreso, registro.parcial = resultado, 1.0, None
+            registro.estado = TERMINADO
+        finally:
+            registro.fin = time.monotonic()
+
+    def estado(self, id_trabajo: str) -> Optional[Trabajo]:
+        registro = self._trabajos.get(id_trabajo)
+        return registro.foto() if registro is not None else None
+
+    def cancelar(self, id_trabajo: str, suscriptor: Optional[str] = None) -> bool:
+        """Pide cancelar el trabajo; los que aún están en cola no llegan a empezar.
+
+        Con ``suscriptor`` solo lo da de baja, y el trabajo se cancela si no
+        queda ningún otro. Devuelve si se ha cancelado.
+        """
+        with self._lock:
+            registro = self._trabajos.get(id_trabajo)
+            if registro is None or registro.estado not in ACTIVOS:
+                return False
+            if suscriptor is not None:
+                registro.suscriptores.discard(suscriptor)
+                if registro.suscriptores:
+                    return False
+            registro.cancelar.set()
+            if registro.futuro is not None and registro.futuro.cancel():
+                registro.estado, registro.fin = CANCELADO, time.monotonic()
+            return True
+
+    def activos(self) -> int:
+        """Trabajos en cola o en marcha de todas las sesiones."""
+        with self._lock:
+            return sum(r.estado in ACTIVOS for r in self._trabajos.values())
+
+
+# Instancia del proceso: en Streamlit la comparten todas las sesiones.
+TRABAJOS = GestorTrabajos()
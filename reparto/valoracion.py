@@ -0,0 +1,135 @@
+"""Valoración pre-money y participación del inversor, puntual y Monte Carlo.
+
+Las fórmulas son las de ``app2.py``: valor por coste (horas x precio hora +
+gastos), valor por potencial (usuarios x precio mensual x 12 x margen x
+multiplicador) y la media de ambos como valoración pre-money. Todas aceptan
+arrays, de modo que la simulación reutiliza exactamente el mismo código.
+"""
+
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+ENTRADAS = ("horas", "coste_hora", "gastos", "usuarios", "precio_mensual", "margen", "multiplicador")
+METRICAS = ("pre_money", "participacion", "roi")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def valor_coste(horas, coste_hora, gastos):
+    return np.multiply(horas, coste_hora) + gastos
+
+
+def valor_potencial(usuarios, precio_mensual, margen, multiplicador=2):
+    ingresos_anuales = np.multiply(usuarios, precio_mensual) * 12
+    return ingresos_anuales * (np.divide(margen, 100)) * multiplicador
+
+
+def valoracion_pre_money(horas, coste_hora, gastos, usuarios, precio_mensual, margen, multiplicador=2):
+    coste = valor_coste(horas, coste_hora, gastos)
+    potencial = valor_potencial(usuarios, precio_mensual, margen, multiplicador)
+    return (coste + potencial) / 2
+
+
+def participacion_inversor(aportacion, pre_money):
+    """% post-inversión que corresponde a ``aportacion`` sobre ``pre_money``."""
+    aportacion = np.asarray(aportacion, dtype=float)
+    post = np.asarray(pre_money, dtype=float) + aportacion
+    return np.divide(aportacion * 100, post, out=np.zeros_like(post), where=post > 0)
+
+
+class Distribucion(NamedTuple):
+    tipo: str  # "fija", "uniforme", "triangular", "normal" o "lognormal"
+    parametros: tuple
+
+    def muestrear(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        p = self.parametros
+        if self.tipo == "fija":
+            return np.full(n, float(p[0]))
+        if self.tipo == "uniforme":
+            return rng.uniform(p[0], p[1], n)
+        if self.tipo == "triangular":
+            if p[0] == p[2]:
+                return np.full(n, float(p[1]))
+            return rng.triangular(p[0], p[1], p[2], n)
+        if self.tipo == "normal":
+            return rng.normal(p[0], p[1], n)
+        if self.tipo == "lognormal":
+            return rng.lognormal(p[0], p[1], n)
+        raise ValueError(f"Distribución desconocida: {self.tipo!r}")
+
+
+def distribuciones_triangulares(valores: Dict[str, float], incertidumbre: float) -> Dict[str, Distribucion]:
+    """Triangular centrada en cada valor puntual con un margen de ± ``incertidumbre`` %."""
+    u = incertidumbre / 100
+    return {k: Distribucion("triangular", (v * (1 - u), v, v * (1 + u))) for k, v in valores.items()}
+
+
+class ResultadoSimulacion(NamedTuple):
+    n: int
+    percentiles: Sequence[float]
+    cuantiles: Dict[str, np.ndarray]  # métrica -> valor en cada percentil
+    medias: Dict[str, float]
+
+
+def _muestras(entradas: Dict[str, Distribucion], rng, n):
+    x = {k: np.maximum(entradas[k].muestrear(rng, n), 0) for k in ENTRADAS}
+    x["margen"] = np.minimum(x["margen"], 100)
+    return x
+
+
+def simular_valoracion(
+    entradas: Dict[str, Distribucion],
+    aportacion: float,
+    precio_pre_money: float,
+    simulaciones: int = 1_000_000,
+    bloque: int = 1 << 17,
+    max_muestras: int = 1 << 20,
+    percentiles: Sequence[float] = PERCENTILES,
+    semilla: Optional[int] = None,
+    avance: Optional[Callable] = None,
+) -> ResultadoSimulacion:
+    """Percentiles de valoración pre-money, participación del inversor y ROI.
+
+    El inversor entra al precio negociado ``precio_pre_money`` (la estimación
+    puntual de la app), así que su ROI es el valor de su participación en la
+    valoración simulada menos la aportación.
+
+    Las muestras se generan en bloques de ``bloque`` tiradas; de cada bloque se
+    conserva una fracción fija para que nunca se guarden más de
+    ``max_muestras`` valores por métrica, sea cual sea ``simulaciones``. Como
+    las tiradas son independientes, esa submuestra es aleatoria y los
+    percentiles son insesgados; con menos simulaciones que ``max_muestras``
+    son exactos. Las medias siempre usan todas las tiradas.
+
+    Si se da ``avance``, se llama tras cada bloque con la fracción hecha y,
+    como resultado parcial, las medias de las tiradas hechas hasta entonces.
+    """
+    rng = np.random.default_rng(semilla)
+    participacion_pactada = float(participacion_inversor(aportacion, precio_pre_money))
+
+    guardar = min(bloque, -(-max_muestras * bloque // max(simulaciones, 1)))
+    guardadas = {m: [] for m in METRICAS}
+    sumas = dict.fromkeys(METRICAS, 0.0)
+    hechas = conservadas = 0
+    while hechas < simulaciones:
+        n = min(bloque, simulaciones - hechas)
+        x = _muestras(entradas, rng, n)
+        pre_money = valoracion_pre_money(*(x[k] for k in ENTRADAS))
+        metricas = {
+            "pre_money": pre_money,
+            "participacion": participacion_inversor(aportacion, pre_money),
+            "roi": participacion_pactada / 100 * (pre_money + aportacion) - aportacion,
+        }
+        # ``guardar`` se redondea hacia arriba: el último bloque se recorta al límite.
+        k = min(guardar, n, max_muestras - conservadas)
+        for m, v in metricas.items():
+            sumas[m] += float(v.sum())
+            guardadas[m].append(v[:k])
+        hechas += n
+        conservadas += k
+        if avance is not None:
+            avance(hechas / simulaciones, f"{hechas:,} de {simulaciones:,} tiradas", {m: v / hechas for m, v in sumas.items()})
+
+    cuantiles = {m: np.percentile(np.concatenate(v), percentiles) for m, v in guardadas.items()}
+    medias = {m: s / simulaciones for m, s in sumas.items()}
+    return ResultadoSimulacion(simulaciones, tuple(percentiles), cuantiles, medias)
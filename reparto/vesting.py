@@ -0,0 +1,141 @@
+"""Calendario de vesting por socio y mes, con cliff, aceleración y salidas.
+
+Cada concesión consolida linealmente por meses naturales desde el de inicio:
+nada hasta cumplir el cliff, de golpe lo acumulado al cumplirlo y el resto mes
+a mes hasta ``duracion``. Con aceleración ``a``, desde el disparo queda
+consolidado ``a + (1 - a) f(m)``: se adelanta la fracción ``a`` de lo
+pendiente y el resto sigue su calendario. El disparo simple es la venta de la
+empresa; el doble, la salida del socio después de la venta.
+
+Cuando un socio sale, su vesting se congela en el mes de salida, se recompra
+la fracción ``recompra`` de lo consolidado (0 en una buena salida, 1 en una
+mala) y todo lo no consolidado vuelve al pool.
+
+El calendario entero es un array (titulares, meses) de importes acumulados,
+así que la tabla a una fecha es un índice: O(1) por fecha sea cual sea la
+duración, y un array de fechas se resuelve de una vez.
+"""
+
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+DISPAROS = ("simple", "doble")
+_NUNCA = np.iinfo(np.int64).max
+
+
+class Concesion(NamedTuple):
+    titular: str
+    cantidad: float  # acciones o % concedidos
+    inicio: object  # fecha (str ISO, date o datetime64); cuenta el mes entero
+    cliff: int = 12  # meses
+    duracion: int = 48  # meses; 0 consolida todo al inicio
+    aceleracion: float = 0.0  # fracción 0-1 de lo pendiente que se adelanta en el disparo
+    disparo: str = "simple"
+    salida: object = None  # fecha de salida del socio, si sale
+    recompra: float = 0.0  # fracción 0-1 de lo consolidado que se recompra al salir
+
+
+class Calendario(NamedTuple):
+    titulares: List[str]
+    meses: np.ndarray  # (meses,) datetime64[M]
+    cantidad: np.ndarray  # (titulares,)
+    consolidado: np.ndarray  # (titulares, meses) acumulado consolidado
+    devuelto: np.ndarray  # (titulares, meses) acumulado devuelto al pool
+
+
+class Foto(NamedTuple):
+    consolidado: np.ndarray  # (..., titulares)
+    pendiente: np.ndarray  # (..., titulares) concedido aún sin consolidar
+    devuelto: np.ndarray  # (..., titulares)
+    pool: np.ndarray  # (...,) total devuelto al pool
+
+
+def _mes(fecha) -> np.datetime64:
+    if fecha is None or (isinstance(fecha, float) and np.isnan(fecha)) or (isinstance(fecha, str) and not fecha.strip()):
+        return np.datetime64("NaT", "M")
+    return np.datetime64(fecha).astype("datetime64[M]")
+
+
+def _fraccion(k, cliff, duracion):
+    """Fracción consolidada tras ``k`` meses desde el inicio, sin eventos."""
+    lineal = np.divide(k, duracion, out=(k >= 0).astype(float), where=duracion > 0)
+    return np.where(k >= np.maximum(cliff, 0), np.clip(lineal, 0.0, 1.0), 0.0)
+
+
+def calendario(concesiones: Sequence[Concesion], venta=None, hasta=None) -> Calendario:
+    """Calendario mensual de todas las concesiones a la vez.
+
+    ``venta`` es la fecha de venta de la empresa (disparo de la
+    aceleración). El calendario va del primer mes de inicio al último en que
+    algo cambia, o hasta ``hasta`` si es posterior.
+    """
+    n = len(concesiones)
+    if n == 0:
+        return Calendario([], np.array([], dtype="datetime64[M]"), np.zeros(0), np.zeros((0, 0)), np.zeros((0, 0)))
+    desconocidos = {c.disparo for c in concesiones} - set(DISPAROS)
+    if desconocidos:
+        raise ValueError(f"Disparos no soportados: {sorted(desconocidos)}")
+    cantidad = np.array([c.cantidad for c in concesiones], dtype=float)
+    cliff = np.array([c.cliff for c in concesiones], dtype=np.int64)
+    duracion = np.array([c.duracion for c in concesiones], dtype=np.int64)
+    aceleracion = np.clip(np.array([c.aceleracion for c in concesiones], dtype=float), 0.0, 1.0)
+    recompra = np.clip(np.array([c.recompra for c in concesiones], dtype=float), 0.0, 1.0)
+    doble = np.array([c.disparo == "doble" for c in concesiones])
+    if (cantidad < 0).any() or (cliff < 0).any() or (duracion < 0).any():
+        raise ValueError("Cantidades, cliff y duración no pueden ser negativos")
+
+    inicio = np.array([_mes(c.inicio) for c in concesiones], dtype="datetime64[M]")
+    if np.isnat(inicio).any():
+        raise ValueError("Todas las concesiones necesitan fecha de inicio")
+    salida = np.array([_mes(c.salida) for c in concesiones], dtype="datetime64[M]")
+    origen = inicio.min()
+    # Meses desde el origen; _NUNCA para los eventos que no ocurren.
+    i0 = (inicio - origen).astype(np.int64)
+    sale = ~np.isnat(salida)
+    i_salida = np.where(sale, (salida - origen).astype(np.int64), _NUNCA)
+    i_venta = _NUNCA if np.isnat(_mes(venta)) else int((_mes(venta) - origen).astype(np.int64))
+    disparo = np.where(
+        doble,
+        np.where(sale & (i_salida >= i_venta), i_salida, _NUNCA),
+        np.where(i_venta <= i_salida, i_venta, _NUNCA),
+    )
+
+    eventos = [i0 + np.maximum(duracion, cliff), i_salida[sale]]
+    if i_venta != _NUNCA:
+        eventos.append([i_venta])
+    if hasta is not None and not np.isnat(_mes(hasta)):
+        eventos.append([int((_mes(hasta) - origen).astype(np.int64))])
+    m = np.arange(max(int(np.max(e)) for e in eventos if len(e)) + 1, dtype=np.int64)
+
+    def consolidada(columna):
+        f = _fraccion(columna - i0[:, None], cliff[:, None], duracion[:, None])
+        a = aceleracion[:, None]
+        return np.where(columna >= disparo[:, None], a + (1 - a) * f, f)
+
+    fraccion = consolidada(m[None, :])
+    # Tras la salida, lo consolidado se congela (menos la recompra) y el resto vuelve al pool.
+    al_salir = consolidada(np.where(sale, i_salida, 0)[:, None])[:, 0] * (1 - recompra)
+    fuera = m[None, :] >= i_salida[:, None]
+    fraccion = np.where(fuera, al_salir[:, None], fraccion)
+    devuelto = np.where(fuera, 1 - al_salir[:, None], 0.0)
+
+    meses = origen + m.astype("timedelta64[M]")
+    titulares = [c.titular for c in concesiones]
+    return Calendario(titulares, meses, cantidad, fraccion * cantidad[:, None], devuelto * cantidad[:, None])
+
+
+def foto(cal: Calendario, fechas) -> Foto:
+    """Tabla de capital a una fecha o a un array de fechas (una fila por fecha)."""
+    fechas = np.asarray(fechas, dtype="datetime64[D]").astype("datetime64[M]")
+    n = len(cal.titulares)
+    if len(cal.meses) == 0:
+        forma = fechas.shape + (n,)
+        return Foto(np.zeros(forma), np.zeros(forma), np.zeros(forma), np.zeros(fechas.shape))
+    i = (fechas - cal.meses[0]).astype(np.int64)
+    antes = (i < 0)[..., None]
+    i = np.clip(i, 0, len(cal.meses) - 1)
+    consolidado = np.where(antes, 0.0, np.moveaxis(cal.consolidado[:, i], 0, -1))
+    devuelto = np.where(antes, 0.0, np.moveaxis(cal.devuelto[:, i], 0, -1))
+    pendiente = np.where(antes, cal.cantidad, cal.cantidad - consolidado - devuelto)
+    return Foto(consolidado, pendiente, devuelto, devuelto.sum(axis=-1))
@@ -1 +1,8 @@
-import app_reparto_full
+import streamlit as st
+
+from reparto.precarga import precargar
+
+# La página se ejecuta en cada rerun (un ``import`` solo la ejecutaría una vez
+# por proceso) y la precarga empieza cuando ya se ha enviado el primer pintado.
+st.navigation([st.Page("app_reparto_full.py", title="Reparto de participaciones", default=True)]).run()
+precargar()
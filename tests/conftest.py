@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+
+@pytest.fixture
+def en_tmp(tmp_path, monkeypatch):
+    """Directorio de trabajo temporal: las páginas que guardan sesión no ensucian el repositorio."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
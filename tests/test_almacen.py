@@ -0,0 +1,53 @@
+from reparto.almacen import AlmacenSesiones
+
+
+def test_cache_acotada_relee_de_sqlite(tmp_path):
+    almacen = AlmacenSesiones(str(tmp_path / "sesiones.db"), intervalo=60, max_cache=2)
+    for n in range(5):
+        almacen.guardar(f"s{n}", "principal", {"valor": n})
+    assert len(almacen._cache) == 2
+    assert [almacen.cargar(f"s{n}", "principal") for n in range(5)] == [{"valor": n} for n in range(5)]
+    assert len(almacen._cache) == 2
+
+
+def test_sesiones_aisladas_y_solo_se_escribe_lo_que_cambia(tmp_path):
+    ruta = str(tmp_path / "sesiones.db")
+    almacen = AlmacenSesiones(ruta, intervalo=60)
+    almacen.guardar("ana", "principal", {"pesos": [30, 70], "socios": ["Ana"]})
+    almacen.guardar("luis", "principal", {"pesos": [50, 50]})
+    almacen.volcar()
+    escritos = almacen.bytes_escritos
+
+    almacen.guardar("ana", "principal", {"pesos": [30, 70], "socios": ["Ana", "Marta"]}, inmediato=True)
+    assert almacen.bytes_escritos - escritos == len('["Ana", "Marta"]')
+
+    # Otro proceso ve lo volcado, cada sesión con lo suyo.
+    otro = AlmacenSesiones(ruta)
+    assert otro.cargar("ana") == {"pesos": [30, 70], "socios": ["Ana", "Marta"]}
+    assert otro.cargar("luis") == {"pesos": [50, 50]}
+    assert otro.cargar("nadie") == {}
+
+
+def test_escrituras_agrupadas_hasta_el_volcado(tmp_path):
+    ruta = str(tmp_path / "sesiones.db")
+    almacen = AlmacenSesiones(ruta, intervalo=60)
+    almacen.guardar("ana", "principal", {"pesos": [1]}, inmediato=True)
+    for n in range(10):
+        almacen.guardar("ana", "principal", {"pesos": [n]})
+    assert AlmacenSesiones(ruta).cargar("ana") == {"pesos": [1]}
+    assert almacen.cargar("ana") == {"pesos": [9]}
+    almacen.volcar()
+    assert AlmacenSesiones(ruta).cargar("ana") == {"pesos": [9]}
+
+
+def test_borrar_escenario_o_sesion(tmp_path):
+    almacen = AlmacenSesiones(str(tmp_path / "sesiones.db"), intervalo=60)
+    almacen.guardar("ana", "principal", {"a": 1})
+    almacen.guardar("ana", "optimista", {"a": 2}, inmediato=True)
+    almacen.guardar("ana", "pesimista", {"a": 3})
+    almacen.borrar("ana", "optimista")
+    assert almacen.cargar("ana", "optimista") == {}
+    assert almacen.cargar("ana", "principal") == {"a": 1}
+    almacen.borrar("ana")
+    almacen.volcar()
+    assert AlmacenSesiones(almacen.ruta).cargar("ana", "pesimista") == {}
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from reparto.barrido import (
+    CUANTILES,
+    bandas_barrido,
+    barrido_pesos,
+    barrido_socio,
+    combinaciones_pesos,
+    filas_barrido,
+    mapa_calor,
+    numero_combinaciones,
+)
+
+
+def test_barrido_socio_coincide_con_la_columna_del_barrido():
+    rng = np.random.default_rng(0)
+    puntuaciones = rng.integers(0, 101, (30, 4))
+    blindado = rng.uniform(0, 5, 30)
+    combinaciones = combinaciones_pesos(4, 100, 5)
+    completo = barrido_pesos(puntuaciones, blindado, combinaciones)
+    for socio in (0, 7, 29):
+        np.testing.assert_allclose(barrido_socio(puntuaciones, blindado, combinaciones, socio), completo[:, socio])
+
+
+def test_combinaciones_suman_el_total_sin_repetirse():
+    combinaciones = combinaciones_pesos(4, 100, 1)
+    assert len(combinaciones) == numero_combinaciones(4, 100, 1) == 176_851
+    assert (combinaciones.sum(axis=1) == 100).all() and (combinaciones >= 0).all()
+    assert len(np.unique(combinaciones, axis=0)) == len(combinaciones)
+    assert combinaciones_pesos(3, 10, 5).tolist() == [[0, 0, 10], [0, 5, 5], [0, 10, 0], [5, 0, 5], [5, 5, 0], [10, 0, 0]]
+    with pytest.raises(ValueError):
+        combinaciones_pesos(4, 100, 3)
+
+
+def test_bandas_por_tandas_igual_que_el_barrido_entero():
+    rng = np.random.default_rng(1)
+    puntuaciones = rng.integers(0, 101, (10, 4))
+    blindado = rng.uniform(0, 5, 10)
+    combinaciones = combinaciones_pesos(4, 100, 5)
+    completo = barrido_pesos(puntuaciones, blindado, combinaciones)
+
+    parciales = []
+    bandas = bandas_barrido(puntuaciones, blindado, combinaciones, socios_por_tanda=4, avance=lambda f, _, b: parciales.append((f, b)))
+    np.testing.assert_allclose(bandas.minimo, completo.min(axis=0))
+    np.testing.assert_allclose(bandas.maximo, completo.max(axis=0))
+    np.testing.assert_allclose(bandas.cuantiles, np.quantile(completo, CUANTILES, axis=0))
+    assert [f for f, _ in parciales] == [0.4, 0.8, 1.0]
+    # Las bandas parciales dejan a NaN los socios que aún no se han resuelto.
+    assert np.isnan(parciales[0][1].minimo).tolist() == [False] * 4 + [True] * 6
+
+
+def test_filas_barrido_por_tandas():
+    combinaciones = combinaciones_pesos(4, 100, 10)
+    puntuaciones, blindado = [[100, 0, 0, 0], [0, 100, 100, 100]], [0, 0]
+    filas = np.vstack(list(filas_barrido(puntuaciones, blindado, combinaciones, combinaciones_por_tanda=7)))
+    np.testing.assert_array_equal(filas[:, :4], combinaciones)
+    # El primer socio solo puntúa en el primer bloque: se lleva su peso.
+    np.testing.assert_allclose(filas[:, 4], combinaciones[:, 0])
+
+
+def test_mapa_calor_promedia_por_casilla():
+    pesos = np.array([[0, 0, 10], [0, 0, 10], [10, 0, 0], [0, 10, 0]])
+    mapa = mapa_calor(pesos, np.array([1.0, 3.0, 5.0, 7.0]), eje_x=0, eje_y=1, total=10, paso=10)
+    assert mapa[0, 0] == 2.0 and mapa[0, 1] == 5.0 and mapa[1, 0] == 7.0
+    assert np.isnan(mapa[1, 1])
@@ -0,0 +1,54 @@
+import json
+
+from benchmarks import __main__ as principal
+from benchmarks import micro
+from benchmarks.medicion import Medida, medir
+
+
+def test_medir_agrupa_llamadas_y_mide_memoria():
+    llamadas = []
+    m = medir("lista", lambda: llamadas.append(bytearray(1_000_000)), repeticiones=3, presupuesto=0, memoria=True)
+    # Calentamiento, una llamada de estimación, una por repetición y la de memoria.
+    assert len(llamadas) == 6
+    assert m.repeticiones == 3
+    assert m.minimo <= m.segundos
+    assert m.pico_bytes >= 1_000_000
+
+
+def test_micro_cubre_los_presupuestos(monkeypatch):
+    monkeypatch.setattr(micro, "medir", lambda nombre, funcion, **_: (funcion(), Medida(nombre, 0.0, 0.0, 1, 0))[1])
+    nombres = [m.nombre for m in micro.ejecutar(tamanos=(10,))]
+    assert len(nombres) == len(set(nombres))
+    umbrales = json.loads(principal.UMBRALES.read_text(encoding="utf-8"))
+    for nombre in umbrales:
+        if not nombre.startswith(("e2e/", "arranque/")):
+            assert nombre.replace("=100000", "=10") in nombres
+
+
+def test_main_detecta_regresiones_y_guarda_historial(tmp_path, monkeypatch, capsys):
+    historial = tmp_path / "historial.jsonl"
+    maquina = principal._maquina()
+    historial.write_text("".join(
+        json.dumps({"maquina": maquina, "nombre": n, "segundos": s}) + "\n"
+        for n, s in [("estable", 1.0), ("lenta", 1.0), ("lenta", 1.0), ("otra", 0.001)]
+    ), encoding="utf-8")
+    umbrales = tmp_path / "umbrales.json"
+    umbrales.write_text(json.dumps({"nueva": 5.0}), encoding="utf-8")
+    monkeypatch.setattr(principal, "UMBRALES", umbrales)
+    monkeypatch.setattr(micro, "ejecutar", lambda: [
+        Medida("estable", 1.1, 1.0, 5, 0),
+        Medida("lenta", 2.0, 1.9, 5, 0),
+        Medida("nueva", 9.0, 9.0, 5, 0),
+    ])
+
+    assert principal.main(["--solo", "micro", "--historial", str(historial)]) == 1
+    salida = capsys.readouterr()
+    assert "REGRESIÓN: x2.00" in salida.out
+    assert "REGRESIÓN: supera el presupuesto de 5000.000 ms" in salida.out
+    assert "2 regresiones detectadas" in salida.err
+    nuevas = [json.loads(l) for l in historial.read_text(encoding="utf-8").splitlines()[4:]]
+    assert [r["nombre"] for r in nuevas] == ["estable", "lenta", "nueva"]
+
+    monkeypatch.setattr(micro, "ejecutar", lambda: [Medida("estable", 1.1, 1.0, 5, 0)])
+    assert principal.main(["--solo", "micro", "--historial", str(historial), "--sin-historial"]) == 0
+    assert len(historial.read_text(encoding="utf-8").splitlines()) == 7
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from reparto import bloques
+from reparto.bloques import VARIABLE, cargar_bloques, modelo_defecto, modelo_desde_dict
+from reparto.motor import BLOQUES, PESOS_DEFECTO, reparto_bloques
+from reparto.socios import TablaSocios
+
+CONFIGURACION = {"bloques": [
+    {"nombre": "Idea", "peso": 30},
+    {"nombre": "Operaciones y Gestión", "etiqueta": "Operaciones", "peso": 50, "subbloques": [
+        {"nombre": "Producto", "peso": 3, "subbloques": [{"nombre": "Backend", "peso": 1}, {"nombre": "Frontend", "peso": 1}]},
+        {"nombre": "Ventas", "peso": 2},
+    ]},
+    {"nombre": "Estrategia", "peso": 20},
+]}
+HOJAS = ("Idea", "Operaciones y Gestión / Producto / Backend", "Operaciones y Gestión / Producto / Frontend",
+         "Operaciones y Gestión / Ventas", "Estrategia")
+
+
+def test_peso_efectivo_es_el_producto_de_la_rama():
+    modelo = modelo_desde_dict(CONFIGURACION)
+    assert modelo.hojas == HOJAS
+    assert modelo.superiores == ["Idea", "Operaciones y Gestión", "Estrategia"]
+    assert modelo.anidado and not modelo_defecto().anidado
+    # 50 % x 3/5 x 1/2 para cada parte de Producto, 50 % x 2/5 para Ventas.
+    np.testing.assert_allclose(modelo.pesos, [30, 15, 15, 20, 20])
+    assert [b.etiqueta for b in modelo.bloques] == ["Idea", "Operaciones", "Estrategia"]
+
+
+def test_pesos_de_los_sliders_y_su_inverso():
+    modelo = modelo_desde_dict(CONFIGURACION)
+    pesos = modelo.pesos_hojas({"Idea": 40, "Operaciones y Gestión": 40, "Operaciones y Gestión / Ventas": 3})
+    np.testing.assert_allclose(pesos, [40, 10, 10, 20, 20])
+    nodos = modelo.pesos_nodos(dict(zip(HOJAS, pesos)))
+    np.testing.assert_allclose(modelo.pesos_hojas(nodos), pesos)
+    assert nodos["Operaciones y Gestión"] == 40
+    # Los sub-bloques vuelven en la escala del fichero (Producto + Ventas = 5).
+    assert nodos["Operaciones y Gestión / Producto"] + nodos["Operaciones y Gestión / Ventas"] == pytest.approx(5)
+    assert modelo.pesos_nodos({})["Idea"] == 30
+    # Un padre a cero reparte a partes iguales entre hijos a cero.
+    ceros = modelo.pesos_hojas({"Operaciones y Gestión / Producto": 0, "Operaciones y Gestión / Ventas": 0})
+    np.testing.assert_allclose(ceros, [30, 12.5, 12.5, 25, 20])
+
+
+def test_reparto_por_hojas_igual_que_por_bloques_superiores():
+    modelo = modelo_desde_dict(CONFIGURACION)
+    rng = np.random.default_rng(0)
+    puntuaciones = rng.integers(0, 101, (6, len(HOJAS))).astype(float)
+    blindado = rng.uniform(0, 5, 6)
+    hojas = reparto_bloques(puntuaciones, modelo.pesos, blindado)
+    superiores = reparto_bloques(modelo.puntuaciones_superiores(puntuaciones, modelo.pesos), modelo.agrupar(modelo.pesos), blindado)
+    np.testing.assert_allclose(hojas.normalizado, superiores.normalizado)
+    np.testing.assert_allclose(modelo.agrupar(hojas.contribuciones), superiores.contribuciones)
+
+
+def test_errores_de_configuracion():
+    with pytest.raises(ValueError, match="no tiene bloques"):
+        modelo_desde_dict({"bloques": []})
+    malo = {"bloques": [{"nombre": "A", "peso": "mucho"}, {"nombre": "A", "subbloques": [{"peso": 1}]}]}
+    with pytest.raises(ValueError) as exc:
+        modelo_desde_dict(malo)
+    assert str(exc.value) == "Peso no válido en 'A': 'mucho'; Bloque repetido: 'A'; Bloque sin nombre en 'A'"
+
+
+def test_cargar_bloques_del_fichero_o_por_defecto(tmp_path, monkeypatch):
+    ruta = tmp_path / "bloques.json"
+    ruta.write_text(json.dumps(CONFIGURACION), encoding="utf-8")
+    monkeypatch.setenv(VARIABLE, str(ruta))
+    modelo = cargar_bloques()
+    assert modelo.hojas == HOJAS
+    assert cargar_bloques() is modelo
+    assert modelo_desde_dict(modelo.to_dict()).hojas == HOJAS
+
+    monkeypatch.setenv(VARIABLE, str(tmp_path / "no_existe.json"))
+    with pytest.raises(OSError):
+        cargar_bloques()
+    # Sin variable ni ``bloques.json``, los cuatro bloques del motor.
+    monkeypatch.delenv(VARIABLE)
+    monkeypatch.setattr(bloques, "FICHERO", tmp_path / "bloques_por_defecto.json")
+    defecto = cargar_bloques()
+    assert defecto.hojas == BLOQUES
+    np.testing.assert_allclose(defecto.pesos, PESOS_DEFECTO)
+
+
+def test_tabla_de_socios_en_columnas():
+    socios = TablaSocios(["Ana", "Luis"], [[10, 20, 30], [40, 50, 60]], blindado=[1, 2], horas=[10, 0], coste_hora=[30, 50])
+    assert (len(socios), socios.bloques) == (2, 3)
+    assert socios.trabajo.tolist() == [300, 0]
+    agrupada = socios.con_puntuaciones(socios.puntuaciones[:, :1])
+    assert agrupada.bloques == 1 and np.shares_memory(agrupada.blindado, socios.blindado)
+    assert TablaSocios.vacia(3, 4).puntuaciones.shape == (3, 4)
+    with pytest.raises(ValueError, match="3 filas de puntuaciones para 2 socios"):
+        TablaSocios(["Ana", "Luis"], np.zeros((3, 4)))
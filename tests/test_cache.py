@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reparto.cache import CacheResultados, cacheado, clave, tamano
+from reparto.socios import TablaSocios
+
+
+def test_tamano_de_una_tabla_de_socios_cuenta_sus_columnas():
+    socios = TablaSocios([f"S{i}" for i in range(1_000)], np.zeros((1_000, 50)))
+    assert tamano(socios) == socios.nbytes == 8 * 1_000 * 53
+
+
+def test_clave_canonica():
+    a = np.arange(6.0)
+    assert clave({"x": 1, "y": [2.0, a]}) == clave({"y": (2.0, a.copy()), "x": 1})
+    assert clave(a) != clave(a.reshape(2, 3))
+    assert clave(a) != clave(a.astype(np.float32))
+    assert clave(1.0) != clave(1)
+    assert clave(pd.DataFrame({"a": [1, 2]})) == clave(pd.DataFrame({"a": [1, 2]}))
+    with pytest.raises(TypeError):
+        clave(object())
+
+
+def test_cacheado_acierta_con_las_mismas_entradas():
+    cache = CacheResultados()
+    llamadas = []
+
+    @cacheado("pruebas", cache)
+    def doble(x, avance=None):
+        llamadas.append(x)
+        return np.asarray(x) * 2
+
+    primero = doble([1, 2])
+    assert doble([1, 2], avance=lambda *_: None) is primero
+    doble([1, 3])
+    assert llamadas == [[1, 2], [1, 3]]
+    assert cache.estadisticas()["pruebas"] == {"aciertos": 1, "fallos": 2, "tasa": 1 / 3, "entradas": 2, "bytes": 32}
+
+
+def test_desalojo_lru_por_memoria_y_caducidad(monkeypatch):
+    cache = CacheResultados(max_bytes=20)
+    cache.guardar("e", "a", b"x" * 8)
+    cache.guardar("e", "b", b"x" * 8)
+    cache.obtener("e", "a")
+    cache.guardar("e", "c", b"x" * 8)
+    # Sale "b", el menos usado; lo que no cabe entero no se guarda.
+    assert [cache.obtener("e", k) is not None for k in "abc"] == [True, False, True]
+    cache.guardar("e", "d", b"x" * 21)
+    assert cache.obtener("e", "d") is None
+
+    ahora = time.monotonic()
+    cache = CacheResultados(ttl=10)
+    cache.guardar("e", "a", 1)
+    monkeypatch.setattr(time, "monotonic", lambda: ahora + 11)
+    assert cache.obtener("e", "a", "caducado") == "caducado"
+    assert cache.estadisticas()["e"]["entradas"] == 0
@@ -0,0 +1,62 @@
+from streamlit.testing.v1 import AppTest
+
+from tests.conftest import RAIZ
+
+TIEMPO_MAXIMO = 60
+
+
+def _calculadora(nombres):
+    at = AppTest.from_file(str(RAIZ / "Calculadora socisV2.py"), default_timeout=TIEMPO_MAXIMO).run()
+    for i, nombre in enumerate(nombres):
+        at.text_input(key=f"nombre_{i}").input(nombre)
+        at.number_input(key=f"horas_{i}").set_value(100 * (i + 1))
+        at.number_input(key=f"coste_hora_{i}").set_value(30.0)
+    at.run()
+    next(b for b in at.button if b.label == "Calcular Participaciones").click()
+    return at.run()
+
+
+def test_rondas_con_socios_nuevos_sin_nombre(en_tmp):
+    at = _calculadora(["S0", "S1", "S2", "S3"])
+    assert not at.exception
+    # Tras calcular, añadir socios deja nombres vacíos en la tabla de rondas.
+    next(n for n in at.number_input if n.label == "Número de socios").set_value(6)
+    at.run()
+    assert not at.exception, [e.message for e in at.exception]
+    assert "Socio 5" in at.dataframe[0].value["Nombre"].tolist()
+
+
+def test_rondas_con_nombres_repetidos(en_tmp):
+    at = _calculadora(["Ana", "Ana", "Luis", "Luis"])
+    assert not at.exception, [e.message for e in at.exception]
+    assert at.dataframe[0].value["Nombre"].tolist()[:4] == ["Ana", "Ana (2)", "Luis", "Luis (2)"]
+
+
+def test_cascada_con_inversores_con_nombre_de_socio(en_tmp):
+    at = _calculadora(["Ana", "Luis", "Eva", "Pep"])
+    next(n for n in at.number_input if n.label == "Valoración total del proyecto (€)").set_value(1_000_000.0)
+    next(n for n in at.number_input if n.label == "Número de inversores").set_value(2)
+    at.run()
+    for i in range(2):
+        at.text_input(key=f"inv_nombre_{i}").input("Ana")
+        at.number_input(key=f"inv_aporte_{i}").set_value(50_000.0)
+    at.run()
+    assert not at.exception, [e.message for e in at.exception]
+    salida = next(d.value for d in at.dataframe if "Titular" in d.value.columns)
+    assert salida["Titular"].tolist() == ["Ana", "Luis", "Eva", "Pep", "Ana (2)", "Ana (3)"]
+
+
+def test_importar_inversores_desde_fichero(en_tmp):
+    at = _calculadora(["Ana", "Luis", "Eva", "Pep"])
+    next(n for n in at.number_input if n.label == "Valoración total del proyecto (€)").set_value(1_000_000.0)
+    subida = next(f for f in at.file_uploader if f.label.startswith("Importar inversores"))
+    subida.set_value(("inversores.csv", "Inversor;Aporte (€)\nFondo;100000\nAngel;25000,5\n".encode("utf-8"), "text/csv"))
+    at.run()
+    assert not at.exception, [e.message for e in at.exception]
+    salida = next(d.value for d in at.dataframe if "Titular" in d.value.columns)
+    assert salida["Titular"].tolist()[4:] == ["Fondo", "Angel"]
+
+    subida = next(f for f in at.file_uploader if f.label.startswith("Importar inversores"))
+    subida.set_value(("inversores.csv", b"Inversor;Aporte\nFondo;mucho\n", "text/csv"))
+    at.run()
+    assert any("Fila 1: 'aporte' no es numérico" in e.value for e in at.error)
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from reparto.cascada import Titular, cascada, puntos_corte, rejilla
+
+
+def _pago(t: Titular, p: float) -> float:
+    """Pago de un titular cuando cada unidad de participación vale ``p`` (definición directa)."""
+    comun = t.participacion / 100 * p
+    preferencia = t.inversion * t.multiplo
+    if preferencia == 0:
+        return comun
+    if not t.participante:
+        return max(preferencia, comun)
+    tope = np.inf if t.tope is None else max(t.tope * t.inversion, preferencia)
+    return max(min(preferencia + comun, tope), comun)
+
+
+def _fuerza_bruta(titulares, valor):
+    """Bisección sobre ``p`` hasta que los pagos suman el valor de salida."""
+    bajo, alto = 0.0, 1.0
+    while sum(_pago(t, alto) for t in titulares) < valor:
+        alto *= 2
+    for _ in range(200):
+        medio = (bajo + alto) / 2
+        bajo, alto = (medio, alto) if sum(_pago(t, medio) for t in titulares) < valor else (bajo, medio)
+    return [_pago(t, alto) for t in titulares]
+
+
+FUNDADORES = [Titular("Ana", 50), Titular("Luis", 30)]
+
+
+def test_preferencia_no_participante_y_conversion():
+    titulares = FUNDADORES + [Titular("Fondo", 20, 1_000_000)]
+    pagos = cascada(titulares, [500_000, 2_000_000, 10_000_000])
+    np.testing.assert_allclose(pagos[0], [0, 0, 500_000])
+    np.testing.assert_allclose(pagos[1], [625_000, 375_000, 1_000_000])
+    np.testing.assert_allclose(pagos[2], [5_000_000, 3_000_000, 2_000_000])
+    # El fondo convierte cuando su 20% vale más que su preferencia: p = 5M, salida = 5M.
+    assert 5_000_000 in puntos_corte(titulares).valores
+
+
+def test_preferencia_participante_con_tope():
+    titulares = FUNDADORES + [Titular("Fondo", 20, 1_000_000, participante=True, tope=3)]
+    pagos = cascada(titulares, [3_000_000, 30_000_000])
+    np.testing.assert_allclose(pagos[0], [1_000_000, 600_000, 1_400_000])
+    # A 30M su 20% (6M) supera el tope de 3M y prefiere convertir.
+    np.testing.assert_allclose(pagos[1], [15_000_000, 9_000_000, 6_000_000])
+
+
+def test_rango_mayor_cobra_antes():
+    titulares = FUNDADORES + [Titular("Serie A", 10, 1_000_000, rango=0), Titular("Serie B", 10, 2_000_000, rango=1)]
+    pagos = cascada(titulares, [1_500_000, 2_500_000])
+    np.testing.assert_allclose(pagos[0], [0, 0, 0, 1_500_000])
+    np.testing.assert_allclose(pagos[1], [0, 0, 500_000, 2_000_000])
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_coincide_con_la_fuerza_bruta(semilla):
+    rng = np.random.default_rng(semilla)
+    titulares = [Titular(f"F{i}", p) for i, p in enumerate(rng.uniform(5, 30, 3))]
+    for i in range(3):
+        tope = None if rng.random() < 0.5 else float(rng.uniform(1.5, 4))
+        titulares.append(Titular(f"I{i}", float(rng.uniform(2, 10)), float(rng.uniform(1e5, 1e6)), float(rng.choice([1, 1.5, 2])), bool(rng.random() < 0.5), tope))
+    total = sum(t.participacion for t in titulares)
+    titulares = [t._replace(participacion=t.participacion * 100 / total) for t in titulares]
+    preferencias = sum(t.inversion * t.multiplo for t in titulares)
+    valores = np.linspace(preferencias * 1.01, preferencias * 40, 25)
+    pagos = cascada(titulares, valores)
+    for v, fila in zip(valores, pagos):
+        np.testing.assert_allclose(fila, _fuerza_bruta(titulares, v), rtol=1e-6, atol=1e-3)
+        assert fila.sum() == pytest.approx(v)
+
+
+def test_rejilla_incluye_los_cortes():
+    cortes = puntos_corte(FUNDADORES + [Titular("Fondo", 20, 1_000_000)])
+    valores = rejilla(10_000_000, puntos=11, cortes=cortes)
+    assert set(cortes.valores[cortes.valores <= 10_000_000]) <= set(valores)
@@ -0,0 +1,59 @@
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reparto.exportacion import (
+    COLUMNAS_SIMULACION,
+    Grafico,
+    Hoja,
+    escribir_libro,
+    filas_array,
+    filas_dataframe,
+    hoja_simulacion,
+)
+from reparto.valoracion import PERCENTILES, distribuciones_triangulares, simular_valoracion
+
+
+def test_hoja_simulacion_con_percentiles_y_medias():
+    entradas = distribuciones_triangulares(
+        {"horas": 100, "coste_hora": 30, "gastos": 1000, "usuarios": 50, "precio_mensual": 10, "margen": 20, "multiplicador": 2}, 20
+    )
+    resultado = simular_valoracion(entradas, 1000, 5000, 10_000, semilla=1)
+    hoja = hoja_simulacion(resultado)
+    assert hoja.columnas == ["Percentil", *COLUMNAS_SIMULACION.values()]
+    assert [f[0] for f in hoja.filas] == [f"P{p}" for p in PERCENTILES] + ["Media", "Simulaciones"]
+    assert hoja.filas[-2][3] == resultado.medias["roi"]
+    assert escribir_libro([hoja])[:2] == b"PK"
+
+
+def test_libro_con_varias_hojas_y_grafico(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = pd.DataFrame({"Socio": ["Ana", "Luis"], "% Final": np.array([60.5, 39.5])})
+    barrido = np.array([[100, 0, 1.5], [50, 50, np.nan]])
+    hojas = [
+        Hoja("Reparto", list(df.columns), filas_dataframe(df, filas_por_tanda=1), Grafico("pie", 0, [1])),
+        Hoja("Barrido [pesos]", ["Bloque A", "Bloque B", "Ana"], filas_array(barrido)),
+        Hoja("Escenarios", ["Escenario", "A", "B"], filas_array(barrido[:, :2], etiquetas=["uno", "dos"])),
+        Hoja("Vacía", ["Nada"], iter(()), Grafico("column", 0, [0])),
+    ]
+    ruta = tmp_path / "libro.xlsx"
+    assert escribir_libro(hojas, str(ruta)) is None
+
+    libro = openpyxl.load_workbook(ruta)
+    assert libro.sheetnames == ["Reparto", "Barrido _pesos_", "Escenarios", "Vacía"]
+    assert list(libro["Reparto"].values) == [("Socio", "% Final"), ("Ana", 60.5), ("Luis", 39.5)]
+    # Los NaN se escriben como error de Excel en vez de romper la exportación.
+    assert list(libro["Barrido _pesos_"].values)[2] == (50, 50, "=#NUM!")
+    assert list(libro["Escenarios"].values)[1:] == [("uno", 100, 0), ("dos", 50, 50)]
+    with zipfile.ZipFile(ruta) as z:
+        assert [n for n in z.namelist() if n.startswith("xl/charts/")] == ["xl/charts/chart1.xml"]
+
+
+def test_filas_en_tipos_de_python():
+    df = pd.DataFrame({"a": np.array([1, 2], dtype=np.int64), "b": np.array([0.5, 1.5], dtype=np.float32)})
+    filas = list(filas_dataframe(df))
+    assert filas == [[1, 0.5], [2, 1.5]]
+    assert all(type(v) in (int, float) for f in filas for v in f)
+    assert list(filas_array(np.eye(2, dtype=np.int32))) == [[1, 0], [0, 1]]
@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from reparto import graficos
+from tests.conftest import RAIZ
+
+
+def test_graficos_en_png_y_svg():
+    assert graficos.tarta(["Ana", "Luis"], [60, 40]).startswith(b"\x89PNG")
+    svg = graficos.mapa_calor(np.random.default_rng(0).random((5, 5)), "Operaciones", "Tecnología", formato="svg")
+    assert b"<svg" in svg
+
+
+def test_agrupar_resto():
+    etiquetas, valores = graficos.agrupar_resto([f"S{i}" for i in range(20)], range(20), max_porciones=5)
+    assert etiquetas == ["S19", "S18", "S17", "S16", "Otros"]
+    assert sum(valores) == sum(range(20))
+
+
+def test_como_mucho_max_dibujos_a_la_vez(monkeypatch):
+    lock = threading.Lock()
+    dibujando, pico = 0, 0
+
+    def dibujo_lento(etiquetas, valores, formato):
+        nonlocal dibujando, pico
+        with lock:
+            dibujando += 1
+            pico = max(pico, dibujando)
+        time.sleep(0.05)
+        with lock:
+            dibujando -= 1
+        return b"png"
+
+    monkeypatch.setattr(graficos, "_dibujar_tarta", dibujo_lento)
+    hilos = [threading.Thread(target=graficos.tarta, args=(["Ana"], [1])) for _ in range(3 * graficos.MAX_DIBUJOS)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join(5)
+    assert pico == graficos.MAX_DIBUJOS
+
+
+def test_sin_figuras_de_pyplot():
+    codigo = (
+        "import sys, gc, matplotlib.figure; from reparto import graficos\n"
+        "antes = sum(isinstance(o, matplotlib.figure.Figure) for o in gc.get_objects())\n"
+        "for _ in range(20): graficos.tarta(['Ana', 'Luis'], [60, 40])\n"
+        "gc.collect()\n"
+        "print('matplotlib.pyplot' in sys.modules, sum(isinstance(o, matplotlib.figure.Figure) for o in gc.get_objects()) - antes)"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+    assert salida.split() == ["False", "0"]
+
+
+def test_especificacion_vega_lite():
+    spec = graficos.especificacion_tarta(["Ana", "Luis"], np.array([60.0, 40.0]))
+    assert spec["data"]["values"] == [{"Nombre": "Ana", "Participacion": 60.0}, {"Nombre": "Luis", "Participacion": 40.0}]
+    assert spec["mark"]["type"] == "arc"
@@ -0,0 +1,108 @@
+import io
+import math
+
+import pandas as pd
+import pytest
+
+from reparto.importacion import MAX_ERRORES, ErrorImportacion, leer_inversores, leer_socios, socios_desde_registros
+
+BLOQUES = ["Operaciones", "Tecnología"]
+
+
+def test_nan_en_el_editor_cuenta_como_vacio():
+    editor = pd.DataFrame(
+        [["Ana", 80, 60, 5.0], ["Luis", math.nan, 40, math.nan]],
+        columns=["Socio", *BLOQUES, "% Blindado"],
+    )
+    socios = socios_desde_registros(editor.to_dict("records"), BLOQUES)
+    assert socios.puntuaciones.tolist() == [[80, 60], [0, 40]]
+    assert socios.blindado.tolist() == [5, 0]
+
+
+@pytest.mark.parametrize("nombre", [math.nan, None, "  "])
+def test_nombre_nan_es_obligatorio(nombre):
+    with pytest.raises(ErrorImportacion) as exc:
+        socios_desde_registros([{"Socio": nombre, "Operaciones": 10, "Tecnología": 10}], BLOQUES)
+    assert exc.value.errores == ["Fila 1: falta 'nombre'"]
+
+
+def test_nan_escrito_en_el_fichero():
+    socios = socios_desde_registros([{"Socio": "Ana", "Operaciones": "nan", "Tecnología": "NaN"}], BLOQUES)
+    assert socios.puntuaciones.tolist() == [[0, 0]]
+
+
+def test_inversores_desde_csv_con_alias():
+    fichero = io.BytesIO("Inversor;Inversión (€)\nFondo;1000,5\nAngel;250\n".encode("utf-8"))
+    inversores = leer_inversores(fichero, "csv")
+    assert inversores.nombres == ["Fondo", "Angel"]
+    assert inversores.aportes.tolist() == [1000.5, 250.0]
+
+
+def test_socios_desde_csv_con_alias_y_bloques_completos():
+    fichero = io.BytesIO(
+        "SOCIO;Concepto (%);Inversión;operaciones y gestion;Estrategia, Dirección, Marketing;% Blindado;Total horas;Precio hora\n"
+        "Ana;80;50;10,5;0;5;1200;40\n"
+        "Luis;20;;90;100;;;\n".encode("utf-8")
+    )
+    socios = leer_socios(fichero, "csv")
+    assert socios.nombres == ["Ana", "Luis"]
+    assert socios.puntuaciones.tolist() == [[80, 50, 10.5, 0], [20, 0, 90, 100]]
+    assert socios.blindado.tolist() == [5, 0]
+    assert socios.horas.tolist() == [1200, 0]
+    assert socios.coste_hora.tolist() == [40, 0]
+
+
+def test_primera_cabecera_equivalente_manda():
+    # En las exportaciones de la app la puntuación va antes que su "(%)".
+    socios = socios_desde_registros([{"Nombre": "Ana", "Operaciones": 70, "Operaciones (%)": 35.0}], BLOQUES)
+    assert socios.puntuaciones.tolist() == [[70, 0]]
+
+
+def test_socios_desde_jsonl_y_xlsx(tmp_path):
+    jsonl = io.BytesIO(b'{"name": "Ana", "Operaciones": 60}\n\n{"name": "Luis", "Operaciones": 40}\n')
+    assert leer_socios(jsonl, "jsonl", BLOQUES).puntuaciones.tolist() == [[60, 0], [40, 0]]
+
+    openpyxl = pytest.importorskip("openpyxl")
+    libro = openpyxl.Workbook()
+    libro.active.append(["Socio", "Tecnología"])
+    libro.active.append(["Ana", 30])
+    libro.active.append([None, None])
+    libro.save(tmp_path / "socios.xlsx")
+    socios = leer_socios(str(tmp_path / "socios.xlsx"), bloques=BLOQUES)
+    assert socios.nombres == ["Ana"]
+    assert socios.puntuaciones.tolist() == [[0, 30]]
+
+
+def test_errores_de_validacion_por_fila():
+    filas = [
+        {"Socio": "Ana", "Operaciones": "mucho", "Tecnología": 10},
+        {"Socio": "Luis", "Operaciones": 120, "Tecnología": -1},
+        {"Socio": "", "Operaciones": 10, "Tecnología": 10},
+    ]
+    with pytest.raises(ErrorImportacion) as exc:
+        socios_desde_registros(filas, BLOQUES)
+    assert exc.value.errores == [
+        "Fila 1: 'Operaciones' no es numérico ('mucho')",
+        "Fila 2: 'Operaciones' fuera de rango (120)",
+        "Fila 2: 'Tecnología' fuera de rango (-1)",
+        "Fila 3: falta 'nombre'",
+    ]
+
+
+def test_falta_columna_obligatoria():
+    with pytest.raises(ErrorImportacion) as exc:
+        leer_inversores(io.BytesIO(b"inversor,pais\nFondo,ES\n"), "csv")
+    assert exc.value.errores == ["Falta la columna obligatoria 'aporte'"]
+
+
+def test_errores_se_cortan_en_max_errores():
+    filas = [{"Socio": "", "Operaciones": 1, "Tecnología": 1}] * (MAX_ERRORES * 3)
+    with pytest.raises(ErrorImportacion) as exc:
+        socios_desde_registros(filas, BLOQUES)
+    assert len(exc.value.errores) == MAX_ERRORES
+    assert str(exc.value).endswith(f"(y {MAX_ERRORES - 5} errores más)")
+
+
+def test_formato_no_soportado():
+    with pytest.raises(ValueError, match="Formato no soportado"):
+        leer_socios(io.BytesIO(b""), "ods")
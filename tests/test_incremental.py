@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from reparto import incremental
+from reparto.incremental import RepartoIncremental
+from reparto.motor import tabla_reparto
+from tests.conftest import RAIZ
+
+BLOQUES = ["B0", "B1", "B2", "B3"]
+
+
+def test_cambios_incrementales_igual_que_tabla_reparto():
+    rng = np.random.default_rng(0)
+    puntuaciones = rng.integers(0, 101, (12, 4)).astype(float)
+    pesos, blindado = np.array([25.0, 25, 30, 20]), rng.uniform(0, 5, 12)
+    nombres = [f"S{i}" for i in range(12)]
+    modelo = RepartoIncremental(puntuaciones, pesos, blindado)
+    modelo.tabla(nombres, BLOQUES)
+    for _ in range(200):
+        i, j = rng.integers(12), rng.integers(4)
+        puntuaciones[i, j] = rng.integers(0, 101)
+        modelo.fijar_puntuacion(i, j, puntuaciones[i, j])
+        blindado[i] = rng.uniform(0, 5)
+        modelo.fijar_blindado(i, blindado[i])
+    pesos = np.array([10.0, 40, 30, 20])
+    assert modelo.fijar_pesos(pesos) == 2
+    pd.testing.assert_frame_equal(modelo.tabla(nombres, BLOQUES), tabla_reparto(nombres, puntuaciones, pesos, blindado, BLOQUES))
+
+
+def test_tabla_sin_cambios_es_la_misma():
+    modelo = RepartoIncremental(np.ones((3, 4)), [25.0] * 4, np.zeros(3))
+    tabla = modelo.tabla(["a", "b", "c"], BLOQUES)
+    assert modelo.tabla(["a", "b", "c"], BLOQUES) is tabla
+    assert modelo.tabla(["a", "b", "d"], BLOQUES) is not tabla
+
+
+def test_app_aplica_los_sliders_al_modelo(en_tmp):
+    at = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=30).run()
+    bloques = list(at.session_state["reparto_incremental"][0])
+    at.slider(key=f"bloque_{bloques[0]}_0").set_value(80)
+    at.slider(key=f"bloque_{bloques[1]}_2").set_value(40)
+    at.number_input(key="blindado_1").set_value(5.0)
+    at.button[0].click().run()
+    assert not at.exception
+    esperado = np.zeros((4, len(bloques)))
+    esperado[0, 0], esperado[2, 1] = 80, 40
+    np.testing.assert_array_equal(at.session_state["reparto_incremental"][1].puntuaciones, esperado)
+    assert at.session_state["reparto_incremental"][1].blindado.tolist() == [0, 5, 0, 0]
+
+
+def test_muchos_pesos_a_la_vez_recalculan_desde_cero(monkeypatch):
+    monkeypatch.setattr(incremental, "MAX_CAMBIOS", 2)
+    rng = np.random.default_rng(1)
+    puntuaciones, blindado = rng.integers(0, 101, (5, 4)).astype(float), np.zeros(5)
+    modelo = RepartoIncremental(puntuaciones, [25.0] * 4, blindado)
+    pesos = [40.0, 25, 20, 15]
+    assert modelo.fijar_pesos(pesos) == 3
+    assert modelo.cambios == 0
+    np.testing.assert_allclose(modelo.normalizado(), tabla_reparto(list("abcde"), puntuaciones, pesos, blindado, BLOQUES)["% Final Normalizado"])
+
+
+def test_recalculo_periodico_corta_el_error_acumulado(monkeypatch):
+    monkeypatch.setattr(incremental, "RECALCULO", 10)
+    modelo = RepartoIncremental(np.zeros((2, 4)), [25.0] * 4, np.zeros(2))
+    for n in range(1, 10):
+        modelo.fijar_blindado(0, 0.1 * n)
+    assert modelo.cambios == 9
+    modelo.fijar_blindado(1, 0.3)
+    assert modelo.cambios == 0 and modelo.total == modelo.bruto.sum()
+
+
+def test_normalizado_de_un_socio_y_total_nulo():
+    modelo = RepartoIncremental(np.zeros((2, 4)), [25.0] * 4, np.zeros(2))
+    assert modelo.normalizado(0) == 0.0 and modelo.normalizado().tolist() == [0, 0]
+    modelo.fijar_puntuacion(1, 2, 100)
+    modelo.fijar_blindado(0, 25)
+    assert modelo.normalizado(0) == 50.0 and modelo.normalizado().tolist() == [50, 50]
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from reparto.lotes import ejecutar, leer_escenarios, main
+from reparto.motor import BLOQUES, reparto_bloques
+from reparto.valoracion import valoracion_pre_money
+
+
+def _escenario(n: int) -> dict:
+    return {"socios": [{"nombre": "Ana", "bloques": [n, 50, 50, 50]}, {"nombre": "Luis", "bloques": [50, 50, 50, 50]}]}
+
+
+def test_ids_por_defecto_siguen_la_entrada_entre_tandas():
+    escenarios = [_escenario(n) for n in range(5)]
+    escenarios[3]["id"] = "propio"
+    resultados = list(ejecutar(escenarios, procesos=1, tanda=2))
+    assert [r["id"] for r in resultados] == [0, 1, 2, "propio", 4]
+    assert "id" not in escenarios[0]
+
+
+def test_un_escenario_erroneo_no_detiene_la_tanda():
+    escenarios = [_escenario(n) for n in range(4)]
+    escenarios[1]["socios"][0]["bloques"] = [10, 20]  # filas desiguales
+    escenarios[2]["pesos"] = [50, 50]  # menos pesos que bloques
+    escenarios.append({"socios": [{"nombre": "Eva", "bloques": ["mucho", 1, 2, 3]}]})
+    escenarios.append("no es un objeto")
+    resultados = list(ejecutar(escenarios, procesos=1, tanda=3))
+    assert [r["id"] for r in resultados] == [0, 1, 2, 3, 4, 5]
+    assert [("error" in r) for r in resultados] == [False, True, True, False, True, True]
+    assert resultados[3]["socios"][0]["participacion"] > 0
+
+
+def test_json_no_valido_se_informa_en_su_posicion(tmp_path):
+    ruta = tmp_path / "escenarios.jsonl"
+    ruta.write_text(json.dumps(_escenario(1)) + "\n{roto\n" + json.dumps(_escenario(2)) + "\n", encoding="utf-8")
+    resultados = list(ejecutar(leer_escenarios(str(ruta)), procesos=1))
+    assert [r["id"] for r in resultados] == [0, 1, 2]
+    assert "JSON no válido" in resultados[1]["error"]
+
+
+def test_resultado_igual_que_el_motor_y_la_valoracion():
+    escenario = {
+        "pesos": {b: p for b, p in zip(BLOQUES, (40, 20, 20, 20))},
+        "socios": [{"nombre": "Ana", "bloques": [80, 0, 50, 50], "blindado": 5}, {"nombre": "Luis", "bloques": [20, 100, 50, 50]}],
+        "valoracion": {"horas": 100, "coste_hora": 50, "gastos": 5000, "usuarios": 100, "precio_mensual": 10, "margen": 50, "multiplicador": 2},
+        "inversores": [{"nombre": "Fondo", "aporte": 10_000}],
+    }
+    r = next(ejecutar([escenario], procesos=1))
+    pre_money = valoracion_pre_money(100, 50, 5000, 100, 10, 50, 2)
+    esperado = reparto_bloques([[80, 0, 50, 50], [20, 100, 50, 50]], [40, 20, 20, 20], [5, 0]).normalizado
+    assert r["pre_money"] == pytest.approx(pre_money)
+    assert [s["participacion"] for s in r["socios"]] == pytest.approx(esperado.tolist())
+    inversor = 10_000 / (pre_money + 10_000) * 100
+    assert r["inversores"][0]["participacion_post"] == pytest.approx(inversor)
+    assert sum(s["participacion_post"] for s in r["socios"]) + inversor == pytest.approx(100)
+
+
+def test_pool_de_procesos_mantiene_el_orden():
+    escenarios = [_escenario(n) for n in range(40)]
+    escenarios[7]["socios"].append({"nombre": "Eva", "bloques": [10, 10, 10, 10]})
+    secuencial = list(ejecutar(escenarios, procesos=1, tanda=3))
+    assert list(ejecutar(escenarios, procesos=2, tanda=3)) == secuencial
+    assert [r["id"] for r in secuencial] == list(range(40))
+
+
+def test_csv_a_parquet_desde_la_linea_de_ordenes(tmp_path, capsys):
+    pq = pytest.importorskip("pyarrow.parquet")
+    entrada = tmp_path / "escenarios.csv"
+    entrada.write_text(
+        "escenario,socio,concepto,inversion,operaciones,estrategia,\"peso Concepto, Idea e IP Fundacional\",aportacion,horas,coste hora\n"
+        "a,Ana,100,0,0,0,100,1000,10,100\n"
+        "a,Luis,0,100,0,0,,,,\n"
+        "b,Eva,mucho,0,0,0,,,,\n"
+        "c,Eva,10,10,10,10,,,,\n",
+        encoding="utf-8",
+    )
+    salida = tmp_path / "resultados.parquet"
+    assert main([str(entrada), "-o", str(salida), "-p", "1"]) == 0
+    assert "3 escenarios procesados, 1 con errores" in capsys.readouterr().err
+
+    filas = pq.read_table(salida).to_pylist()
+    assert [(f["escenario"], f["tipo"], f["titular"]) for f in filas] == [
+        ("a", "socio", "Ana"), ("a", "socio", "Luis"), ("a", "inversor", "Inversor"), ("b", "error", None), ("c", "socio", "Eva"),
+    ]
+    # El concepto pesa 100 y la inversión conserva su 30 por defecto.
+    assert filas[0]["participacion"] == pytest.approx(100 * 100 / (100 + 30))
+    assert filas[2]["participacion_post"] == pytest.approx(1000 / (500 + 1000) * 100)
+    assert "no es numérico" in filas[3]["error"]
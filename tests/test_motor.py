@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from reparto.motor import BLOQUES, PESOS_DEFECTO, normalizar, reparto_bloques, tabla_reparto
+
+NOMBRES = ["Ana", "Luis", "Marta"]
+PUNTUACIONES = np.array([[80, 50, 20, 60], [20, 50, 70, 30], [0, 0, 10, 10]], dtype=float)
+BLINDADO = np.array([5, 0, 2], dtype=float)
+
+
+def _tabla_original(pesos):
+    """El cálculo columna a columna que hacía la app antes de extraer el motor."""
+    pesos = dict(zip(BLOQUES, pesos))
+    df = pd.DataFrame([[n, *p, b] for n, p, b in zip(NOMBRES, PUNTUACIONES, BLINDADO)], columns=["Socio", *BLOQUES, "% Blindado"])
+    for b in pesos:
+        df[f"{b} (%)"] = (df[b] / 100) * pesos[b]
+    df["Participación Técnica"] = df[[f"{b} (%)" for b in pesos]].sum(axis=1)
+    df["% Final Bruto"] = df["Participación Técnica"] + df["% Blindado"]
+    df["% Final Normalizado"] = df["% Final Bruto"] / df["% Final Bruto"].sum() * 100
+    return df
+
+
+def test_tabla_igual_al_calculo_original():
+    df = tabla_reparto(NOMBRES, PUNTUACIONES, PESOS_DEFECTO, BLINDADO)
+    original = _tabla_original(PESOS_DEFECTO)
+    pd.testing.assert_frame_equal(df[original.columns], original, check_dtype=False)
+    assert df["% Final Normalizado"].sum() == 100
+
+
+def test_escenarios_en_lote_igual_que_uno_a_uno():
+    pesos = np.array([PESOS_DEFECTO, (25, 25, 25, 25), (100, 0, 0, 0)], dtype=float)
+    lote = reparto_bloques(PUNTUACIONES, pesos, BLINDADO)
+    assert lote.normalizado.shape == (3, 3)
+    for k, p in enumerate(pesos):
+        uno = reparto_bloques(PUNTUACIONES, p, BLINDADO)
+        np.testing.assert_allclose(lote.normalizado[k], uno.normalizado)
+        np.testing.assert_allclose(uno.normalizado, _tabla_original(p)["% Final Normalizado"])
+
+
+def test_blindado_y_pesos_se_difunden_por_escenario():
+    puntuaciones = np.broadcast_to(PUNTUACIONES, (2, 3, 4))
+    blindado = np.array([[0, 0, 0], [50, 0, 0]])
+    r = reparto_bloques(puntuaciones, PESOS_DEFECTO, blindado)
+    np.testing.assert_allclose(r.tecnica[0], r.tecnica[1])
+    np.testing.assert_allclose(r.bruto[1] - r.bruto[0], [50, 0, 0])
+    np.testing.assert_allclose(r.normalizado.sum(axis=-1), 100)
+
+
+def test_total_nulo_devuelve_ceros():
+    assert normalizar([[0, 0], [1, 3]]).tolist() == [[0, 0], [25, 75]]
+    r = reparto_bloques(np.zeros((2, 4)), PESOS_DEFECTO, [0, 0])
+    assert r.normalizado.tolist() == [0, 0]
+
+
+def test_bloques_configurables():
+    df = tabla_reparto(["Ana", "Luis"], [[100, 0], [0, 100]], [70, 30], [0, 0], bloques=["Código", "Ventas"])
+    assert list(df.columns[:4]) == ["Socio", "Código", "Ventas", "% Blindado"]
+    assert df["% Final Normalizado"].tolist() == [70, 30]
@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from reparto.negociacion import (
+    biseccion,
+    fraccion_maxima,
+    inversion_maxima,
+    inversion_maxima_plan,
+    pre_money_minimo,
+    pre_money_minimo_plan,
+)
+from reparto.rondas import Ronda, planes_desde_rondas, simular_rondas
+
+TITULARES = ["Ana", "Luis"]
+PARTICIPACIONES = [50, 40]
+POOL_INICIAL = 10.0
+
+
+def _dilucion(pre_money, inversion, pool_objetivo=0.0):
+    """Dilución máxima de los fundadores simulando una ronda por cada par (pre-money, inversión)."""
+    planes = planes_desde_rondas([[Ronda("Semilla", p, i, pool_objetivo)] for p, i in zip(pre_money, inversion)])
+    r = simular_rondas(TITULARES, PARTICIPACIONES, planes, pool_inicial=POOL_INICIAL)
+    return r.dilucion[:, 1].max(axis=1)
+
+
+@pytest.mark.parametrize("pool_objetivo", [0.0, 5.0, 15.0])
+def test_inversion_maxima_coincide_con_fuerza_bruta(pool_objetivo):
+    rejilla = np.linspace(1, 3_000_000, 30_001)
+    dilucion = _dilucion(np.full_like(rejilla, 1_000_000), rejilla, pool_objetivo)
+    bruta = rejilla[dilucion <= 30].max()
+
+    c = inversion_maxima(1_000_000, 30, pool_objetivo, POOL_INICIAL)
+    assert c.factible
+    assert bruta <= c.inversion < bruta + 100
+    np.testing.assert_allclose(_dilucion([1_000_000], [c.inversion], pool_objetivo), [30])
+    np.testing.assert_allclose(c.fraccion, c.inversion / (1_000_000 + c.inversion) * 100)
+
+
+@pytest.mark.parametrize("pool_objetivo", [0.0, 15.0])
+def test_pre_money_minimo_coincide_con_fuerza_bruta(pool_objetivo):
+    rejilla = np.linspace(10_000, 5_000_000, 49_901)
+    dilucion = _dilucion(rejilla, np.full_like(rejilla, 500_000), pool_objetivo)
+    bruta = rejilla[dilucion <= 25].min()
+
+    c = pre_money_minimo(500_000, 25, pool_objetivo, POOL_INICIAL)
+    assert c.factible
+    assert bruta - 100 < c.pre_money <= bruta
+
+
+def test_formas_cerradas_admiten_rejillas():
+    dilucion = np.array([10, 20, 30])[:, None]
+    pre_money = np.array([1e6, 2e6])
+    c = inversion_maxima(pre_money, dilucion)
+    assert c.inversion.shape == (3, 2)
+    # Sin pool la fracción vendible es la dilución y la inversión escala con la pre-money.
+    np.testing.assert_allclose(fraccion_maxima(dilucion.ravel()), [10, 20, 30])
+    np.testing.assert_allclose(c.inversion[:, 1], 2 * c.inversion[:, 0])
+    np.testing.assert_allclose(pre_money_minimo(c.inversion, dilucion).pre_money, np.broadcast_to(pre_money, (3, 2)))
+
+
+def test_limites_de_los_inversores():
+    # El ticket del segundo inversor (la mitad de la ronda) limita la inversión total.
+    c = inversion_maxima(1_000_000, 30, reparto=[1, 1], ticket_maximo=[np.inf, 100_000])
+    np.testing.assert_allclose(c.inversion, 200_000)
+    assert c.factible
+    # Con un 30 % de dilución no hay forma de darle un 20 % a cada uno.
+    assert not inversion_maxima(1_000_000, 30, reparto=[1, 1], participacion_minima=20).factible
+    assert not pre_money_minimo(500_000, 30, reparto=[1, 1], participacion_minima=20).factible
+
+
+def test_precio_por_accion():
+    c = inversion_maxima(1_000_000, 20, acciones_pre=10_000)
+    # 250.000 € por el 20 %: 2.500 acciones nuevas a 100 €, el mismo precio que la pre-money.
+    np.testing.assert_allclose(c.precio_accion, 100)
+    assert np.isnan(inversion_maxima(1_000_000, 20).precio_accion)
+
+
+def test_biseccion_en_ambos_sentidos():
+    x = biseccion(lambda v: v ** 2 <= np.array([2.0, 9.0, -1.0]), 0.0, 10.0)
+    np.testing.assert_allclose(x[:2], [np.sqrt(2), 3])
+    assert np.isnan(x[2])
+    y = biseccion(lambda v: v >= 4.0, 0.0, 10.0, creciente=True)
+    np.testing.assert_allclose(y, 4.0)
+
+
+def test_planes_de_una_ronda_igualan_la_forma_cerrada():
+    planes = planes_desde_rondas([[Ronda("Semilla", 1_000_000, 1, 15)], [Ronda("Semilla", 2_000_000, 1, 15)]])
+    inversion = inversion_maxima_plan(TITULARES, PARTICIPACIONES, planes, 0, [30, 20], pool_inicial=POOL_INICIAL)
+    cerrada = inversion_maxima([1_000_000, 2_000_000], [30, 20], 15, POOL_INICIAL).inversion
+    np.testing.assert_allclose(inversion, cerrada, rtol=1e-9)
+
+    planes = planes_desde_rondas([[Ronda("Semilla", 1, 500_000, 15)]])
+    pre = pre_money_minimo_plan(TITULARES, PARTICIPACIONES, planes, 0, 25, pool_inicial=POOL_INICIAL)
+    np.testing.assert_allclose(pre, pre_money_minimo(500_000, 25, 15, POOL_INICIAL).pre_money, rtol=1e-9)
+
+
+def test_plan_de_varias_rondas_cuenta_las_posteriores():
+    rondas = [Ronda("Semilla", 1_000_000, 1), Ronda("Serie A", 4_000_000, 1_000_000)]
+    planes = planes_desde_rondas([rondas])
+    inversion = inversion_maxima_plan(TITULARES, PARTICIPACIONES, planes, 0, 40, pool_inicial=POOL_INICIAL)
+    # La serie A diluye un 20 %: la semilla solo puede quitar hasta 1 - 0,6/0,8 = 25 %.
+    np.testing.assert_allclose(inversion, 1_000_000 / 3, rtol=1e-9)
@@ -0,0 +1,109 @@
+import json
+from io import BytesIO
+
+import numpy as np
+import pytest
+
+from reparto.importacion import ErrorImportacion
+from reparto.motor import BLOQUES
+from reparto.partes import PartesHoras, categorias_por_defecto, puntuaciones_horas
+
+CABECERA = "Socio;Fecha;Horas;Tarifa;Categoría\n"
+ENERO = (
+    "Ana;2024-01-10;8;50;Operaciones\n"
+    "Ana;2024-01-11;4,5;50;Estrategia\n"
+    "Luis;10/01/2024;6;40;Operaciones\n"
+)
+FEBRERO = "Luis;2024-02-01;2;40;Concepto\n"
+
+
+def _csv(texto):
+    return BytesIO((CABECERA + texto).encode("utf-8"))
+
+
+def _totales(partes):
+    r = partes.resumen()
+    return dict(zip(r.nombres, r.horas.tolist()))
+
+
+def test_reingesta_solo_suma_lo_posterior_a_la_marca():
+    partes = PartesHoras()
+    assert partes.ingerir(_csv(ENERO), "csv") == 3
+    assert _totales(partes) == {"Ana": 12.5, "Luis": 6.0}
+    assert partes.marca_legible() == "2024-01-11T00:00:00"
+
+    # La exportación completa otra vez, con febrero añadido: solo entra febrero.
+    assert partes.ingerir(_csv(ENERO + FEBRERO), "csv") == 1
+    assert _totales(partes) == {"Ana": 12.5, "Luis": 8.0}
+    assert partes.filas == 4
+    assert partes.ingerir(_csv(ENERO + FEBRERO), "csv") == 0
+
+
+def test_tandas_pequenas_dan_el_mismo_acumulado():
+    entera, troceada = PartesHoras(), PartesHoras()
+    entera.ingerir(_csv(ENERO + FEBRERO), "csv")
+    troceada.ingerir(_csv(ENERO + FEBRERO), "csv", filas_por_tanda=1)
+    assert troceada.estado() == entera.estado()
+
+
+def test_marca_por_id_admite_reingesta_a_mitad_de_dia():
+    cabecera = "id,socio,fecha,horas\n"
+    manana = "1,Ana,2024-01-10,3\n2,Luis,2024-01-10,2\n"
+    tarde = "3,Ana,2024-01-10,4\n"
+    partes = PartesHoras()
+    partes.ingerir(BytesIO((cabecera + manana).encode()), "csv")
+    assert partes.ingerir(BytesIO((cabecera + manana + tarde).encode()), "csv") == 1
+    assert _totales(partes) == {"Ana": 7.0, "Luis": 2.0}
+    assert partes.marca_legible() == "id 3"
+
+    with pytest.raises(ErrorImportacion, match="'id'"):
+        partes.ingerir(BytesIO(b"socio,fecha,horas\nAna,2024-01-11,1\n"), "csv")
+
+
+def test_estado_serializable_continua_la_ingesta():
+    partes = PartesHoras()
+    partes.ingerir(_csv(ENERO), "csv")
+    guardado = PartesHoras(json.loads(json.dumps(partes.estado())))
+    assert guardado.ingerir(_csv(ENERO + FEBRERO), "csv") == 1
+    assert _totales(guardado) == {"Ana": 12.5, "Luis": 8.0}
+
+
+def test_fila_mala_no_toca_el_acumulado():
+    partes = PartesHoras()
+    partes.ingerir(_csv(ENERO), "csv")
+    antes = partes.estado()
+    with pytest.raises(ErrorImportacion) as error:
+        partes.ingerir(_csv(FEBRERO + ";2024-02-02;1;40;Operaciones\nLuis;2024-02-03;-1;40;Operaciones\n"), "csv")
+    assert error.value.errores == [
+        "Fila 2: socio, fecha u horas ausentes o no válidos",
+        "Fila 3: socio, fecha u horas ausentes o no válidos",
+    ]
+    assert partes.estado() == antes
+
+
+def test_falta_columna_obligatoria():
+    with pytest.raises(ErrorImportacion, match="'horas'"):
+        PartesHoras().ingerir(BytesIO(b"socio,fecha\nAna,2024-01-10\n"), "csv")
+
+
+def test_resumen_asigna_categorias_a_bloques_y_coste_medio():
+    partes = PartesHoras()
+    partes.ingerir(_csv(ENERO + FEBRERO + "Ana;2024-02-02;1;50;Vacaciones\n"), "csv")
+    assert categorias_por_defecto(partes.categorias) == {
+        "Concepto": BLOQUES[0], "Estrategia": BLOQUES[3], "Operaciones": BLOQUES[2], "Vacaciones": None,
+    }
+    r = partes.resumen()
+    assert r.nombres == ["Ana", "Luis"]
+    assert r.horas.tolist() == [13.5, 8.0]
+    # Las horas sin bloque cuentan en el total y el coste, no en los bloques.
+    assert r.horas_bloque.tolist() == [[0, 0, 8, 4.5], [2, 0, 6, 0]]
+    assert r.coste_hora.tolist() == [50.0, 40.0]
+
+    # Cambiar la asignación no obliga a releer.
+    otra = partes.resumen({"Vacaciones": BLOQUES[2]})
+    assert otra.horas_bloque[:, 2].tolist() == [1.0, 0.0]
+
+
+def test_puntuaciones_horas_reparte_cada_bloque_sobre_100():
+    p = puntuaciones_horas([[0, 0, 8, 4.5], [2, 0, 6, 0]])
+    np.testing.assert_allclose(p, [[0, 0, 800 / 14, 100], [100, 0, 600 / 14, 0]])
@@ -0,0 +1,50 @@
+import json
+
+from streamlit.testing.v1 import AppTest
+
+from reparto.perfil import Perfilador
+from tests.conftest import RAIZ
+
+
+def test_desactivado_no_registra_nada():
+    perfil = Perfilador()
+    with perfil.etapa("tabla"):
+        perfil.contar("reruns")
+    assert perfil.resumen() == {} and perfil.contadores() == {}
+
+
+def test_percentiles_sobre_la_ventana_reciente():
+    perfil = Perfilador(ventana=100)
+    perfil.activo = True
+    for ms in range(1, 201):
+        perfil.registrar("tabla", ms / 1e3)
+    with perfil.etapa("grafico"):
+        pass
+    perfil.contar("reruns")
+    perfil.contar("reruns", 2)
+
+    resumen = perfil.resumen()
+    # Solo quedan las 100 últimas muestras (101..200 ms).
+    assert resumen["tabla"]["muestras"] == 100
+    assert round(resumen["tabla"]["p50 ms"]) == 151
+    assert round(resumen["tabla"]["p95 ms"]) == 196
+    assert round(resumen["tabla"]["última ms"]) == 200
+    assert resumen["grafico"]["muestras"] == 1
+    assert perfil.contadores() == {"reruns": 3}
+
+    lineas = [json.loads(l) for l in perfil.exportar_jsonl().decode("utf-8").splitlines()]
+    assert len(lineas) == 101 and lineas[-1]["etapa"] == "grafico"
+    perfil.limpiar()
+    assert perfil.resumen() == {} and perfil.contadores() == {}
+
+
+def test_panel_de_perfilado_en_la_app(en_tmp):
+    at = AppTest.from_file(str(RAIZ / "app_reparto_full.py"), default_timeout=30).run()
+    assert not [e for e in at.expander if e.label == "Perfilado"]
+    at.checkbox(key="perfilado").check().run()
+    at.run()
+    assert not at.exception
+    perfil = at.session_state["perfilador"]
+    assert "widgets" in perfil.resumen()
+    assert perfil.contadores()["reruns"] == 2
+    assert [e for e in at.expander if e.label == "Perfilado"]
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+from benchmarks.arranque import _primer_pintado
+from reparto import precarga
+from tests.conftest import RAIZ
+
+
+def test_primer_pintado_sin_modulos_pesados(tmp_path):
+    r = _primer_pintado(str(tmp_path))
+    assert r["excepciones"] == []
+    assert r["pesados"] == []
+
+
+def test_motor_sin_pandas():
+    codigo = "import sys, reparto.motor, reparto.cache, reparto.importacion; print(sorted({'pandas', 'matplotlib'} & set(sys.modules)))"
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+    assert salida.strip() == "[]"
+
+
+def test_precarga_una_vez_por_proceso(monkeypatch):
+    monkeypatch.setattr(precarga, "_hilo", None)
+    monkeypatch.setenv("REPARTO_PRECARGA", "0")
+    assert precarga.precargar() is None
+
+    monkeypatch.delenv("REPARTO_PRECARGA")
+    hilo = precarga.precargar(("json", "modulo_que_no_existe"))
+    assert precarga.precargar() is hilo
+    hilo.join(5)
+    assert not hilo.is_alive()
@@ -0,0 +1,56 @@
+import numpy as np
+
+from reparto.rondas import POOL, Ronda, nombres_unicos, planes_desde_rondas, simular_rondas
+
+
+def _simular(rondas, participaciones=(60, 40), **opciones):
+    return simular_rondas(["Ana", "Luis"], participaciones, planes_desde_rondas([rondas]), **opciones)
+
+
+def test_dilucion_de_una_ronda():
+    r = _simular([Ronda("Semilla", 800_000, 200_000)])
+    np.testing.assert_allclose(r.participacion[0, 1], [48, 32, 0, 20])
+    np.testing.assert_allclose(r.dilucion[0, 1], [20, 20])
+    assert r.titulares == ["Ana", "Luis", POOL, "Ronda 1"]
+
+
+def test_prorrata_del_inversor_anterior():
+    r = _simular([Ronda("Semilla", 800_000, 200_000), Ronda("Serie A", 1_500_000, 500_000, prorrata=True)])
+    # La ronda 1 compra su 20% de la ronda nueva (5 puntos) y la ronda 2 se queda el resto.
+    np.testing.assert_allclose(r.participacion[0, 2], [36, 24, 0, 20, 20])
+    np.testing.assert_allclose(r.participacion[0].sum(axis=1), 100)
+
+
+def test_prorrata_de_un_socio_inicial():
+    ronda = [Ronda("Semilla", 750_000, 250_000, prorrata=True)]
+    con = _simular(ronda, con_prorrata=[True, False])
+    np.testing.assert_allclose(con.participacion[0, 1], [60, 30, 0, 10])
+
+
+def test_pool_objetivo_a_cargo_de_los_existentes():
+    r = _simular([Ronda("Semilla", 900_000, 100_000, pool_objetivo=10)], participaciones=(100, 0))
+    np.testing.assert_allclose(r.participacion[0, 1], [80, 0, 10, 10])
+
+
+def test_umbral_y_primera_ronda_que_lo_supera():
+    r = _simular([Ronda("Semilla", 800_000, 200_000), Ronda("Serie A", 1_500_000, 500_000)], umbral=25)
+    assert r.supera_umbral[0].tolist() == [True, True]
+    assert r.primera_ronda[0].tolist() == [2, 2]
+    solo_ana = _simular([Ronda("Semilla", 800_000, 200_000), Ronda("Serie A", 1_500_000, 500_000)], fundadores=[True, False])
+    assert solo_ana.supera_umbral[0].tolist() == [True, False]
+
+
+def test_planes_vectorizados_igual_que_por_separado():
+    planes = [
+        [Ronda("a", 1e6, 2e5, 10, False), Ronda("b", 4e6, 1e6, 5, True)],
+        [Ronda("a", 2e6, 5e5, 0, True)],
+    ]
+    juntos = simular_rondas(["Ana", "Luis"], [50, 40], planes_desde_rondas(planes), pool_inicial=10)
+    for i, plan in enumerate(planes):
+        solo = simular_rondas(["Ana", "Luis"], [50, 40], planes_desde_rondas([plan]), pool_inicial=10)
+        n = len(plan) + 1
+        np.testing.assert_allclose(juntos.participacion[i, :n, :3 + len(plan)], solo.participacion[0, :n, :3 + len(plan)])
+
+
+def test_nombres_unicos():
+    assert nombres_unicos(["Ana", "", "Ana", None, "Ana"], "Socio") == ["Ana", "Socio 2", "Ana (2)", "Socio 4", "Ana (3)"]
@@ -0,0 +1,72 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from reparto.shapley import funcion_valor, shapley, shapley_exacto, shapley_muestreo, valor_coalicion, valores_coaliciones
+
+AGREGADOS = ["suma", "maximo", "saturado", "maximo"]
+
+
+def _por_definicion(f):
+    """Shapley por la fórmula sobre todas las coaliciones."""
+    n = len(f.puntuaciones)
+    valores = np.zeros(n)
+    for i in range(n):
+        otros = [j for j in range(n) if j != i]
+        for s in range(n):
+            for coalicion in itertools.combinations(otros, s):
+                peso = math.factorial(s) * math.factorial(n - s - 1) / math.factorial(n)
+                valores[i] += peso * (valor_coalicion(f, coalicion + (i,)) - valor_coalicion(f, coalicion))
+    return valores
+
+
+def _funcion(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return funcion_valor(rng.integers(0, 101, (n, 4)), [25, 25, 30, 20], AGREGADOS)
+
+
+def test_tabla_de_coaliciones():
+    f = _funcion(5)
+    v = valores_coaliciones(f)
+    for mascara in (0, 1, 0b10110, 0b11111):
+        miembros = [i for i in range(5) if mascara >> i & 1]
+        assert v[mascara] == pytest.approx(valor_coalicion(f, miembros))
+
+
+def test_exacto_coincide_con_la_definicion_y_es_eficiente():
+    f = _funcion(6)
+    exacto = shapley_exacto(f)
+    np.testing.assert_allclose(exacto.valores, _por_definicion(f))
+    assert exacto.valores.sum() == pytest.approx(valor_coalicion(f, range(6)))
+    assert exacto.exacto and not exacto.error.any()
+
+
+def test_con_suma_es_el_reparto_lineal():
+    puntuaciones = np.random.default_rng(1).integers(0, 101, (7, 4))
+    f = funcion_valor(puntuaciones, [25, 25, 30, 20])
+    np.testing.assert_allclose(shapley_exacto(f).valores, puntuaciones @ np.array([25, 25, 30, 20]) / 100)
+
+
+def test_muestreo_dentro_del_intervalo_del_exacto():
+    f = _funcion(10, semilla=2)
+    exacto = shapley_exacto(f).valores
+    estimacion = shapley_muestreo(f, semilla=0, tiempo_maximo=5, tolerancia=0.002)
+    assert not estimacion.exacto and estimacion.permutaciones > 0
+    # Intervalos al 95%: con el doble del semiancho el test no depende de la semilla.
+    assert (np.abs(estimacion.valores - exacto) <= 2 * estimacion.error + 1e-9).all()
+    np.testing.assert_allclose(estimacion.valores, exacto, rtol=0.05)
+
+
+def test_shapley_elige_por_numero_de_socios():
+    f = _funcion(8)
+    assert shapley(f).exacto
+    assert not shapley(f, max_exacto=4, semilla=0, tiempo_maximo=0.2).exacto
+
+
+def test_bloque_de_trabajo_y_agregado_desconocido():
+    f = funcion_valor(np.zeros((2, 1)), [50], horas=[10, 30], coste_hora=[20, 20], peso_trabajo=50)
+    np.testing.assert_allclose(shapley_exacto(f).valores, [12.5, 37.5])
+    with pytest.raises(ValueError):
+        funcion_valor(np.zeros((2, 1)), [100], ["media"])
@@ -0,0 +1,97 @@
+import threading
+
+from reparto.trabajos import ACTIVOS, CANCELADO, EN_COLA, EN_MARCHA, FALLIDO, TERMINADO, GestorTrabajos
+
+
+def _espera(liberar, avance):
+    while not liberar.wait(0.01):
+        avance(0.5)
+    return "hecho"
+
+
+def test_cancelar_solo_cuando_se_va_el_ultimo_suscriptor():
+    gestor = GestorTrabajos(max_hilos=1)
+    liberar = threading.Event()
+    id_a = gestor.enviar("clave", _espera, liberar, suscriptor="a")
+    id_b = gestor.enviar("clave", _espera, liberar, suscriptor="b")
+    assert id_a == id_b
+
+    assert not gestor.cancelar(id_a, "a")
+    assert gestor.estado(id_a).estado in ACTIVOS
+    assert gestor.cancelar(id_a, "b")
+    gestor._trabajos[id_a].futuro.result(timeout=5)
+    assert gestor.estado(id_a).estado == CANCELADO
+
+
+def test_activos_cuenta_los_trabajos_en_marcha():
+    gestor = GestorTrabajos(max_hilos=1)
+    liberar = threading.Event()
+    id_trabajo = gestor.enviar("clave", _espera, liberar)
+    assert gestor.activos() == 1
+    liberar.set()
+    assert gestor._trabajos[id_trabajo].futuro.result(timeout=5) is None
+    assert gestor.activos() == 0
+
+
+def _esperar(gestor, id_trabajo):
+    gestor._trabajos[id_trabajo].futuro.result(timeout=5)
+    return gestor.estado(id_trabajo)
+
+
+def test_progreso_parcial_y_resultado():
+    gestor = GestorTrabajos(max_hilos=1)
+    paso, seguir = threading.Event(), threading.Event()
+
+    def contar(n, avance):
+        avance(0.5, "mitad", parcial=n // 2)
+        paso.set()
+        seguir.wait(5)
+        return n
+
+    id_trabajo = gestor.enviar("contar", contar, 10)
+    assert paso.wait(5)
+    t = gestor.estado(id_trabajo)
+    assert (t.estado, t.progreso, t.mensaje, t.parcial) == (EN_MARCHA, 0.5, "mitad", 5)
+    seguir.set()
+    t = _esperar(gestor, id_trabajo)
+    assert (t.estado, t.progreso, t.parcial, t.resultado) == (TERMINADO, 1.0, None, 10)
+    # La misma clave devuelve el trabajo terminado en vez de recalcular.
+    assert gestor.enviar("contar", contar, 10) == id_trabajo
+
+
+def test_fallido_se_reintenta_solo_si_se_pide():
+    gestor = GestorTrabajos(max_hilos=1)
+
+    def fallar(avance):
+        raise ValueError("sin datos")
+
+    id_trabajo = gestor.enviar("fallar", fallar)
+    t = _esperar(gestor, id_trabajo)
+    assert (t.estado, t.error) == (FALLIDO, "ValueError: sin datos")
+    assert gestor.enviar("fallar", fallar) == id_trabajo
+    assert gestor.enviar("fallar", fallar, reintentar=True) != id_trabajo
+
+
+def test_en_cola_cancelado_no_empieza_y_se_relanza():
+    gestor = GestorTrabajos(max_hilos=1)
+    liberar = threading.Event()
+    ocupado = gestor.enviar("ocupado", _espera, liberar)
+    empezados = []
+    en_cola = gestor.enviar("en_cola", lambda avance: empezados.append(1))
+    assert gestor.estado(en_cola).estado == EN_COLA
+    assert gestor.cancelar(en_cola)
+    assert gestor.estado(en_cola).estado == CANCELADO
+    liberar.set()
+    _esperar(gestor, ocupado)
+    assert empezados == []
+    assert gestor.enviar("en_cola", lambda avance: empezados.append(1)) != en_cola
+
+
+def test_purga_los_terminados_mas_antiguos():
+    gestor = GestorTrabajos(max_hilos=1, max_terminados=2)
+    ids = [gestor.enviar(f"k{i}", lambda i, avance: i, i) for i in range(3)]
+    for i in ids:
+        _esperar(gestor, i)
+    gestor.enviar("otro", lambda avance: None)
+    assert gestor.estado(ids[0]) is None
+    assert gestor.estado(ids[2]).resultado == 2
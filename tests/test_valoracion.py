@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from reparto.valoracion import Distribucion, PERCENTILES, distribuciones_triangulares, simular_valoracion
+
+ENTRADAS = {"horas": 300, "coste_hora": 50, "gastos": 5000, "usuarios": 2000, "precio_mensual": 10, "margen": 20, "multiplicador": 2}
+
+
+@pytest.mark.parametrize("simulaciones,bloque,max_muestras", [(1000, 64, 100), (10_000, 999, 1234), (5000, 4096, 777)])
+def test_muestras_guardadas_no_superan_el_limite(monkeypatch, simulaciones, bloque, max_muestras):
+    guardadas = []
+    original = np.percentile
+
+    def percentile(muestras, q):
+        guardadas.append(len(muestras))
+        return original(muestras, q)
+
+    monkeypatch.setattr(np, "percentile", percentile)
+    simular_valoracion(distribuciones_triangulares(ENTRADAS, 20), 1000, 50_000, simulaciones, bloque, max_muestras, semilla=0)
+    assert guardadas and all(n == min(simulaciones, max_muestras) for n in guardadas)
+
+
+def test_sin_incertidumbre_los_percentiles_son_el_valor_puntual():
+    entradas = {k: Distribucion("fija", (v,)) for k, v in ENTRADAS.items()}
+    resultado = simular_valoracion(entradas, 1000, 50_000, 2000, semilla=0)
+    pre_money = ((300 * 50 + 5000) + 2000 * 10 * 12 * 0.2 * 2) / 2
+    np.testing.assert_allclose(resultado.cuantiles["pre_money"], [pre_money] * len(PERCENTILES))
+    assert resultado.medias["pre_money"] == pytest.approx(pre_money)
+
+
+def test_percentiles_de_una_entrada_uniforme():
+    # Solo las horas varían: la pre-money es lineal en ellas y sus percentiles, los de la uniforme.
+    entradas = {k: Distribucion("fija", (v,)) for k, v in ENTRADAS.items()}
+    entradas["horas"] = Distribucion("uniforme", (0, 1000))
+    avances = []
+    resultado = simular_valoracion(entradas, 1000, 50_000, 200_000, bloque=50_000, semilla=1, avance=lambda f, _, parcial: avances.append(f))
+    fijo = (5000 + 2000 * 10 * 12 * 0.2 * 2) / 2
+    esperado = fijo + np.array(PERCENTILES) * 10 * 50 / 2
+    np.testing.assert_allclose(resultado.cuantiles["pre_money"], esperado, rtol=2e-3)
+    assert avances == [0.25, 0.5, 0.75, 1.0]
+
+    # El ROI es la participación pactada (al precio de 50.000 €) sobre la valoración simulada.
+    pactada = 1000 / 51_000
+    np.testing.assert_allclose(resultado.cuantiles["roi"], pactada * (resultado.cuantiles["pre_money"] + 1000) - 1000)
+    np.testing.assert_allclose(resultado.cuantiles["participacion"][::-1], 1000 * 100 / (resultado.cuantiles["pre_money"] + 1000))
+
+
+def test_misma_semilla_mismo_resultado():
+    entradas = distribuciones_triangulares(ENTRADAS, 30)
+    a = simular_valoracion(entradas, 1000, 50_000, 20_000, bloque=3000, semilla=7)
+    b = simular_valoracion(entradas, 1000, 50_000, 20_000, bloque=3000, semilla=7)
+    np.testing.assert_array_equal(a.cuantiles["roi"], b.cuantiles["roi"])
+    assert a.medias == b.medias
+
+
+def test_entradas_fuera_de_rango_se_recortan():
+    entradas = {k: Distribucion("fija", (v,)) for k, v in ENTRADAS.items()}
+    entradas["margen"] = Distribucion("fija", (250,))
+    entradas["gastos"] = Distribucion("fija", (-5000,))
+    resultado = simular_valoracion(entradas, 1000, 50_000, 10, semilla=0)
+    assert resultado.medias["pre_money"] == pytest.approx((300 * 50 + 2000 * 10 * 12 * 1.0 * 2) / 2)
+    with pytest.raises(ValueError, match="desconocida"):
+        Distribucion("beta", (1, 1)).muestrear(np.random.default_rng(0), 3)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from reparto.vesting import Concesion, calendario, foto
+from tests.conftest import RAIZ
+
+
+def _consolidado(concesion, fechas, venta=None):
+    return foto(calendario([concesion], venta), fechas).consolidado[..., 0].tolist()
+
+
+def test_cliff_y_consolidacion_lineal():
+    c = Concesion("Ana", 48, "2024-01-15")
+    assert _consolidado(c, ["2023-12-01", "2024-12-31", "2025-01-01", "2026-01-01", "2028-01-01", "2030-06-01"]) == [0, 0, 12, 24, 48, 48]
+
+
+def test_sin_duracion_consolida_al_inicio():
+    assert _consolidado(Concesion("Ana", 10, "2024-01-01", cliff=0, duracion=0), ["2024-01-01"]) == [10]
+
+
+def test_aceleracion_simple_en_la_venta():
+    c = Concesion("Ana", 48, "2024-01-01", aceleracion=0.5)
+    # 17 meses consolidados antes de la venta y, en ella, 18 más la mitad de lo pendiente.
+    assert _consolidado(c, ["2025-06-01", "2025-07-01", "2026-01-01"], venta="2025-07-01") == [17, 33, 36]
+
+
+def test_aceleracion_doble_necesita_la_salida_tras_la_venta():
+    c = Concesion("Ana", 48, "2024-01-01", aceleracion=0.5, disparo="doble")
+    assert _consolidado(c, ["2025-07-01"], venta="2025-07-01") == [18]
+    sale = c._replace(salida="2026-01-01")
+    f = foto(calendario([sale], "2025-07-01"), ["2026-01-01", "2027-01-01"])
+    assert f.consolidado[:, 0].tolist() == [36, 36]
+    assert f.devuelto[:, 0].tolist() == [12, 12]
+    assert f.pendiente[:, 0].tolist() == [0, 0]
+
+
+def test_salida_con_recompra_devuelve_todo_al_pool():
+    socios = [Concesion("Ana", 48, "2024-01-01", salida="2026-01-01", recompra=1.0), Concesion("Luis", 48, "2024-01-01")]
+    f = foto(calendario(socios), "2026-06-01")
+    assert f.consolidado.tolist() == [0, 29]
+    assert f.pool == 48
+
+
+def test_concesiones_no_validas():
+    with pytest.raises(ValueError):
+        calendario([Concesion("Ana", 10, None)])
+    with pytest.raises(ValueError):
+        calendario([Concesion("Ana", 10, "2024-01-01", disparo="triple")])
+    vacio = foto(calendario([]), np.array(["2024-01-01"], dtype="datetime64[D]"))
+    assert vacio.consolidado.shape == (1, 0)
+
+
+def test_celdas_vacias_del_editor_de_vesting(en_tmp):
+    at = AppTest.from_file(str(RAIZ / "app_reparto_full.py"), default_timeout=60).run()
+    next(b for b in at.button if b.label == "Calcular Participaciones").click().run()
+    next(c for c in at.checkbox if c.label == "Calendario de vesting").check().run()
+    at.session_state["vesting"] = {
+        "edited_rows": {1: {"Cliff (meses)": None, "Duración (meses)": None}},
+        "added_rows": [],
+        "deleted_rows": [],
+    }
+    at.run()
+    assert not at.exception, [e.message for e in at.exception]
+    assert any("Celdas vacías en Socio 2" in w.value for w in at.warning)